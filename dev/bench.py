@@ -0,0 +1,358 @@
+# Times every lint check, per backend, over synthetic meshes of growing size,
+# and writes the numbers out as JSON so runs from different commits can be
+# compared. Runs under plain Python (needs NumPy to build the meshes):
+#
+#   python dev/bench.py --output before.json
+#   python dev/bench.py --output after.json --compare before.json
+#
+# or inside Blender, where it also times writing the selection back:
+#
+#   blender --background --factory-startup \
+#       --python dev/bench.py -- --sizes 1000,100000
+#
+# The meshes:
+#  - grid: a flat quad grid, open all round its border
+#  - cube: a subdivided cube, closed, quads only, 8 three-edge poles
+#  - lumpy: a grid sprinkled with Tris, Ngons and 6+-edge poles, roughly
+#    what a hand-modeled head ends up with
+#  - soup: a grid with fins, doubled faces and stray verts, so every
+#    Nonmanifold and Interior Faces path gets work
+#
+# Sizes are face counts to aim for; 10M faces (--sizes 10000000) wants a
+# few GB of memory, and --python-limit keeps the Python backend off the
+# meshes it would take minutes on.
+
+import os
+import sys
+import gc
+import json
+import time
+import argparse
+import platform
+import subprocess
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+import meshlint
+from meshlint import MeshTopology, MeshLintEngine
+
+numpy = meshlint.numpy if meshlint.has_numpy() else None
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+def polygons(coords, faces):
+    '''coords is (N, 3); faces is a list of (F, size) arrays. Returns the
+    flat coords, face_offsets and face_verts from_loops() wants.'''
+    faces = [ face for face in faces if len(face) ]
+    sizes = numpy.concatenate([
+        numpy.full(len(face), face.shape[1]) for face in faces ])
+    offsets = numpy.zeros(len(sizes) + 1, numpy.int64)
+    numpy.cumsum(sizes, out=offsets[1:])
+    loops = numpy.concatenate([ face.ravel() for face in faces ])
+    return coords.astype(numpy.float32).ravel(), offsets, loops
+
+
+def grid_points(side):
+    ys, xs = numpy.divmod(numpy.arange((side + 1) ** 2), side + 1)
+    return numpy.column_stack((xs, ys, numpy.zeros_like(xs)))
+
+
+def grid_quads(side):
+    ys, xs = numpy.divmod(numpy.arange(side * side), side)
+    corner = ys * (side + 1) + xs
+    quads = numpy.column_stack(
+        (corner, corner + 1, corner + side + 2, corner + side + 1))
+    return xs, ys, quads
+
+
+def make_grid(faces):
+    side = max(1, int(round(faces ** 0.5)))
+    return polygons(grid_points(side), [ grid_quads(side)[2] ])
+
+
+def make_cube(faces):
+    side = max(1, int(round((faces / 6.0) ** 0.5)))
+    us, vs = numpy.divmod(numpy.arange((side + 1) ** 2), side + 1)
+    points = []
+    quads = []
+    for axis in range(3):
+        for level in 0, side:
+            point = numpy.empty(((side + 1) ** 2, 3), numpy.int64)
+            point[:, axis] = level
+            point[:, (axis + 1) % 3] = us
+            point[:, (axis + 2) % 3] = vs
+            quad = grid_quads(side)[2] + len(points) * len(point)
+            quads.append(quad[:, ::-1] if 0 == level else quad)
+            points.append(point)
+    points = numpy.concatenate(points)
+    # Weld the seams: every lattice point is kept once.
+    keys = (points[:, 0] * (side + 1) + points[:, 1]) * (side + 1) \
+        + points[:, 2]
+    keys, welded = numpy.unique(keys, return_inverse=True)
+    welded = welded.ravel()
+    coords = numpy.column_stack((keys // (side + 1) ** 2,
+                                 keys // (side + 1) % (side + 1),
+                                 keys % (side + 1)))
+    return polygons(coords, [ welded[numpy.concatenate(quads)] ])
+
+
+def make_lumpy(faces):
+    # A fanned quad becomes 4 Tris around a new center vert; fanning whole
+    # 2x2 blocks leaves an 8-edge pole in the middle of each. Merging a
+    # quad with its right neighbour makes a 6-sided Ngon, and splitting
+    # one across a diagonal makes 2 Tris.
+    side = 2 * max(1, int(round(faces ** 0.5 / 2)))
+    points = grid_points(side)
+    xs, ys, quads = grid_quads(side)
+    fanned = 0 == (xs // 2 + 3 * (ys // 2)) % 11
+    merged = ~fanned & (0 == xs % 2) & (1 == (xs // 2 + ys) % 5)
+    partner = numpy.zeros_like(merged)
+    partner[1:] = merged[:-1]
+    split = ~fanned & ~merged & ~partner & (3 == (xs + 2 * ys) % 7)
+    plain = ~(fanned | merged | partner | split)
+
+    fan = quads[fanned]
+    centers = len(points) + numpy.arange(len(fan))
+    fan_points = points[fan[:, 0]] * 2 + 1
+    points = numpy.concatenate((points * 2, fan_points))
+    fan_tris = numpy.concatenate([
+        numpy.column_stack((fan[:, i], fan[:, (i + 1) % 4], centers))
+        for i in range(4) ])
+    left, right = quads[merged], quads[numpy.roll(merged, 1)]
+    ngons = numpy.column_stack((left[:, 0], left[:, 1], right[:, 1],
+                                right[:, 2], left[:, 2], left[:, 3]))
+    halves = quads[split]
+    split_tris = numpy.concatenate((halves[:, :3], halves[:, [0, 2, 3]]))
+    return polygons(points, [ quads[plain], ngons, split_tris, fan_tris ])
+
+
+def make_soup(faces):
+    # Fins hang a third face off interior edges, doubled quads sit on top
+    # of their originals (so they are Interior Faces), and stray verts have
+    # no edges at all.
+    side = max(2, int(round(faces ** 0.5)))
+    points = grid_points(side)
+    xs, ys, quads = grid_quads(side)
+    finned = quads[0 == (xs * 7 + ys * 3) % 23]
+    fin_tips = len(points) + numpy.arange(len(finned))
+    tips = points[finned[:, 0]] + [0, 0, 1]
+    doubled = quads[0 == (xs * 5 + ys * 11) % 41]
+    strays = points[:max(1, side // 4)] + [0, 0, -1]
+    points = numpy.concatenate((points, tips, strays))
+    fins = numpy.column_stack((finned[:, 0], finned[:, 1], fin_tips))
+    return polygons(points, [ quads, fins, doubled ])
+
+
+MESHES = [
+    ('grid', make_grid),
+    ('cube', make_cube),
+    ('lumpy', make_lumpy),
+    ('soup', make_soup),
+]
+
+
+def fresh_copy(topology):
+    'Shares the arrays, but none of the derived adjacency or memo.'
+    return MeshTopology(topology.coords, topology.face_offsets,
+                        topology.face_verts, topology.face_edges,
+                        topology.edges)
+
+
+def visited(topology, elemtypes):
+    return sum(topology.count(elemtype) for elemtype in elemtypes)
+
+
+def measure(run, repeat):
+    '''Best wall time of `repeat` runs, then one more run under
+    tracemalloc for the peak of what it allocated.'''
+    best = None
+    for attempt in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        result = run()
+        elapsed = time.perf_counter() - started
+        best = elapsed if None is best else min(best, elapsed)
+    gc.collect()
+    tracemalloc.start()
+    run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak, result
+
+
+def bench_mesh(name, topology, opts, record):
+    everything = visited(topology, meshlint.ELEM_TYPES)
+    analysis = None
+    for backend in opts.backends:
+        if 'NUMPY' == backend and not meshlint.has_numpy():
+            continue
+        if 'PYTHON' == backend \
+                and topology.num_faces > opts.python_limit:
+            continue
+        for lint in MeshLintEngine.CHECKS:
+            seconds, peak, _ = measure(
+                lambda: MeshLintEngine(fresh_copy(topology)).analyze(
+                    [lint], backend), opts.repeat)
+            record(name, topology, 'check_' + lint['symbol'], backend,
+                   seconds, peak, visited(topology, lint['elemtypes']))
+        seconds, peak, analysis = measure(
+            lambda: MeshLintEngine(fresh_copy(topology)).analyze(
+                MeshLintEngine.CHECKS, backend), opts.repeat)
+        record(name, topology, 'analyze', backend, seconds, peak,
+               everything)
+    if None is analysis:
+        analysis = MeshLintEngine(fresh_copy(topology)).analyze(
+            MeshLintEngine.CHECKS, 'NUMPY')
+    before = MeshLintEngine.none_analysis()
+    seconds, peak, _ = measure(
+        lambda: MeshLintEngine.diff_analyses(before, analysis), opts.repeat)
+    record(name, topology, 'diff_analyses', None, seconds, peak,
+           sum(len(report[elemtype]) for report in analysis
+               for elemtype in meshlint.ELEM_TYPES))
+    seconds, peak, _ = measure(
+        lambda: fresh_copy(topology).selection_masks(analysis), opts.repeat)
+    record(name, topology, 'selection_masks',
+           'NUMPY' if meshlint.has_numpy() else 'PYTHON',
+           seconds, peak, everything)
+    if 'bpy' in sys.modules and topology.num_faces <= opts.blender_limit:
+        bench_blender(name, topology, opts, record)
+
+
+def bench_blender(name, topology, opts, record):
+    import bpy
+    offsets = topology.face_offsets
+    mesh = bpy.data.meshes.new('Bench_' + name)
+    mesh.from_pydata(
+        list(zip(*[iter(topology.coords)] * 3)), [],
+        [ topology.face_verts[offsets[f]:offsets[f + 1]]
+          for f in range(topology.num_faces) ])
+    mesh.update()
+    obj = bpy.data.objects.new(mesh.name, mesh)
+    bpy.context.scene.objects.link(obj)
+    bpy.context.scene.objects.active = obj
+    meshlint.ensure_edit_mode()
+    analyzer = meshlint.MeshLintAnalyzer()
+    def find_problems():
+        # Otherwise every run after the first is a cache hit.
+        meshlint.MeshLintAnalyzer.topology_cache.clear()
+        return analyzer.find_problems()
+    seconds, peak, _ = measure(find_problems, opts.repeat)
+    record(name, topology, 'find_problems',
+           bpy.context.scene.meshlint_backend, seconds, peak,
+           visited(topology, meshlint.ELEM_TYPES))
+    analysis = analyzer.find_problems()
+    seconds, peak, _ = measure(
+        lambda: analyzer.select_analysis(analysis), opts.repeat)
+    record(name, topology, 'select_analysis', None, seconds, peak,
+           visited(topology, meshlint.ELEM_TYPES))
+    meshlint.ensure_not_edit_mode()
+    bpy.context.scene.objects.unlink(obj)
+    bpy.data.objects.remove(obj)
+    bpy.data.meshes.remove(mesh)
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'], cwd=os.path.dirname(__file__),
+            stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def peak_rss():
+    'The whole process\'s high-water mark, in bytes, where we can tell.'
+    if None is resource:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if 'darwin' == sys.platform else peak * 1024
+
+
+def compare(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    def key(row):
+        return row['mesh'], row['faces'], row['stage'], row['backend']
+    old = { key(row): row for row in baseline['results'] }
+    for row in results:
+        if not key(row) in old:
+            continue
+        ratio = row['seconds'] / max(old[key(row)]['seconds'], 1e-9)
+        print('%-6s %9d %-28s %-6s %6.2fx%s' % (
+            key(row) + (ratio, '  <-- slower' if ratio > 1.1 else '')),
+            file=sys.stderr)
+
+
+def main(args):
+    parser = argparse.ArgumentParser(prog='bench.py')
+    parser.add_argument('--sizes', default='1000,10000,100000,1000000',
+                        help='comma-separated face counts to aim for')
+    parser.add_argument('--meshes', default=','.join(
+                            name for name, make in MESHES))
+    parser.add_argument('--backends', default=','.join(
+                            symbol for symbol, label, desc
+                            in meshlint.BACKENDS))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--python-limit', type=int, default=200000,
+                        help='largest mesh, in faces, to time the Python '
+                        'backend on')
+    parser.add_argument('--blender-limit', type=int, default=1000000,
+                        help='largest mesh, in faces, to build in Blender')
+    parser.add_argument('--output', help='write JSON here, not stdout')
+    parser.add_argument('--compare', metavar='BASELINE',
+                        help='an earlier --output to print speedups against')
+    opts = parser.parse_args(args)
+    if not meshlint.has_numpy():
+        parser.error('building the meshes needs NumPy')
+    if 'bpy' in sys.modules:
+        meshlint.register_properties()
+    opts.backends = opts.backends.split(',')
+    makers = dict(MESHES)
+
+    results = []
+    def record(name, topology, stage, backend, seconds, peak, elements):
+        row = {
+            'mesh': name,
+            'faces': topology.num_faces,
+            'verts': topology.num_verts,
+            'edges': topology.num_edges,
+            'stage': stage,
+            'backend': backend,
+            'seconds': seconds,
+            'elements': elements,
+            'elements_per_second': elements / max(seconds, 1e-9),
+            'peak_bytes': peak }
+        results.append(row)
+        print('%(mesh)-6s %(faces)9d %(stage)-28s %(backend)-6s '
+              '%(seconds)10.6fs %(peak_bytes)12d B' % row, file=sys.stderr)
+
+    for size in opts.sizes.split(','):
+        for name in opts.meshes.split(','):
+            topology = MeshTopology.from_loops(*makers[name](int(size)))
+            bench_mesh(name, topology, opts, record)
+            del topology
+
+    report = {
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'numpy': numpy.__version__,
+        'blender': '.'.join(map(str, sys.modules['bpy'].app.version))
+            if 'bpy' in sys.modules else None,
+        'peak_rss_bytes': peak_rss(),
+        'results': results }
+    if opts.output:
+        with open(opts.output, 'w') as f:
+            json.dump(report, f, indent=1)
+    else:
+        json.dump(report, sys.stdout, indent=1)
+        print()
+    if opts.compare:
+        compare(results, opts.compare)
+
+
+if __name__ == '__main__':
+    main(meshlint.script_args() if 'bpy' in sys.modules else sys.argv[1:])
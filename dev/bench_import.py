@@ -0,0 +1,78 @@
+# Times loading MeshLint, each time in a fresh process, since that is what
+# every Blender start (and every batch worker) pays for:
+#
+#   python dev/bench_import.py --runs 20
+#
+# times `import meshlint` under plain Python, and
+#
+#   python dev/bench_import.py --blender blender
+#
+# times `import meshlint` plus register() inside a background Blender as
+# well. Prints a JSON line per place with the median and fastest times in
+# milliseconds, and whether NumPy got imported along the way. Run it on two
+# commits to compare.
+
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+
+# Printed by the measured process as its last line.
+PROBE = '''
+import sys, time
+sys.path.insert(0, %r)
+started = time.perf_counter()
+import meshlint
+imported = time.perf_counter()
+if 'bpy' in sys.modules:
+    meshlint.register()
+print('MESHLINT_IMPORT %%r %%r %%d' %% (
+    imported - started, time.perf_counter() - started,
+    'numpy' in sys.modules))
+''' % ROOT
+
+
+def probe(command):
+    output = subprocess.check_output(
+        command, stderr=subprocess.STDOUT).decode('utf-8', 'replace')
+    for line in reversed(output.splitlines()):
+        if line.startswith('MESHLINT_IMPORT '):
+            words = line.split()
+            return float(words[1]), float(words[2]), bool(int(words[3]))
+    raise RuntimeError('no timing in:\n' + output)
+
+
+def summarize(where, runs):
+    def ms(values):
+        values = sorted(values)
+        return {
+            'median_ms': 1000 * values[len(values) // 2],
+            'min_ms': 1000 * values[0] }
+    return dict(
+        where=where, runs=len(runs),
+        imported=ms([ run[0] for run in runs ]),
+        registered=ms([ run[1] for run in runs ]),
+        numpy_imported=any(run[2] for run in runs))
+
+
+def main(args):
+    parser = argparse.ArgumentParser(prog='bench_import.py')
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument('--blender',
+                        help='also time it inside this Blender')
+    opts = parser.parse_args(args)
+    places = [ ('python', [ sys.executable, '-c', PROBE ]) ]
+    if opts.blender:
+        places.append(('blender', [
+            opts.blender, '--background', '--factory-startup',
+            '--python-expr', PROBE ]))
+    for where, command in places:
+        runs = [ probe(command) for run in range(opts.runs) ]
+        print(json.dumps(summarize(where, runs)))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
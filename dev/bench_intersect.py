@@ -0,0 +1,95 @@
+# Times the Intersecting Faces check, both backends' trees against testing
+# every pair of tris, over crumpled dev/bench.py meshes small enough for the
+# pairwise test to finish:
+#
+#   python dev/bench_intersect.py --sizes 50,100,200
+#
+# Every mesh's verts get jittered, so neighbouring faces fold through each
+# other. Prints a JSON line per mesh and method, and exits non-zero if
+# a tree reports different faces than the pairwise test.
+
+import os
+import sys
+import json
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(__file__))
+import bench
+from bench import meshlint, numpy
+from meshlint import MeshTopology, MeshLintEngine
+
+INTERSECTING = [ lint for lint in MeshLintEngine.CHECKS
+                 if 'intersecting_faces' == lint['symbol'] ]
+
+
+def crumpled(make, size, jitter, seed):
+    coords, offsets, loops = make(size)
+    coords = coords.reshape(-1, 3).copy()
+    coords += numpy.random.RandomState(seed).normal(
+        0, jitter, coords.shape)
+    return MeshTopology.from_loops(coords.ravel(), offsets, loops)
+
+
+def pairwise(topology):
+    'Every tri against every other one: the O(n^2) reference.'
+    tris, tri_faces = topology.triangles()
+    coords = topology.coords
+    corners = [ [ coords[3 * v:3 * v + 3] for v in tris[3 * t:3 * t + 3] ]
+                for t in range(len(tri_faces)) ]
+    found = set()
+    for t in range(len(tri_faces)):
+        mine = tris[3 * t:3 * t + 3]
+        for u in range(t + 1, len(tri_faces)):
+            if tri_faces[t] == tri_faces[u] \
+                    or any(v in mine for v in tris[3 * u:3 * u + 3]):
+                continue
+            if meshlint.triangles_intersect(corners[t], corners[u]):
+                found.update((tri_faces[t], tri_faces[u]))
+    return sorted(found)
+
+
+def tree(backend):
+    def run(topology):
+        return MeshLintEngine(topology).analyze(
+            INTERSECTING, backend)[0]['faces'].tolist()
+    return run
+
+
+def main(args):
+    parser = argparse.ArgumentParser(prog='bench_intersect.py')
+    parser.add_argument('--sizes', default='50,100,200')
+    parser.add_argument('--meshes', default='grid,lumpy')
+    parser.add_argument('--jitter', type=float, default=0.5)
+    parser.add_argument('--seed', type=int, default=0)
+    opts = parser.parse_args(args)
+    makers = dict(bench.MESHES)
+    methods = [ ('pairwise', pairwise), ('bvh_python', tree('PYTHON')) ]
+    if meshlint.has_numpy():
+        methods.append(('bvh_numpy', tree('NUMPY')))
+    agree = True
+    for size in opts.sizes.split(','):
+        for name in opts.meshes.split(','):
+            expected = None
+            for method, run in methods:
+                # A fresh topology each time, so no tree is reused.
+                topology = crumpled(
+                    makers[name], int(size), opts.jitter, opts.seed)
+                started = time.time()
+                found = run(topology)
+                elapsed = time.time() - started
+                if None is expected:
+                    expected = found
+                agree = agree and found == expected
+                print(json.dumps({
+                    'mesh': name,
+                    'faces': topology.num_faces,
+                    'method': method,
+                    'intersecting': len(found),
+                    'matches_pairwise': found == expected,
+                    'seconds': elapsed }))
+    return 0 if agree else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
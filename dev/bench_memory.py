@@ -0,0 +1,67 @@
+# Measures what keeping an analysis around costs: what Continuous Check
+# holds on to between passes. Compares LintIndices with the lists of Python
+# ints analyses used to be made of, over the dev/bench.py meshes:
+#
+#   python dev/bench_memory.py --sizes 100000,1000000
+#
+# Prints a JSON line per mesh with the bytes each format keeps alive.
+
+import os
+import sys
+import gc
+import json
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(__file__))
+import bench
+from bench import meshlint
+from meshlint import MeshTopology, MeshLintEngine
+
+
+def retained(build):
+    'Bytes still allocated by what build() returns, once it has returned.'
+    gc.collect()
+    tracemalloc.start()
+    kept = build()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return size
+
+
+def as_lists(analysis):
+    return [ dict(report, **{ elemtype: report[elemtype].tolist()
+                              for elemtype in meshlint.ELEM_TYPES })
+             for report in analysis ]
+
+
+def main(args):
+    parser = argparse.ArgumentParser(prog='bench_memory.py')
+    parser.add_argument('--sizes', default='10000,100000,1000000')
+    parser.add_argument('--meshes', default=','.join(
+                            name for name, make in bench.MESHES))
+    opts = parser.parse_args(args)
+    makers = dict(bench.MESHES)
+    for size in opts.sizes.split(','):
+        for name in opts.meshes.split(','):
+            topology = MeshTopology.from_loops(*makers[name](int(size)))
+            analysis = MeshLintEngine(topology).analyze(
+                MeshLintEngine.CHECKS, 'NUMPY')
+            problems = sum(len(report[elemtype]) for report in analysis
+                           for elemtype in meshlint.ELEM_TYPES)
+            print(json.dumps({
+                'mesh': name,
+                'faces': topology.num_faces,
+                'problems': problems,
+                'lint_indices_bytes': retained(
+                    lambda: [ { elemtype: meshlint.LintIndices(
+                                  report[elemtype].indices[:])
+                                for elemtype in meshlint.ELEM_TYPES }
+                              for report in analysis ]),
+                'list_bytes': retained(lambda: as_lists(analysis)) }))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,89 @@
+# Times Select Lint over many selected objects from Object Mode: the old
+# walk, making each object active and toggling it in and out of Edit Mode,
+# against MeshLintAnalyzer.find_problems_of(). Needs Blender:
+#
+#   blender --background --factory-startup \
+#       --python dev/bench_objects.py -- --objects 500 --size 20
+#
+# Every object is a size x size grid with one corner made a Tri, so each one
+# has something to select. Prints a JSON line per path.
+
+import os
+import sys
+import json
+import time
+import argparse
+
+import bpy
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+import meshlint
+
+
+def grid_object(name, size):
+    verts = [ (x, y, 0) for y in range(size + 1) for x in range(size + 1) ]
+    faces = []
+    for y in range(size):
+        for x in range(size):
+            corner = y * (size + 1) + x
+            faces.append((corner, corner + 1,
+                          corner + size + 2, corner + size + 1))
+    faces[0] = faces[0][:3]
+    mesh = bpy.data.meshes.new(name)
+    mesh.from_pydata(verts, [], faces)
+    mesh.update()
+    obj = bpy.data.objects.new(name, mesh)
+    bpy.context.scene.objects.link(obj)
+    obj.select = True
+    return obj
+
+
+def toggling(objs):
+    troubled = []
+    for obj in objs:
+        meshlint.activate(obj)
+        analyzer = meshlint.MeshLintAnalyzer()
+        analysis = analyzer.find_problems()
+        analyzer.select_analysis(analysis)
+        meshlint.ensure_not_edit_mode()
+        if not analyzer.found_zero_problems():
+            troubled.append(obj)
+    return troubled
+
+
+def bulk(objs):
+    troubled = []
+    for analyzer, analysis in \
+            meshlint.MeshLintAnalyzer.find_problems_of(objs):
+        analyzer.select_analysis(analysis)
+        if not analyzer.found_zero_problems():
+            troubled.append(analyzer.obj)
+    return troubled
+
+
+def main(args):
+    parser = argparse.ArgumentParser(prog='bench_objects.py')
+    parser.add_argument('--objects', type=int, default=500)
+    parser.add_argument('--size', type=int, default=20)
+    parser.add_argument('--workers', type=int, default=4)
+    opts = parser.parse_args(args)
+
+    meshlint.register_properties()
+    bpy.context.scene.meshlint_workers = opts.workers
+    objs = [ grid_object('Bench%d' % i, opts.size)
+             for i in range(opts.objects) ]
+    for name, path in ('toggling', toggling), ('find_problems_of', bulk):
+        meshlint.activate(objs[0])
+        meshlint.ensure_not_edit_mode()
+        meshlint.MeshLintAnalyzer.topology_cache.clear()
+        started = time.time()
+        troubled = path(objs)
+        print(json.dumps({
+            'path': name,
+            'objects': len(objs),
+            'faces_per_object': opts.size ** 2,
+            'troubled': len(troubled),
+            'seconds': time.time() - started }))
+
+
+main(meshlint.script_args())
@@ -0,0 +1,99 @@
+# Times Select Lint's write-back: the old per-element walk, kept here as
+# select_indices(), against select_analysis(). Needs Blender:
+#
+#   blender --background --factory-startup \
+#       --python dev/bench_selection.py -- --size 300
+#
+# Builds a triangulated size x size grid, so every face is reported as a Tri
+# and the whole mesh ends up selected, then prints a JSON line per path.
+
+import os
+import sys
+import json
+import time
+import argparse
+
+import bpy
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+import meshlint
+
+
+def tri_grid(size):
+    verts = [ (x, y, 0) for y in range(size + 1) for x in range(size + 1) ]
+    faces = []
+    for y in range(size):
+        for x in range(size):
+            corner = y * (size + 1) + x
+            above = corner + size + 1
+            faces += [ (corner, corner + 1, above + 1),
+                       (corner, above + 1, above) ]
+    mesh = bpy.data.meshes.new('BenchGrid')
+    mesh.from_pydata(verts, [], faces)
+    mesh.update()
+    obj = bpy.data.objects.new('BenchGrid', mesh)
+    bpy.context.scene.objects.link(obj)
+    bpy.context.scene.objects.active = obj
+    return obj
+
+
+def select_indices(b, elemtype, indices):
+    'How Select Lint used to select, an element at a time through BMesh.'
+    def select_vert(index):
+        b.verts[index].select = True
+    def select_edge(index):
+        edge = b.edges[index]
+        edge.select = True
+        for each in edge.verts:
+            select_vert(each.index)
+    def select_face(index):
+        face = b.faces[index]
+        face.select = True
+        for each in face.edges:
+            select_edge(each.index)
+    select = { 'verts': select_vert, 'edges': select_edge,
+               'faces': select_face }[elemtype]
+    for i in indices:
+        select(i)
+
+
+def per_element(analyzer, analysis):
+    bpy.ops.mesh.select_all(action='DESELECT')
+    for report in analysis:
+        for elemtype in meshlint.ELEM_TYPES:
+            select_indices(analyzer.b, elemtype, report[elemtype])
+
+
+def bulk(analyzer, analysis):
+    analyzer.select_analysis(analysis)
+
+
+def main(args):
+    parser = argparse.ArgumentParser(prog='bench_selection.py')
+    parser.add_argument('--size', type=int, default=300)
+    parser.add_argument('--repeat', type=int, default=3)
+    opts = parser.parse_args(args)
+
+    meshlint.register_properties()
+    obj = tri_grid(opts.size)
+    for name, path in ('select_indices', per_element), \
+                      ('select_analysis', bulk):
+        best = None
+        for attempt in range(opts.repeat):
+            meshlint.ensure_edit_mode()
+            analyzer = meshlint.MeshLintAnalyzer()
+            analysis = analyzer.find_problems()
+            started = time.time()
+            path(analyzer, analysis)
+            elapsed = time.time() - started
+            best = elapsed if None is best else min(best, elapsed)
+        meshlint.ensure_not_edit_mode()
+        selected = sum(p.select for p in obj.data.polygons)
+        print(json.dumps({
+            'path': name,
+            'faces': len(obj.data.polygons),
+            'selected_faces': selected,
+            'seconds': best }))
+
+
+main(meshlint.script_args())
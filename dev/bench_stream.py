@@ -0,0 +1,165 @@
+# Compares what linting a big mesh costs in memory, checked whole (a
+# MeshTopology and the 'NumPy' backend) and streamed a chunk at a time
+# (MeshLintStream), over the dev/bench.py meshes saved as binary .ply files:
+#
+#   python dev/bench_stream.py --sizes 1000000,4000000
+#
+# or inside Blender, where it also measures reading the mesh into a BMesh,
+# which is what Edit Mode linting starts from:
+#
+#   blender --background --factory-startup \
+#       --python dev/bench_stream.py -- --sizes 1000000
+#
+# Prints a JSON line per mesh and path with its peak bytes (as tracemalloc
+# sees them; a BMesh is measured by the process's resident size instead)
+# and seconds, and exits non-zero if the two paths disagree.
+
+import os
+import sys
+import gc
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(__file__))
+import bench
+from bench import meshlint, numpy
+from meshlint import MeshTopology, MeshLintEngine, MeshLintStream
+
+try:
+    import bpy
+    import bmesh
+except ImportError:
+    bpy = None
+
+LINTS = [ lint for lint in MeshLintEngine.CHECKS
+          if lint['symbol'] in MeshLintStream.FACE_CHECKS
+                               + MeshLintStream.EDGE_CHECKS ]
+
+
+def write_ply(path, coords, offsets, loops):
+    sizes = numpy.diff(offsets)
+    with open(path, 'wb') as out:
+        out.write(('ply\nformat binary_little_endian 1.0\n'
+                   'element vertex %d\nproperty float x\nproperty float y\n'
+                   'property float z\nelement face %d\n'
+                   'property list uchar int vertex_indices\nend_header\n'
+                   % (len(coords) // 3, len(sizes))).encode('ascii'))
+        out.write(numpy.asarray(coords, '<f4').tobytes())
+        for at in range(0, len(sizes), 65536):
+            chunk = sizes[at:at + 65536]
+            starts = offsets[at:at + len(chunk)]
+            rows = []
+            for f in range(len(chunk)):
+                rows.append(numpy.uint8(chunk[f]).tobytes())
+                rows.append(numpy.asarray(
+                    loops[starts[f]:starts[f] + chunk[f]], '<i4').tobytes())
+            out.write(b''.join(rows))
+
+
+def summary(analysis):
+    return [ [ report[elemtype].tolist() for elemtype in meshlint.ELEM_TYPES ]
+             for report in analysis ]
+
+
+def whole(path):
+    source = meshlint.open_face_source(path)
+    offsets = numpy.zeros(1, numpy.int64)
+    loops = []
+    for sizes, loop_verts in source.face_chunks(meshlint.STREAM_CHUNK_FACES):
+        offsets = numpy.append(offsets, offsets[-1] + numpy.cumsum(sizes))
+        loops.append(loop_verts)
+    topology = MeshTopology.from_loops(
+        source.coords(), offsets, numpy.concatenate(loops))
+    return summary(MeshLintEngine(topology).analyze(LINTS, 'NUMPY'))
+
+
+def streamed(path):
+    return summary(MeshLintStream(meshlint.open_face_source(path))
+                   .analyze(LINTS))
+
+
+def resident_bytes():
+    with open('/proc/self/statm') as statm:
+        return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+
+def bmesh_bytes(path):
+    'How much a BMesh of the mesh in `path` adds to the resident size.'
+    source = meshlint.open_face_source(path)
+    coords = source.coords().reshape(-1, 3)
+    faces = []
+    for sizes, loop_verts in source.face_chunks(meshlint.STREAM_CHUNK_FACES):
+        starts = numpy.cumsum(sizes) - sizes
+        faces += [ loop_verts[start:start + size].tolist()
+                   for start, size in zip(starts, sizes) ]
+    mesh = bpy.data.meshes.new('BenchStream')
+    mesh.from_pydata(coords.tolist(), [], faces)
+    del faces
+    gc.collect()
+    before = resident_bytes()
+    b = bmesh.new()
+    b.from_mesh(mesh)
+    grown = resident_bytes() - before
+    b.free()
+    bpy.data.meshes.remove(mesh)
+    return grown
+
+
+def measure(run, path):
+    gc.collect()
+    tracemalloc.start()
+    started = time.time()
+    found = run(path)
+    elapsed = time.time() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return found, peak, elapsed
+
+
+def main(args):
+    parser = argparse.ArgumentParser(prog='bench_stream.py')
+    parser.add_argument('--sizes', default='100000,1000000')
+    parser.add_argument('--meshes', default='grid,soup')
+    opts = parser.parse_args(args)
+    makers = dict(bench.MESHES)
+    directory = tempfile.mkdtemp()
+    agree = True
+    try:
+        for size in opts.sizes.split(','):
+            for name in opts.meshes.split(','):
+                path = os.path.join(directory, '%s-%s.ply' % (name, size))
+                coords, offsets, loops = makers[name](int(size))
+                write_ply(path, coords, offsets, loops)
+                faces = len(offsets) - 1
+                del coords, offsets, loops
+                expected = None
+                for method, run in ('whole', whole), ('streamed', streamed):
+                    found, peak, elapsed = measure(run, path)
+                    if None is expected:
+                        expected = found
+                    agree = agree and found == expected
+                    print(json.dumps({
+                        'mesh': name,
+                        'faces': faces,
+                        'method': method,
+                        'peak_bytes': peak,
+                        'matches_whole': found == expected,
+                        'seconds': elapsed }))
+                if not None is bpy:
+                    print(json.dumps({
+                        'mesh': name,
+                        'faces': faces,
+                        'method': 'bmesh',
+                        'resident_bytes': bmesh_bytes(path) }))
+    finally:
+        shutil.rmtree(directory)
+    return 0 if agree else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main(meshlint.script_args() if 'bpy' in sys.modules
+                  else sys.argv[1:]))
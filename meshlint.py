@@ -1,14 +1,4 @@
 # TODO:
-#  - Exempt mirror-plane verts. You should not get penalized for them.
-#  - Check for intersected faces??
-#   - Would probably be O(n^m) or something.
-#   - Would need to check the post-modified mesh (e.g., Armature-deformed)
-#  - Coplanar check, especially good for Ngons.
-#  - Check Normal consistency? I've had several people request this, though I
-#    still feel like the Ctrl+n tool has problems solving it, so I am
-#    unconfident that I will be able to do as good or better. It is true,
-#    though, that you can simply allow the user to enable the check, and if it
-#    is acting wonky they can disable it.
 #  - Consider adding to the 'n' Properties Panel instead of Object Data. Or,
 #    perhaps, a user preference.
 #  - Maybe add a "Skip to Next" option. So far at least 1 user has reported
@@ -35,18 +25,3031 @@ mkblenderwiki_info = {
     "input_img_prefix": "meshlint/raw/master/img/",
     "wiki_img_prefix": "Scripts-Modeling-MeshLint-"}
 
+import os
+import sys
+import time
+import zlib
+import json
+import mmap
+import queue
+import bisect
+import functools
+import struct
+import hashlib
+import threading
+import collections
+from array import array
+
+# Optional. With it, the 'NumPy' backend checks whole arrays at a time;
+# without it, everything still runs on the plain Python one. Importing it
+# takes longer than all the rest of MeshLint, so that waits until
+# has_numpy() is first asked.
+numpy = None
+numpy_missing = False
+
+
+def script_args():
+    'Blender hands whatever follows "--" on its command line to the script.'
+    if '--' in sys.argv:
+        return sys.argv[sys.argv.index('--') + 1:]
+    return []
+
+
+# Everything from here to the "try: import bpy" needs nothing but Python, so
+# the checks can run (and be profiled) outside of Blender.
+
+ELEM_TYPES = [ 'verts', 'edges', 'faces' ]
+
+# What a check can read (its 'inputs'): the connectivity, the verts where
+# the mesh has them, or where its modifiers leave them.
+CHECK_INPUTS = [ 'topology', 'coords', 'evaluated' ]
+
+# What a check costs (its 'cost'), cheapest first, which is the order they
+# run in: a look at the element itself, a pass over the mesh, or a search
+# or walk across it.
+COST_CLASSES = [ 'cheap', 'linear', 'heavy' ]
+
+# How many elements a split-up lint pass visits between looks at the clock.
+PASS_CHUNK_SIZE = 2048
+
+# How many tris a TriangleBVH packs into each leaf.
+BVH_LEAF_SIZE = 4
+
+# How many faces a mesh needs before the Inconsistent Normals check shares
+# its islands out between worker processes; forking costs more than that.
+PARALLEL_MIN_FACES = 100000
+
+# How far out of its best-fit plane a face's corner may stick, as a fraction
+# of the face's size, before it counts as Noncoplanar.
+COPLANAR_TOLERANCE = 0.01
+
+# How many faces MeshLintStream reads in at a time.
+STREAM_CHUNK_FACES = 1 << 18
+
+# How much memory a MeshLintResultCache may fill up with results, by default.
+RESULT_CACHE_BYTES = 64 * 1024 * 1024
+
+# What check profiling times with: finer-grained than time.time() where
+# Python has it (3.3 and up).
+PROFILE_CLOCK = getattr(time, 'perf_counter', time.time)
+
+BACKENDS = [
+    ('PYTHON', 'Python', 'Check the mesh one element at a time'),
+    ('NUMPY', 'NumPy',
+        'Check whole arrays at a time. Much faster on big meshes; '
+        'needs NumPy'),
+]
+
+REPORT_FORMATS = [
+    ('JSONL', 'JSON Lines',
+        'A JSON object per line, one for every check of every object'),
+    ('JUNIT', 'JUnit XML',
+        'A test suite per object, with a test case per check that fails '
+        'where the check found lint'),
+]
+
+# How many elements a MeshLintReportWriter writes out at a time.
+REPORT_CHUNK_SIZE = 4096
+
+
+def has_numpy():
+    '''Whether NumPy is there, importing it the first time. Call this before
+    anything that uses `numpy`.'''
+    global numpy, numpy_missing
+    if None is numpy and not numpy_missing:
+        try:
+            import numpy
+        except ImportError:
+            numpy_missing = True
+    return not None is numpy
+
+
+def mask_indices(mask):
+    'The positions of the set entries of a selection_masks() mask.'
+    if has_numpy():
+        return numpy.flatnonzero(mask).tolist()
+    indices = []
+    i = mask.find(1)
+    while -1 != i:
+        indices.append(i)
+        i = mask.find(1, i + 1)
+    return indices
+
+
+def index_array(indices):
+    '''A NumPy array of LintIndices (without copying) or of any other
+    sequence of indices.'''
+    if isinstance(indices, LintIndices):
+        return indices.view()
+    return numpy.asarray(indices, numpy.int64)
+
+
+class LintIndices:
+    '''The elements of one type that one check complained about: sorted,
+    each once, and packed 4 bytes apiece instead of a list of Python ints.
+
+    Reads like a list that cannot be changed: len(), iteration, indexing,
+    `in`, and == against any sequence of the same indices. | and - give
+    the union and the difference as new LintIndices.'''
+
+    __slots__ = ('indices',)
+
+    def __init__(self, indices=()):
+        'From indices that are sorted and repeat-free already.'
+        if isinstance(indices, array) and 'I' == indices.typecode:
+            self.indices = indices
+        elif has_numpy() and isinstance(indices, numpy.ndarray):
+            self.indices = array('I', numpy.ascontiguousarray(
+                indices, numpy.uintc).tobytes())
+        else:
+            self.indices = array('I', indices)
+
+    @classmethod
+    def from_mask(cls, mask):
+        'From a boolean NumPy array, or bytearray, with an entry per element.'
+        if has_numpy():
+            return cls(numpy.flatnonzero(mask))
+        return cls(mask_indices(mask))
+
+    def view(self):
+        'The indices as a NumPy array sharing their memory.'
+        if not len(self.indices):
+            return numpy.zeros(0, numpy.uintc)
+        return numpy.frombuffer(self.indices, numpy.uintc)
+
+    def tolist(self):
+        return self.indices.tolist()
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __iter__(self):
+        return iter(self.indices)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return LintIndices(self.indices[i])
+        return self.indices[i]
+
+    def __contains__(self, i):
+        at = bisect.bisect_left(self.indices, i)
+        return at < len(self.indices) and i == self.indices[at]
+
+    def __eq__(self, other):
+        if isinstance(other, LintIndices):
+            return self.indices == other.indices
+        try:
+            return len(self) == len(other) \
+                and all(a == b for a, b in zip(self.indices, other))
+        except TypeError:
+            return NotImplemented
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if NotImplemented is equal else not equal
+
+    __hash__ = None
+
+    def __or__(self, other):
+        if has_numpy():
+            return LintIndices(numpy.union1d(self.view(), index_array(other)))
+        return LintIndices(sorted(set(self.indices).union(other)))
+
+    def __sub__(self, other):
+        if has_numpy():
+            return LintIndices(numpy.setdiff1d(
+                self.view(), index_array(other), assume_unique=True))
+        other = set(other)
+        return LintIndices(i for i in self.indices if not i in other)
+
+    def __repr__(self):
+        return 'LintIndices(%r)' % self.indices.tolist()
+
+
+def depluralize(**args):
+    if 1 == args['count']:
+        return args['string'].rstrip('s')
+    else:
+        return args['string']
+
+
+def format_profile(profile):
+    '''One line per lint for a MeshLintEngine.profile, slowest first.'''
+    lines = []
+    labels = { lint['symbol']: lint['label']
+               for lint in MeshLintEngine.CHECKS }
+    for sym, stats in sorted(profile.items(),
+                             key=lambda item: -item[1]['seconds']):
+        if stats['cached']:
+            timing = 'unchanged, not re-checked'
+        else:
+            timing = '%.2f ms over %d elements' % (
+                1000 * stats['seconds'], stats['visited'])
+        lines.append('%s: %s, %d found' % (
+            labels.get(sym, sym), timing, stats['found']))
+    return lines
+
+
+def spread_bits(x):
+    '''Moves the low 10 bits of x (an int, or a NumPy uint64 array) to every
+    third bit, so three of them OR together into a Z-order curve position.'''
+    x = (x | (x << 16)) & 0x030000FF
+    x = (x | (x << 8)) & 0x0300F00F
+    x = (x | (x << 4)) & 0x030C30C3
+    x = (x | (x << 2)) & 0x09249249
+    return x
+
+
+def segment_hits_triangle(p, q, a, b, c):
+    '''Whether the segment from p to q passes through the triangle abc
+    (Moller-Trumbore). Touching it, or lying in its plane, does not count.'''
+    e1 = [ b[i] - a[i] for i in range(3) ]
+    e2 = [ c[i] - a[i] for i in range(3) ]
+    d = [ q[i] - p[i] for i in range(3) ]
+    h = [ d[1] * e2[2] - d[2] * e2[1],
+          d[2] * e2[0] - d[0] * e2[2],
+          d[0] * e2[1] - d[1] * e2[0] ]
+    det = sum(e1[i] * h[i] for i in range(3))
+    if 0 == det:
+        return False
+    s = [ p[i] - a[i] for i in range(3) ]
+    u = sum(s[i] * h[i] for i in range(3)) / det
+    if not 0 < u < 1:
+        return False
+    k = [ s[1] * e1[2] - s[2] * e1[1],
+          s[2] * e1[0] - s[0] * e1[2],
+          s[0] * e1[1] - s[1] * e1[0] ]
+    v = sum(d[i] * k[i] for i in range(3)) / det
+    t = sum(e2[i] * k[i] for i in range(3)) / det
+    return 0 < v and u + v < 1 and 0 < t < 1
+
+
+def triangles_intersect(mine, theirs):
+    'Whether either triangle (3 corners each) has an edge through the other.'
+    for one, other in (mine, theirs), (theirs, mine):
+        for i in range(3):
+            if segment_hits_triangle(one[i], one[(i + 1) % 3], *other):
+                return True
+    return False
+
+
+def segments_hit_triangles(p, q, a, b, c):
+    'segment_hits_triangle() over (N, 3) NumPy arrays, pair by pair.'
+    e1 = b - a
+    e2 = c - a
+    d = q - p
+    h = numpy.cross(d, e2)
+    det = numpy.einsum('ij,ij->i', e1, h)
+    hits = 0 != det
+    det[~hits] = 1
+    s = p - a
+    u = numpy.einsum('ij,ij->i', s, h) / det
+    k = numpy.cross(s, e1)
+    v = numpy.einsum('ij,ij->i', d, k) / det
+    t = numpy.einsum('ij,ij->i', e2, k) / det
+    return hits & (0 < u) & (u < 1) & (0 < v) & (u + v < 1) \
+        & (0 < t) & (t < 1)
+
+
+def island_sizes(links):
+    '''The islands of faces that `links` (see MeshTopology.face_links())
+    joins up, as { first face: how many faces }, labelled with a
+    union-find in which every face points at a lower one of its island, or
+    at itself. It takes about half as long as walking them.'''
+    parent = list(range(len(links)))
+    for f, linked in enumerate(links):
+        for g, same in linked:
+            # Every link is listed from both of its faces.
+            if f < g:
+                continue
+            # Finding the roots inline, halving the paths up to them, is
+            # what makes this cheaper than the walk.
+            a = f
+            while parent[a] != a:
+                parent[a] = parent[parent[a]]
+                a = parent[a]
+            b = g
+            while parent[b] != b:
+                parent[b] = parent[parent[b]]
+                b = parent[b]
+            if a < b:
+                parent[b] = a
+            elif b < a:
+                parent[a] = b
+    sizes = {}
+    for f in range(len(links)):
+        # Lower faces already point at their roots.
+        first = parent[parent[f]]
+        parent[f] = first
+        sizes[first] = sizes.get(first, 0) + 1
+    return sizes
+
+
+def flipped_in_islands(links, seeds):
+    '''Orients the islands of faces that `links` (see
+    MeshTopology.face_links()) joins up, each against its first face, with a
+    breadth-first walk from it. Only the islands of `seeds`, their first
+    faces, are walked (or of every face, as the first face of its island
+    comes before the rest). Returns the faces winding against most of their
+    island; on a tie, against its first face. Islands that cannot be
+    oriented at all, like a Moebius strip, are left out.'''
+    flips = {}
+    flipped = []
+    for seed in seeds:
+        if seed in flips:
+            continue
+        flips[seed] = False
+        island = [ seed ]
+        orientable = True
+        # The walk goes on as long as faces are appended to the island.
+        for f in island:
+            for g, same in links[f]:
+                flip = flips[f] != same
+                if not g in flips:
+                    flips[g] = flip
+                    island.append(g)
+                elif flips[g] != flip:
+                    orientable = False
+        if not orientable:
+            continue
+        against = [ f for f in island if flips[f] ]
+        if len(island) < 2 * len(against):
+            against = [ f for f in island if not flips[f] ]
+        flipped.extend(against)
+    return flipped
+
+
+# The face links a forked worker of MeshTopology.flipped_faces() walks.
+forked_links = None
+
+def adopt_forked_links(links):
+    global forked_links
+    forked_links = links
+
+def flipped_in_forked_islands(seeds):
+    return flipped_in_islands(forked_links, seeds)
+
+
+def fork_pool(workers, links):
+    '''A multiprocessing Pool of `workers` forks of this process, which
+    start out with `links` without it being copied over. None where there is
+    no fork() (on Windows, a worker would be a whole new Blender).'''
+    if not hasattr(os, 'fork'):
+        return None
+    import multiprocessing
+    if hasattr(multiprocessing, 'get_context'):
+        multiprocessing = multiprocessing.get_context('fork')
+    return multiprocessing.Pool(workers, adopt_forked_links, (links,))
+
+
+def count_changes(before, after):
+    '''How many indices are in `after` but not `before`, and the other way
+    round. Both must be sorted without repeats, as reports are. One walk
+    along both; with NumPy, long ones are marked off in a bitset instead.'''
+    if has_numpy() and PASS_CHUNK_SIZE < len(before) + len(after):
+        before = index_array(before)
+        after = index_array(after)
+        if not len(before) or not len(after):
+            return len(after), len(before)
+        marked = numpy.zeros(max(before[-1], after[-1]) + 1, bool)
+        marked[before] = True
+        kept = int(numpy.count_nonzero(marked[after]))
+        return len(after) - kept, len(before) - kept
+    i = j = kept = 0
+    while i < len(before) and j < len(after):
+        if before[i] < after[j]:
+            i += 1
+        elif after[j] < before[i]:
+            j += 1
+        else:
+            kept += 1
+            i += 1
+            j += 1
+    return len(after) - kept, len(before) - kept
+
+
+def pull_attribute(collection, attr, typecode, width):
+    'An attribute of every item of a bpy collection, in bulk (foreach_get).'
+    flat = array(typecode, [0]) * (len(collection) * width)
+    collection.foreach_get(attr, flat)
+    return flat
+
+
+def edge_keys(a, b):
+    '''The edges from verts a to verts b (NumPy arrays) as uint64 keys, the
+    lower vert in the upper half, so that sorting keys sorts edges by
+    their verts.'''
+    a = a.astype(numpy.uint64)
+    b = b.astype(numpy.uint64)
+    return (numpy.minimum(a, b) << numpy.uint64(32)) | numpy.maximum(a, b)
+
+
+def find_roots(parent, x):
+    '''The root of each of `x` in the union-find forest `parent` (a NumPy
+    array, every entry pointing at a lower one or at itself), with all of
+    them climbing at once.'''
+    roots = parent[x]
+    while True:
+        up = parent[roots]
+        if numpy.array_equal(up, roots):
+            return roots
+        roots = up
+
+
+def union_pairs(parent, a, b):
+    '''Joins the sets of a[i] and b[i], for every i, in the union-find
+    forest `parent`. Each round hangs the higher of two roots under the
+    lower one, so there can be no cycles; pairs that are still apart
+    (because a root got hung under two others at once) go round again.'''
+    while len(a):
+        ra = find_roots(parent, a)
+        rb = find_roots(parent, b)
+        parent[a] = ra
+        parent[b] = rb
+        apart = ra != rb
+        a, b, ra, rb = a[apart], b[apart], ra[apart], rb[apart]
+        parent[numpy.maximum(ra, rb)] = numpy.minimum(ra, rb)
+
+
+class MeshTopology:
+    '''A compact, Blender-free copy of what the checks look at.
+
+    Flat stdlib arrays, laid out like Blender's own Mesh:
+     - coords: x, y, z of every vert
+     - face_offsets: where each face starts in face_verts, plus one more
+       entry for where the last face ends
+     - face_verts: the vert of every loop (face corner)
+     - face_edges: the edge from every loop's vert to the next loop's
+     - edges: both verts of every edge
+
+    The adjacency the checks need is derived lazily, once, `shared` keeps
+    the tables checks share (see MeshLintEngine.shared()), and `memo` keeps
+    finished check results, so a topology that is kept around (see
+    adopt_coords()) gets cheaper every time it is linted again.
+
+    mirror_planes are the planes a Mirror modifier reflects the mesh
+    across, as ((x, y, z) on the plane, unit normal, threshold) in the
+    mesh's own space; on_mirror_plane marks the verts within threshold of
+    any of them (see set_mirror_planes()).
+
+    name and library say which mesh datablock it was read from (library
+    being the path of the .blend it is linked from, if it is).'''
+
+    def __init__(self, coords, face_offsets, face_verts, face_edges, edges,
+                 name=None, library=None):
+        self.coords = coords
+        self.face_offsets = face_offsets
+        self.face_verts = face_verts
+        self.face_edges = face_edges
+        self.edges = edges
+        self.name = name
+        self.library = library
+        self.num_verts = len(coords) // 3
+        self.num_edges = len(edges) // 2
+        self.num_faces = len(face_offsets) - 1
+        self._edge_face_counts = None
+        self._valences = None
+        self._loop_faces = None
+        self._vert_edges = None
+        self._vert_loops = None
+        self._arrays = None
+        self._fingerprint = None
+        self._triangles = None
+        self._bvh = None
+        self._face_links = None
+        self._flipped = None
+        self._digests = None
+        self.memo = {}
+        self.shared = {}
+        self.mirror_planes = ()
+        self.on_mirror_plane = None
+        self.options = {}
+
+    @classmethod
+    def from_faces(cls, coords, faces, loose_edges=()):
+        '''From a list of (x, y, z) and a list of vert index tuples. Edges
+        are numbered as they are first met, loose_edges first.'''
+        flat_coords = array('f')
+        for co in coords:
+            flat_coords.extend(co)
+        edges = array('i')
+        edge_indices = {}
+        def edge_index(a, b):
+            key = (min(a, b), max(a, b))
+            if not key in edge_indices:
+                edge_indices[key] = len(edge_indices)
+                edges.extend(key)
+            return edge_indices[key]
+        for a, b in loose_edges:
+            edge_index(a, b)
+        face_offsets = array('i', [0])
+        face_verts = array('i')
+        face_edges = array('i')
+        for face in faces:
+            for i, v in enumerate(face):
+                face_verts.append(v)
+                face_edges.append(edge_index(v, face[(i + 1) % len(face)]))
+            face_offsets.append(len(face_verts))
+        return cls(flat_coords, face_offsets, face_verts, face_edges, edges)
+
+    @classmethod
+    def from_loops(cls, coords, face_offsets, face_verts):
+        '''From flat coords, face_offsets and face_verts, laid out as above,
+        working out the edges. With NumPy that takes no Python loop, and
+        edges are numbered in order of their verts instead.'''
+        if not has_numpy():
+            faces = [ face_verts[face_offsets[f]:face_offsets[f + 1]]
+                      for f in range(len(face_offsets) - 1) ]
+            return cls.from_faces(zip(*[iter(coords)] * 3), faces)
+        def flat(typecode, values, dtype):
+            return array(typecode, numpy.ascontiguousarray(
+                values, dtype).tobytes())
+        offsets = numpy.asarray(face_offsets, numpy.int64)
+        loop_verts = numpy.asarray(face_verts, numpy.int64)
+        num_verts = len(coords) // 3
+        following = numpy.arange(1, len(loop_verts) + 1)
+        following[offsets[1:] - 1] = offsets[:-1]
+        ends = loop_verts[following]
+        keys = numpy.minimum(loop_verts, ends) * num_verts \
+            + numpy.maximum(loop_verts, ends)
+        keys, loop_edges = numpy.unique(keys, return_inverse=True)
+        edges = numpy.column_stack((keys // num_verts, keys % num_verts))
+        return cls(flat('f', coords, numpy.float32),
+                   flat('i', offsets, numpy.intc),
+                   flat('i', loop_verts, numpy.intc),
+                   flat('i', loop_edges.ravel(), numpy.intc),
+                   flat('i', edges, numpy.intc))
+
+    @classmethod
+    def from_mesh(cls, mesh):
+        '''From a bpy Mesh via foreach_get, so with no Python loop over the
+        elements. In Edit Mode, Object.update_from_editmode() first.'''
+        pull = pull_attribute
+        face_offsets = pull(mesh.polygons, 'loop_start', 'i', 1)
+        face_offsets.append(len(mesh.loops))
+        return cls(
+            pull(mesh.vertices, 'co', 'f', 3),
+            face_offsets,
+            pull(mesh.loops, 'vertex_index', 'i', 1),
+            pull(mesh.loops, 'edge_index', 'i', 1),
+            pull(mesh.edges, 'vertices', 'i', 2),
+            name=mesh.name,
+            library=mesh.library.filepath if mesh.library else None)
+
+    def count(self, elemtype):
+        return {
+            'verts': self.num_verts,
+            'edges': self.num_edges,
+            'faces': self.num_faces }[elemtype]
+
+    def face_size(self, f):
+        return self.face_offsets[f + 1] - self.face_offsets[f]
+
+    def face_loops(self, f):
+        return range(self.face_offsets[f], self.face_offsets[f + 1])
+
+    def edge_face_counts(self):
+        if None is self._edge_face_counts:
+            counts = [0] * self.num_edges
+            for e in self.face_edges:
+                counts[e] += 1
+            self._edge_face_counts = counts
+        return self._edge_face_counts
+
+    def adopt_edge_face_counts(self, counts):
+        '''Takes edge_face_counts() worked out before (and kept in a
+        MeshLintTopologyCache, say), as a flat int array.'''
+        self._edge_face_counts = counts
+        if has_numpy():
+            self.arrays()._edge_face_counts = MeshLintArrays.view(
+                counts, numpy.intc)
+
+    def valences(self):
+        if None is self._valences:
+            valences = [0] * self.num_verts
+            for v in self.edges:
+                valences[v] += 1
+            self._valences = valences
+        return self._valences
+
+    def loop_faces(self):
+        if None is self._loop_faces:
+            faces = []
+            for f in range(self.num_faces):
+                faces.extend([f] * self.face_size(f))
+            self._loop_faces = faces
+        return self._loop_faces
+
+    def vert_edges(self):
+        if None is self._vert_edges:
+            linked = [ [] for v in range(self.num_verts) ]
+            for i, v in enumerate(self.edges):
+                linked[v].append(i // 2)
+            self._vert_edges = linked
+        return self._vert_edges
+
+    def vert_loops(self):
+        if None is self._vert_loops:
+            linked = [ [] for v in range(self.num_verts) ]
+            for i, v in enumerate(self.face_verts):
+                linked[v].append(i)
+            self._vert_loops = linked
+        return self._vert_loops
+
+    def previous_loop(self, i):
+        f = self.loop_faces()[i]
+        if i > self.face_offsets[f]:
+            return i - 1
+        return self.face_offsets[f + 1] - 1
+
+    def fans_at(self, v):
+        '''How many separate fans of faces meet at v: the corners at v,
+        joined wherever two of their faces share an edge.'''
+        corners = self.vert_loops()[v]
+        parent = { i: i for i in corners }
+        def root(i):
+            while parent[i] != i:
+                i = parent[i]
+            return i
+        first_corner_at = {}
+        for i in corners:
+            for e in self.face_edges[i], \
+                     self.face_edges[self.previous_loop(i)]:
+                if e in first_corner_at:
+                    parent[root(i)] = root(first_corner_at[e])
+                else:
+                    first_corner_at[e] = i
+        return len(set(root(i) for i in corners))
+
+    def fingerprint(self):
+        '''A cheap checksum of the connectivity. Coordinates are left out;
+        see adopt_coords().'''
+        if None is self._fingerprint:
+            crc = 0
+            for flat in self.face_offsets, self.face_verts, \
+                    self.face_edges, self.edges:
+                crc = zlib.crc32(flat, crc)
+            self._fingerprint = (
+                self.num_verts, self.num_edges, self.num_faces, crc)
+        return self._fingerprint
+
+    def result_key(self, lint):
+        '''What a MeshLintResultCache files `lint`'s results on this
+        topology under: a digest of the datablock, the connectivity, the
+        mirror planes and the options the lint reads, and of the coords if
+        the results can hang on them.'''
+        if None is self._digests:
+            shape = hashlib.sha1(repr((
+                self.name, self.library, self.fingerprint(),
+                self.mirror_planes)).encode('utf-8'))
+            placed = shape.copy()
+            placed.update(self.coords)
+            self._digests = shape, placed
+        shape, placed = self._digests
+        if reads_coords(lint) or len(self.mirror_planes):
+            digest = placed.copy()
+        else:
+            digest = shape.copy()
+        digest.update(lint['symbol'].encode('utf-8'))
+        for name in lint.get('options', ()):
+            value = self.options.get(name)
+            digest.update((';%s=' % name).encode('utf-8'))
+            if isinstance(value, (array, memoryview)):
+                digest.update(value)
+            else:
+                digest.update(repr(value).encode('utf-8'))
+        return digest.hexdigest()
+
+    def adopt_coords(self, fresh):
+        '''Takes over the coordinates of `fresh`, a re-read of the same
+        connectivity, keeping all derived adjacency. Memoized results are
+        dropped only if the verts actually moved.'''
+        if zlib.crc32(self.coords) != zlib.crc32(fresh.coords):
+            self.coords = fresh.coords
+            self.memo = {}
+            self.shared = {}
+            self._digests = None
+            if not None is self._arrays:
+                self._arrays.coords = MeshLintArrays.view(
+                    self.coords, numpy.float32).reshape(-1, 3)
+                self._arrays.shared = {}
+            if len(self.mirror_planes):
+                self.on_mirror_plane = self.mirror_mask()
+
+    def set_option(self, name, value):
+        '''Options tune checks (the lints in MeshLintEngine.CHECKS list the
+        ones they read under 'options'). Changing one drops the memoized
+        results of just those checks.'''
+        if name in self.options and value == self.options[name]:
+            return
+        self.options[name] = value
+        for lint in MeshLintEngine.CHECKS:
+            if name in lint.get('options', ()):
+                self.memo.pop(lint['symbol'], None)
+
+    def set_mirror_planes(self, planes):
+        '''Memoized results are dropped if the planes are different.'''
+        planes = tuple(planes)
+        if planes == self.mirror_planes:
+            return
+        self.mirror_planes = planes
+        self.memo = {}
+        self._digests = None
+        self.on_mirror_plane = self.mirror_mask() if len(planes) else None
+
+    def mirror_mask(self):
+        '''Which verts lie on a mirror plane: a NumPy bool array, or a
+        bytearray without NumPy.'''
+        if has_numpy():
+            coords = MeshLintArrays.view(
+                self.coords, numpy.float32).reshape(-1, 3)
+            on_plane = numpy.zeros(self.num_verts, bool)
+            for origin, normal, threshold in self.mirror_planes:
+                distances = coords.dot(numpy.asarray(normal, numpy.float32))
+                distances -= numpy.dot(origin, normal)
+                on_plane |= numpy.abs(distances) <= threshold
+            return on_plane
+        on_plane = bytearray(self.num_verts)
+        for origin, normal, threshold in self.mirror_planes:
+            offset = sum(o * n for o, n in zip(origin, normal))
+            nx, ny, nz = normal
+            coords = self.coords
+            for v in range(self.num_verts):
+                distance = coords[3 * v] * nx + coords[3 * v + 1] * ny \
+                    + coords[3 * v + 2] * nz - offset
+                if abs(distance) <= threshold:
+                    on_plane[v] = 1
+        return on_plane
+
+    def selection_masks(self, analysis):
+        '''What selecting `analysis` comes to: every reported element, the
+        edges of reported faces and the verts of reported and implied
+        edges, each marked once. A mask (NumPy bool array, or bytearray
+        without NumPy) per element type.'''
+        if has_numpy():
+            return self.arrays().selection_masks(analysis)
+        masks = { elemtype: bytearray(self.count(elemtype))
+                  for elemtype in ELEM_TYPES }
+        faces, edges, verts = masks['faces'], masks['edges'], masks['verts']
+        picked_edges = []
+        picked_verts = []
+        for report in analysis:
+            picked_edges.extend(report['edges'])
+            picked_verts.extend(report['verts'])
+            for f in report['faces']:
+                if not faces[f]:
+                    faces[f] = 1
+                    picked_edges.extend(self.face_edges[
+                        self.face_offsets[f]:self.face_offsets[f + 1]])
+        for e in picked_edges:
+            if not edges[e]:
+                edges[e] = 1
+                picked_verts.extend(self.edges[2 * e:2 * e + 2])
+        for v in picked_verts:
+            verts[v] = 1
+        return masks
+
+    def face_links(self):
+        '''The edge->face table, turned around: for every face, the faces
+        it shares a manifold edge with (one with exactly 2 faces), each as
+        (face, whether the two wind the same way along the edge, which means
+        one of them is flipped).'''
+        if None is self._face_links:
+            counts = self.edge_face_counts()
+            loop_faces = self.loop_faces()
+            first_loops = {}
+            links = [ [] for f in range(self.num_faces) ]
+            for i, e in enumerate(self.face_edges):
+                if 2 != counts[e]:
+                    continue
+                if not e in first_loops:
+                    first_loops[e] = i
+                    continue
+                j = first_loops[e]
+                f, g = loop_faces[j], loop_faces[i]
+                if f != g:
+                    same = self.face_verts[i] == self.face_verts[j]
+                    links[f].append((g, same))
+                    links[g].append((f, same))
+            self._face_links = links
+        return self._face_links
+
+    def flipped_faces(self, workers=1):
+        '''A mask of the faces winding against most of their island (see
+        flipped_in_islands()). With more than one of `workers`, the islands
+        of a big mesh are dealt out whole between that many forked processes,
+        biggest first, to whichever has the fewest faces so far. A mesh in
+        one piece is walked right here.'''
+        if None is self._flipped:
+            links = self.face_links()
+            pool = None
+            if 1 < workers and PARALLEL_MIN_FACES <= self.num_faces:
+                islands = island_sizes(links)
+                workers = min(workers, len(islands))
+                if 1 < workers:
+                    pool = fork_pool(workers, links)
+            if None is pool:
+                flipped = flipped_in_islands(links, range(self.num_faces))
+            else:
+                shares = [ [] for worker in range(workers) ]
+                loads = [0] * workers
+                for seed in sorted(islands, key=islands.get, reverse=True):
+                    lightest = loads.index(min(loads))
+                    shares[lightest].append(seed)
+                    loads[lightest] += islands[seed]
+                try:
+                    flipped = [ f for found in pool.map(
+                                    flipped_in_forked_islands, shares)
+                                for f in found ]
+                finally:
+                    pool.terminate()
+            mask = bytearray(self.num_faces)
+            for f in flipped:
+                mask[f] = 1
+            self._flipped = mask
+        return self._flipped
+
+    def triangles(self):
+        '''A fan of tris over every face: their verts, 3 apiece, and the face
+        each one came from. Face f's tris start at face_offsets[f] - 2 * f.'''
+        if None is self._triangles:
+            tris = array('i')
+            tri_faces = array('i')
+            for f in range(self.num_faces):
+                loops = self.face_loops(f)
+                first = self.face_verts[loops[0]]
+                for i in loops[1:-1]:
+                    tris.extend((first, self.face_verts[i],
+                                 self.face_verts[i + 1]))
+                    tri_faces.append(f)
+            self._triangles = tris, tri_faces
+        return self._triangles
+
+    def triangle_bvh(self, coords):
+        '''A TriangleBVH over triangles() at `coords`. It is kept, and when
+        asked for at other coords, refitted, or rebuilt if the 'refit_bvh'
+        option is off.'''
+        if None is self._bvh or not self.options.get('refit_bvh', True):
+            if None is self._bvh or not self._bvh.coords is coords:
+                self._bvh = TriangleBVH(self.triangles()[0], coords)
+        elif not self._bvh.coords is coords:
+            self._bvh.refit(coords)
+        return self._bvh
+
+    def arrays(self):
+        'The same topology as NumPy arrays (needs NumPy).'
+        if None is self._arrays:
+            self._arrays = MeshLintArrays(self)
+        return self._arrays
+
+
+class MeshLintArrays:
+    '''Zero-copy NumPy views of a MeshTopology, for the 'NumPy' backend.
+
+    Everything derived from it (edge face counts, valences, ...) is
+    computed lazily and kept, so checks that need the same thing share
+    the work.'''
+
+    def __init__(self, topology):
+        self.num_verts = topology.num_verts
+        self.coords = self.view(topology.coords, numpy.float32).reshape(-1, 3)
+        offsets = self.view(topology.face_offsets, numpy.intc)
+        self.loop_starts = offsets[:-1]
+        self.loop_totals = numpy.diff(offsets)
+        self.loop_verts = self.view(topology.face_verts, numpy.intc)
+        self.loop_edges = self.view(topology.face_edges, numpy.intc)
+        self.edge_verts = self.view(topology.edges, numpy.intc).reshape(-1, 2)
+        self._edge_face_counts = None
+        self._valences = None
+        self._triangles = None
+        self._bvh = None
+        self._face_links = None
+        self.shared = {}
+
+    @classmethod
+    def view(cls, flat, dtype):
+        if not len(flat):
+            return numpy.zeros(0, dtype)
+        return numpy.frombuffer(flat, dtype)
+
+    def edge_face_counts(self):
+        if None is self._edge_face_counts:
+            self._edge_face_counts = numpy.bincount(
+                self.loop_edges, minlength=len(self.edge_verts))
+        return self._edge_face_counts
+
+    def valences(self):
+        if None is self._valences:
+            self._valences = numpy.bincount(
+                self.edge_verts.ravel(), minlength=self.num_verts)
+        return self._valences
+
+    def faces_of_loops(self):
+        return numpy.repeat(
+            numpy.arange(len(self.loop_totals)), self.loop_totals)
+
+    def loops_of(self, faces):
+        totals = self.loop_totals[faces]
+        firsts = numpy.repeat(self.loop_starts[faces], totals)
+        steps = numpy.arange(totals.sum()) - \
+            numpy.repeat(numpy.cumsum(totals) - totals, totals)
+        return firsts + steps
+
+    def dirty_since(self, before, touched=()):
+        '''Which elements may lint differently than they did in `before`.
+
+        Any face or edge whose verts changed (or that appeared or went
+        away) touches its verts, as do the verts in `touched`, and every
+        element in the one-ring of a touched vert has to be looked at again.
+        Returns a sorted index array per element type, all empty when
+        nothing changed.'''
+        touched = [numpy.asarray(touched, numpy.int64), numpy.arange(
+            min(self.num_verts, before.num_verts),
+            max(self.num_verts, before.num_verts))]
+
+        shared = min(len(self.loop_totals), len(before.loop_totals))
+        same = self.loop_totals[:shared] == before.loop_totals[:shared]
+        resized = numpy.flatnonzero(~same)
+        alike = numpy.flatnonzero(same)
+        mismatched = \
+            self.loop_verts[self.loops_of(alike)] != \
+            before.loop_verts[before.loops_of(alike)]
+        reshaped = numpy.unique(numpy.concatenate((resized,
+            numpy.repeat(alike, self.loop_totals[alike])[mismatched])))
+        for snapshot in self, before:
+            faces = numpy.concatenate((reshaped,
+                numpy.arange(shared, len(snapshot.loop_totals))))
+            touched.append(snapshot.loop_verts[snapshot.loops_of(faces)])
+
+        shared = min(len(self.edge_verts), len(before.edge_verts))
+        rewired = numpy.flatnonzero(numpy.any(
+            self.edge_verts[:shared] != before.edge_verts[:shared], 1))
+        for snapshot in self, before:
+            edges = numpy.concatenate((rewired,
+                numpy.arange(shared, len(snapshot.edge_verts))))
+            touched.append(snapshot.edge_verts[edges].ravel())
+
+        touched = numpy.unique(numpy.concatenate(touched))
+        touched = touched[touched < self.num_verts]
+        is_touched = numpy.zeros(self.num_verts, bool)
+        is_touched[touched] = True
+        return {
+            'verts': touched,
+            'edges': numpy.flatnonzero(
+                is_touched[self.edge_verts].any(1)),
+            'faces': numpy.unique(
+                self.faces_of_loops()[is_touched[self.loop_verts]]) }
+
+    def selection_masks(self, analysis):
+        'See MeshTopology.selection_masks().'
+        faces = numpy.zeros(len(self.loop_totals), bool)
+        edges = numpy.zeros(len(self.edge_verts), bool)
+        verts = numpy.zeros(self.num_verts, bool)
+        for report in analysis:
+            faces[index_array(report['faces'])] = True
+            edges[index_array(report['edges'])] = True
+            verts[index_array(report['verts'])] = True
+        edges[self.loop_edges[faces[self.faces_of_loops()]]] = True
+        verts[self.edge_verts[edges].ravel()] = True
+        return { 'verts': verts, 'edges': edges, 'faces': faces }
+
+    def flatness(self):
+        '''How far each face's corners stick out of its best-fit plane (found
+        with Newell's method), at most, as a fraction of the face's size.
+        Tris, and faces with no area, come out as 0.'''
+        flatness = numpy.zeros(len(self.loop_totals))
+        if not len(flatness):
+            return flatness
+        starts = self.loop_starts
+        corners = self.coords[self.loop_verts].astype(numpy.float64)
+        centers = numpy.add.reduceat(corners, starts) \
+            / self.loop_totals[:, None]
+        corners -= numpy.repeat(centers, self.loop_totals, 0)
+        normals = numpy.add.reduceat(
+            numpy.cross(corners, corners[self.next_loops()]), starts)
+        lengths = numpy.sqrt(numpy.einsum('ij,ij->i', normals, normals))
+        heights = numpy.abs(numpy.einsum(
+            'ij,ij->i', corners,
+            numpy.repeat(normals, self.loop_totals, 0)))
+        heights = numpy.maximum.reduceat(heights, starts)
+        radii = numpy.sqrt(numpy.maximum.reduceat(
+            numpy.einsum('ij,ij->i', corners, corners), starts))
+        sized = (0 < lengths) & (0 < radii) & (3 < self.loop_totals)
+        flatness[sized] = heights[sized] / (lengths[sized] * radii[sized])
+        return flatness
+
+    def triangles(self):
+        'See MeshTopology.triangles(): (T, 3) verts, and each tri\'s face.'
+        if None is self._triangles:
+            counts = numpy.maximum(self.loop_totals - 2, 0)
+            tri_faces = numpy.repeat(numpy.arange(len(counts)), counts)
+            firsts = numpy.repeat(self.loop_starts, counts)
+            nths = numpy.arange(len(tri_faces)) \
+                - numpy.repeat(numpy.cumsum(counts) - counts, counts)
+            tris = numpy.column_stack((
+                self.loop_verts[firsts],
+                self.loop_verts[firsts + nths + 1],
+                self.loop_verts[firsts + nths + 2]))
+            self._triangles = tris, tri_faces
+        return self._triangles
+
+    def triangle_bvh(self, coords, refit=True):
+        '''See MeshTopology.triangle_bvh(). `coords` is the flat array the
+        verts come from; the tree is refitted whenever it is another one.'''
+        points = self.view(coords, numpy.float32).reshape(-1, 3)
+        if None is self._bvh or not refit:
+            if None is self._bvh or not self._bvh.source is coords:
+                self._bvh = TriangleArrayBVH(self.triangles()[0], points)
+        elif not self._bvh.source is coords:
+            self._bvh.refit(points)
+        self._bvh.source = coords
+        return self._bvh
+
+    def intersecting_faces(self, coords, refit=True):
+        '''A mask of the faces with a tri passing through a tri of another
+        face, where the two tris share no vert.'''
+        tris, tri_faces = self.triangles()
+        bvh = self.triangle_bvh(coords, refit)
+        points = bvh.coords.astype(numpy.float64)
+        hit = numpy.zeros(len(self.loop_totals), bool)
+        for a, b in bvh.candidate_pairs():
+            shared = (tris[a][:, :, None] == tris[b][:, None, :]).any((1, 2))
+            a, b = a[~shared], b[~shared]
+            mine, theirs = points[tris[a]], points[tris[b]]
+            # An edge can only pass through a tri whose plane it crosses.
+            straddles = self.straddle(mine, theirs) \
+                | self.straddle(theirs, mine)
+            a, b = a[straddles], b[straddles]
+            mine, theirs = mine[straddles], theirs[straddles]
+            crossed = numpy.zeros(len(a), bool)
+            for one, other in (mine, theirs), (theirs, mine):
+                for i in range(3):
+                    crossed |= segments_hit_triangles(
+                        one[:, i], one[:, (i + 1) % 3],
+                        other[:, 0], other[:, 1], other[:, 2])
+            hit[tri_faces[a[crossed]]] = True
+            hit[tri_faces[b[crossed]]] = True
+        return hit
+
+    @classmethod
+    def straddle(cls, tris, others):
+        '''Which of the (N, 3, 3) `others` have corners strictly on both
+        sides of the plane of the matching one of `tris`.'''
+        normals = numpy.cross(tris[:, 1] - tris[:, 0], tris[:, 2] - tris[:, 0])
+        sides = numpy.einsum('ijk,ik->ij', others - tris[:, :1], normals)
+        return (sides.min(1) < 0) & (0 < sides.max(1))
+
+    def face_links(self):
+        '''See MeshTopology.face_links(): arrays of the two faces of every
+        manifold edge, and whether they wind the same way along it.'''
+        if None is self._face_links:
+            counts = self.edge_face_counts()
+            shared = numpy.flatnonzero(2 == counts[self.loop_edges])
+            shared = shared[numpy.argsort(self.loop_edges[shared],
+                                          kind='mergesort')]
+            a, b = shared[0::2], shared[1::2]
+            faces = self.faces_of_loops()
+            keep = faces[a] != faces[b]
+            self._face_links = faces[a][keep], faces[b][keep], \
+                (self.loop_verts[a] == self.loop_verts[b])[keep]
+        return self._face_links
+
+    def flipped_faces(self):
+        '''See MeshTopology.flipped_faces(). Orients every island at once,
+        as fans_per_vert() labels fans: each face takes on the lowest root
+        (and whether it is flipped against it) any face it links to has,
+        and then its root's root, until nothing changes. Keys hold both,
+        as 2 * root + flipped.'''
+        a, b, same = self.face_links()
+        num_faces = len(self.loop_totals)
+        lefts = numpy.concatenate((a, b))
+        rights = numpy.concatenate((b, a))
+        sames = numpy.concatenate((same, same)).astype(numpy.int64)
+        keys = 2 * numpy.arange(num_faces)
+        while True:
+            spread = keys.copy()
+            numpy.minimum.at(spread, lefts, keys[rights] ^ sames)
+            spread = spread[spread >> 1] ^ (spread & 1)
+            if numpy.array_equal(spread, keys):
+                break
+            keys = spread
+        roots = keys >> 1
+        flips = keys & 1
+        unorientable = numpy.zeros(num_faces, bool)
+        unorientable[roots[a[(flips[a] ^ flips[b]) != same]]] = True
+        sizes = numpy.bincount(roots, minlength=num_faces)
+        against = numpy.bincount(roots, flips, minlength=num_faces)
+        flag_flipped = 2 * against <= sizes
+        flagged = (1 == flips) == flag_flipped[roots]
+        return flagged & ~unorientable[roots]
+
+    def next_loops(self):
+        following = numpy.arange(1, len(self.loop_verts) + 1)
+        ends = self.loop_starts + self.loop_totals - 1
+        following[ends] = self.loop_starts
+        return following
+
+    def fans_per_vert(self):
+        '''How many separate fans of faces meet at each vert.
+
+        Every loop is a face corner. Two corners at the same vert are
+        in the same fan when their faces share an edge with exactly 2
+        faces, which is the walk BM_vert_is_manifold() does.'''
+        following = self.next_loops()
+        counts = self.edge_face_counts()
+        shared = numpy.flatnonzero(2 == counts[self.loop_edges])
+        shared = shared[numpy.argsort(self.loop_edges[shared],
+                                      kind='mergesort')]
+        a, b = shared[0::2], shared[1::2]
+        flipped = self.loop_verts[a] == self.loop_verts[b]
+        lefts = numpy.concatenate((a, following[a]))
+        rights = numpy.concatenate((
+            numpy.where(flipped, b, following[b]),
+            numpy.where(flipped, following[b], b)))
+        labels = numpy.arange(len(self.loop_edges))
+        while True:
+            lowest = numpy.minimum(labels[lefts], labels[rights])
+            spread = labels.copy()
+            numpy.minimum.at(spread, lefts, lowest)
+            numpy.minimum.at(spread, rights, lowest)
+            spread = spread[spread]
+            if numpy.array_equal(spread, labels):
+                break
+            labels = spread
+        roots = labels == numpy.arange(len(labels))
+        return numpy.bincount(
+            self.loop_verts[roots], minlength=self.num_verts)
+
+
+class TriangleBVH:
+    '''A bounding volume hierarchy over triangles, for the 'PYTHON' backend
+    (TriangleArrayBVH is the NumPy one, built the same way).
+
+    The tris are sorted along a Z-order curve through their centers and
+    packed BVH_LEAF_SIZE to a leaf. Above the leaves is a complete binary
+    tree, node i of each level having children 2i and 2i + 1 in the one
+    below. Only the boxes depend on where the verts are, so refit() can
+    follow them when they move without sorting anything again: the tree
+    gets looser, but stays right.'''
+
+    def __init__(self, tris, coords):
+        'tris: 3 vert indices apiece; coords: x, y, z of every vert.'
+        self.tris = tris
+        self.num_tris = len(tris) // 3
+        boxes = self.tri_boxes(coords)
+        codes = []
+        if self.num_tris:
+            centers = [ [ (low[i] + high[i]) / 2 for i in range(3) ]
+                        for low, high in boxes ]
+            # One scale for all axes, or the thin axis of a flat mesh would
+            # decide the order.
+            first = [ min(center[i] for center in centers)
+                      for i in range(3) ]
+            span = max(max(center[i] for center in centers) - first[i]
+                       for i in range(3)) or 1
+            for center in centers:
+                cells = [ int(1023 * (center[i] - first[i]) / span)
+                          for i in range(3) ]
+                codes.append(spread_bits(cells[0])
+                             | spread_bits(cells[1]) << 1
+                             | spread_bits(cells[2]) << 2)
+        self.order = sorted(range(self.num_tris), key=codes.__getitem__)
+        self.refit(coords, boxes)
+
+    def corners(self, t, coords=None):
+        coords = self.coords if None is coords else coords
+        return [ coords[3 * v:3 * v + 3] for v in self.tris[3 * t:3 * t + 3] ]
+
+    def tri_boxes(self, coords):
+        boxes = []
+        for t in range(self.num_tris):
+            corners = self.corners(t, coords)
+            boxes.append((tuple(map(min, *corners)),
+                          tuple(map(max, *corners))))
+        return boxes
+
+    def refit(self, coords, boxes=None):
+        self.coords = coords
+        self.boxes = self.tri_boxes(coords) if None is boxes else boxes
+        empty = ((float('inf'),) * 3, (float('-inf'),) * 3)
+        level = []
+        for start in range(0, self.num_tris, BVH_LEAF_SIZE):
+            level.append(self.union(
+                [ self.boxes[t]
+                  for t in self.order[start:start + BVH_LEAF_SIZE] ]))
+        width = 1
+        while width < len(level):
+            width *= 2
+        level += [ empty ] * (width - len(level))
+        self.levels = [ level ]
+        while 1 < len(level):
+            level = [ self.union(level[i:i + 2])
+                      for i in range(0, len(level), 2) ]
+            self.levels.insert(0, level)
+
+    @classmethod
+    def union(cls, boxes):
+        return (tuple(map(min, *[ low for low, high in boxes ])),
+                tuple(map(max, *[ high for low, high in boxes ]))) \
+            if 1 < len(boxes) else boxes[0]
+
+    @classmethod
+    def overlap(cls, box, other):
+        # Strictly: an edge passing through the inside of a tri makes even
+        # a flat tri's box overlap strictly, and boxes that only touch, as
+        # those of neighbouring tris on a flat stretch do, are left out.
+        return all(box[0][i] < other[1][i] and other[0][i] < box[1][i]
+                   for i in range(3))
+
+    def query(self, box):
+        'The tris whose boxes overlap `box`.'
+        if not self.num_tris:
+            return
+        leaves = len(self.levels) - 1
+        stack = [ (0, 0) ]
+        while len(stack):
+            depth, i = stack.pop()
+            if not self.overlap(box, self.levels[depth][i]):
+                continue
+            if depth < leaves:
+                stack += [ (depth + 1, 2 * i), (depth + 1, 2 * i + 1) ]
+                continue
+            for t in self.order[i * BVH_LEAF_SIZE:(i + 1) * BVH_LEAF_SIZE]:
+                if self.overlap(box, self.boxes[t]):
+                    yield t
+
+
+class TriangleArrayBVH:
+    '''TriangleBVH's layout in NumPy arrays, for the 'NUMPY' backend. Instead
+    of one tri at a time, the whole tree is walked against itself a level
+    at a time (see candidate_pairs()).'''
+
+    # How many pairs of leaves candidate_pairs() expands at once.
+    BATCH = 16384
+
+    def __init__(self, tris, coords):
+        'tris: (T, 3) vert indices; coords: (N, 3).'
+        self.tris = tris
+        lows, highs = self.tri_boxes(coords)
+        self.order = numpy.arange(len(tris))
+        if len(tris):
+            centers = (lows + highs) / 2
+            first = centers.min(0)
+            span = (centers.max(0) - first).max() or 1
+            cells = (1023 * (centers - first) / span).astype(numpy.uint64)
+            codes = spread_bits(cells[:, 0]) \
+                | spread_bits(cells[:, 1]) << numpy.uint64(1) \
+                | spread_bits(cells[:, 2]) << numpy.uint64(2)
+            self.order = numpy.argsort(codes, kind='stable')
+        self.refit(coords, (lows, highs))
+
+    def tri_boxes(self, coords):
+        corners = coords[self.tris]
+        return corners.min(1), corners.max(1)
+
+    def refit(self, coords, boxes=None):
+        self.coords = coords
+        self.lows, self.highs = \
+            self.tri_boxes(coords) if None is boxes else boxes
+        self.sorted_lows = self.lows[self.order]
+        self.sorted_highs = self.highs[self.order]
+        width = 1
+        while width * BVH_LEAF_SIZE < len(self.order):
+            width *= 2
+        self.levels = []
+        for boxes, pad, shrink in \
+                (self.sorted_lows, numpy.inf, numpy.min), \
+                (self.sorted_highs, -numpy.inf, numpy.max):
+            padded = numpy.full((width * BVH_LEAF_SIZE, 3), pad, boxes.dtype)
+            padded[:len(self.order)] = boxes
+            level = shrink(padded.reshape(width, BVH_LEAF_SIZE, 3), 1)
+            levels = [ level ]
+            while 1 < len(level):
+                level = shrink(level.reshape(-1, 2, 3), 1)
+                levels.insert(0, level)
+            self.levels.append(levels)
+        self.levels = list(zip(*self.levels))
+
+    @classmethod
+    def overlap(cls, lows, highs, a, b):
+        '''Which pairs of boxes a[i], b[i] overlap (strictly, as
+        TriangleBVH.overlap()); one axis at a time, each only for the pairs
+        still left. Returns the pairs that do.'''
+        for axis in range(3):
+            keep = (lows[a, axis] < highs[b, axis]) \
+                & (lows[b, axis] < highs[a, axis])
+            a, b = a[keep], b[keep]
+        return a, b
+
+    def candidate_pairs(self):
+        '''Yields (a, b) arrays of tris, in batches, for every pair of tris
+        whose boxes overlap: each pair once, and a tri never with itself.'''
+        if not len(self.order):
+            return
+        a = b = numpy.zeros(1, numpy.int64)
+        for lows, highs in self.levels[1:]:
+            a = numpy.concatenate((2 * a, 2 * a, 2 * a + 1, 2 * a + 1))
+            b = numpy.concatenate((2 * b, 2 * b + 1, 2 * b, 2 * b + 1))
+            keep = a <= b
+            a, b = self.overlap(lows, highs, a[keep], b[keep])
+        slot_a, slot_b = numpy.divmod(
+            numpy.arange(BVH_LEAF_SIZE ** 2), BVH_LEAF_SIZE)
+        for start in range(0, len(a), self.BATCH):
+            leaf_a = a[start:start + self.BATCH, None]
+            leaf_b = b[start:start + self.BATCH, None]
+            keep = ((leaf_a != leaf_b) | (slot_a < slot_b)).ravel()
+            tri_a = (leaf_a * BVH_LEAF_SIZE + slot_a).ravel()[keep]
+            tri_b = (leaf_b * BVH_LEAF_SIZE + slot_b).ravel()[keep]
+            keep = (tri_a < len(self.order)) & (tri_b < len(self.order))
+            tri_a, tri_b = self.overlap(self.sorted_lows, self.sorted_highs,
+                                        tri_a[keep], tri_b[keep])
+            yield self.order[tri_a], self.order[tri_b]
+
+
+class MeshLintResultCache:
+    '''Finished check results, shared between every topology with the
+    same content (see MeshTopology.result_key()), so that a mesh many
+    objects use, or one that has not changed since last time, is only
+    checked once. Results are {elemtype: LintIndices}, as in
+    MeshTopology.memo.
+
+    The least recently used results go first once they take up more than
+    `max_bytes`. With a `directory`, every result is written there as well,
+    a small JSON file per key, and looked for there before giving up. Any
+    thread may use it.'''
+
+    # What an entry costs besides its indices: the key, dicts, and so on.
+    ENTRY_BYTES = 512
+
+    def __init__(self, max_bytes=RESULT_CACHE_BYTES, directory=None):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.entries = collections.OrderedDict()
+        self.num_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    @classmethod
+    def size_of(cls, results):
+        return cls.ENTRY_BYTES + sum(
+            indices.indices.itemsize * len(indices)
+            for indices in results.values())
+
+    def get(self, key):
+        '''The results filed under `key`, or None.'''
+        with self.lock:
+            return self.find(key)
+
+    def find(self, key):
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key]
+        results = self.load(key)
+        if None is results:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.store(key, results, persist=False)
+        return results
+
+    def put(self, key, results):
+        with self.lock:
+            self.store(key, results)
+
+    def store(self, key, results, persist=True):
+        if key in self.entries:
+            self.num_bytes -= self.size_of(self.entries.pop(key))
+        self.entries[key] = results
+        self.num_bytes += self.size_of(results)
+        while self.max_bytes < self.num_bytes and len(self.entries):
+            self.num_bytes -= self.size_of(
+                self.entries.popitem(last=False)[1])
+        if persist and self.directory:
+            self.save(key, results)
+
+    def path(self, key):
+        return os.path.join(self.directory, key + '.json')
+
+    def load(self, key):
+        if not self.directory:
+            return None
+        try:
+            with open(self.path(key)) as source:
+                stored = json.load(source)
+        except (IOError, OSError, ValueError):
+            return None
+        return { elemtype: LintIndices(array('I', indices))
+                 for elemtype, indices in stored.items() }
+
+    def save(self, key, results):
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+        # Written aside and renamed, so a reader never sees half a file.
+        partial = '%s.%d.partial' % (self.path(key), os.getpid())
+        with open(partial, 'w') as out:
+            json.dump({ elemtype: indices.tolist()
+                        for elemtype, indices in results.items() }, out)
+        os.rename(partial, self.path(key))
+
+    def clear(self):
+        '''Empties the memory side; files in the directory are kept.'''
+        with self.lock:
+            self.entries.clear()
+            self.num_bytes = 0
+
+
+class MeshLintTopologyCache:
+    '''The topology of every mesh object in a .blend, as the batch linter
+    read it, in one binary file per .blend under `directory`. A later run
+    over the unchanged .blend checks that instead of starting Blender:
+    read() memory-maps the file, and the MeshTopology arrays it hands back
+    are views into the mapping, so nothing is copied.
+
+    A file is HEADER (MAGIC, VERSION and the length of the JSON header
+    that follows), the JSON header, then the arrays, each on an 8-byte
+    boundary. The header has:
+     - files: the size, mtime and SHA-1 of the .blend and of the libraries
+       it links from; if any has changed (its mtime can move as long as
+       its content stays the same), the file is not used
+     - settings: what the .blend has enabled ('checks', 'backend')
+     - meshes: their names and where their arrays are (FIELDS, and
+       edge_face_counts), each mesh once however many objects use it
+     - objects: the mesh each one uses, its mirror planes and options,
+       and evaluated_coords if it has its own'''
+
+    MAGIC = b'MLTC'
+    VERSION = 1
+    HEADER = struct.Struct('<4sII')
+    FIELDS = [ 'coords', 'face_offsets', 'face_verts', 'face_edges', 'edges' ]
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def path(self, blend):
+        return os.path.join(self.directory, hashlib.sha1(
+            os.path.abspath(blend).encode('utf-8')).hexdigest() + '.topology')
+
+    @classmethod
+    def aligned(cls, offset):
+        return (offset + 7) & ~7
+
+    @classmethod
+    def digest_of(cls, path):
+        digest = hashlib.sha1()
+        with open(path, 'rb') as source:
+            for block in iter(lambda: source.read(1 << 20), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    @classmethod
+    def stamp(cls, path):
+        stat = os.stat(path)
+        return { 'path': os.path.abspath(path), 'size': stat.st_size,
+                 'mtime': stat.st_mtime, 'sha1': cls.digest_of(path) }
+
+    @classmethod
+    def is_current(cls, stamp):
+        try:
+            stat = os.stat(stamp['path'])
+        except OSError:
+            return False
+        # The content is only hashed again when the mtime says it might
+        # have changed.
+        return stat.st_size == stamp['size'] \
+            and (stat.st_mtime == stamp['mtime']
+                 or cls.digest_of(stamp['path']) == stamp['sha1'])
+
+    @classmethod
+    def flat_bytes(cls, flat):
+        if isinstance(flat, (list, bytearray)):
+            flat = array('i', flat)
+        return bytes(flat) if isinstance(flat, memoryview) else flat.tobytes()
+
+    def write(self, blend, libraries, settings, objects):
+        '''Files `objects`, a list of (object name, MeshTopology) read from
+        `blend`. `libraries` are the paths of the .blends it links from,
+        and `settings` the JSON-friendly ones described above.'''
+        header = {
+            'files': [ self.stamp(path) for path in [ blend ] + libraries ],
+            'settings': settings,
+            'meshes': [],
+            'objects': [] }
+        blocks = []
+        size = [0]
+        def place(flat, typecode):
+            data = self.flat_bytes(flat)
+            blocks.append((size[0], data))
+            placed = [ size[0], len(data), typecode ]
+            size[0] = self.aligned(size[0] + len(data))
+            return placed
+        meshes = {}
+        for name, topology in objects:
+            key = (topology.name, topology.library, topology.fingerprint())
+            if not key in meshes:
+                meshes[key] = len(header['meshes'])
+                placed = { field: place(getattr(topology, field),
+                                        'f' if 'coords' == field else 'i')
+                           for field in self.FIELDS }
+                if has_numpy():
+                    counts = topology.arrays().edge_face_counts().astype(
+                        numpy.intc)
+                else:
+                    counts = topology.edge_face_counts()
+                placed['edge_face_counts'] = place(counts, 'i')
+                header['meshes'].append({
+                    'name': topology.name,
+                    'library': topology.library,
+                    'arrays': placed })
+            entry = {
+                'object': name,
+                'mesh': meshes[key],
+                'mirror_planes': topology.mirror_planes,
+                'options': { option: value for option, value
+                             in topology.options.items()
+                             if not isinstance(value, (array, memoryview)) } }
+            evaluated = topology.options.get('evaluated_coords')
+            if not None is evaluated:
+                entry['evaluated_coords'] = place(evaluated, 'f')
+            header['objects'].append(entry)
+        encoded = json.dumps(header).encode('utf-8')
+        start = self.aligned(self.HEADER.size + len(encoded))
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+        path = self.path(blend)
+        partial = '%s.%d.partial' % (path, os.getpid())
+        with open(partial, 'wb') as out:
+            out.write(self.HEADER.pack(self.MAGIC, self.VERSION, len(encoded)))
+            out.write(encoded)
+            for offset, data in blocks:
+                out.seek(start + offset)
+                out.write(data)
+            out.truncate(start + size[0])
+        os.rename(partial, path)
+
+    def read(self, blend):
+        '''(settings, [ (object name, MeshTopology) ]) for `blend`, or None
+        when there is no file for it, or one of another VERSION, or one
+        that any of the files it was made from has changed since.'''
+        try:
+            with open(self.path(blend), 'rb') as source:
+                mapped = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, length = self.HEADER.unpack_from(mapped)
+            if self.MAGIC != magic or self.VERSION != version:
+                return None
+            header = json.loads(mapped[
+                self.HEADER.size:self.HEADER.size + length].decode('utf-8'))
+        except (IOError, OSError, ValueError, struct.error):
+            return None
+        if not all(self.is_current(stamp) for stamp in header['files']):
+            return None
+        data = memoryview(mapped)
+        start = self.aligned(self.HEADER.size + length)
+        def field(placed):
+            offset, size, typecode = placed
+            return data[start + offset:start + offset + size].cast(typecode)
+        meshes = [ { name: field(placed)
+                     for name, placed in mesh['arrays'].items() }
+                   for mesh in header['meshes'] ]
+        objects = []
+        for entry in header['objects']:
+            mesh = header['meshes'][entry['mesh']]
+            arrays = meshes[entry['mesh']]
+            topology = MeshTopology(
+                *[ arrays[name] for name in self.FIELDS ],
+                name=mesh['name'], library=mesh['library'])
+            topology.adopt_edge_face_counts(arrays['edge_face_counts'])
+            topology.set_mirror_planes(
+                (tuple(origin), tuple(normal), threshold)
+                for origin, normal, threshold in entry['mirror_planes'])
+            for option, value in entry['options'].items():
+                topology.set_option(option, value)
+            if 'evaluated_coords' in entry:
+                topology.set_option(
+                    'evaluated_coords', field(entry['evaluated_coords']))
+            objects.append((entry['object'], topology))
+        return header['settings'], objects
+
+
+class MeshLintEngine:
+    '''Runs the checks over a MeshTopology.
+
+    Every check is described in CHECKS: the element types it visits, what
+    it reads ('inputs', from CHECK_INPUTS), what it costs ('cost', from
+    COST_CLASSES) and which SHARED tables it uses ('shares'). Each is
+    written twice: a predicate on one element index, check_<symbol>
+    (check_<symbol>_<elemtype> if it visits several types), for the
+    'PYTHON' backend, and array_check_<symbol>, which returns a boolean
+    mask per element type, for 'NUMPY'. Checks from elsewhere come in
+    through register_check().'''
+
+    CHECKS = []
+
+    # The tables several checks read, by the name their 'shares' list
+    # them under: how to work each one out from a MeshTopology, and from
+    # its MeshLintArrays (None where no check needs it). Every one is
+    # worked out once per topology, before the checks that share it run;
+    # see shared().
+    SHARED = {
+        'edge_face_counts': (MeshTopology.edge_face_counts,
+                             MeshLintArrays.edge_face_counts),
+        'valences': (MeshTopology.valences, MeshLintArrays.valences),
+        'vert_edges': (MeshTopology.vert_edges, None),
+        'fans': (None, MeshLintArrays.fans_per_vert),
+        'flatness': (None, MeshLintArrays.flatness),
+        'triangles': (MeshTopology.triangles, MeshLintArrays.triangles),
+        'face_links': (MeshTopology.face_links, MeshLintArrays.face_links),
+    }
+
+    def __init__(self, topology, profile=False, cache=None):
+        '''With `profile`, every analysis also fills in self.profile: for
+        each lint, the seconds spent on it, how many elements it looked at
+        and how many problems it found (see format_profile()). With a
+        MeshLintResultCache as `cache`, results are looked up there first,
+        and whatever does get checked is put there.'''
+        self.topology = topology
+        self.profile = {} if profile else None
+        self.cache = cache
+
+    def analyze(self, lints, backend='PYTHON', dirty=None, previous=None):
+        '''With `dirty` (see MeshLintArrays.dirty_since) and the `previous`
+        analysis, only the dirty elements are re-checked and the rest of
+        `previous` is carried over.'''
+        for analysis in self.iter_analyze(lints, backend, dirty, previous):
+            pass
+        return analysis
+
+    def iter_analyze(self, lints, backend='PYTHON', dirty=None,
+                     previous=None):
+        '''analyze() in resumable steps: yields None every so often while it
+        works, and the analysis (a report per lint) as its last item.'''
+        memo = self.topology.memo
+        todo = cheapest_first(
+            [ lint for lint in lints if not lint['symbol'] in memo ])
+        if not None is self.cache:
+            keys = { lint['symbol']: self.topology.result_key(lint)
+                     for lint in todo }
+            for lint in todo[:]:
+                results = self.cache.get(keys[lint['symbol']])
+                if not None is results:
+                    memo[lint['symbol']] = results
+                    todo.remove(lint)
+            checked = todo[:]
+        if not None is self.profile:
+            self.profile.clear()
+            for lint in lints:
+                self.profile[lint['symbol']] = {
+                    'seconds': 0.0, 'visited': 0, 'found': 0,
+                    'cached': not lint in todo }
+        if not None is previous:
+            previous = { report['lint']['symbol']: report
+                         for report in previous }
+        # Only the elements near a change need another look, unless a
+        # check cares where the verts are: moving them dirties nothing.
+        # Nor does that work for a check whose verdict on an element can
+        # hang on elements far away from it (one marked 'local': False).
+        nearby = []
+        if not None is dirty and not None is previous:
+            nearby = [ lint for lint in todo if lint['symbol'] in previous
+                       and not reads_coords(lint) and lint['local'] ]
+            todo = [ lint for lint in todo if not lint in nearby ]
+        vectorized = 'NUMPY' == backend and has_numpy()
+        self.prepare(nearby + todo, vectorized)
+        if len(nearby):
+            memo.update(self.run_dirty_checks(nearby, dirty, previous))
+        if not len(todo):
+            pass
+        elif vectorized:
+            memo.update(self.run_array_checks(todo))
+        else:
+            for bad in self.iter_fused_checks(todo):
+                if None is bad:
+                    yield None
+            memo.update(bad)
+        if not None is self.cache:
+            for lint in checked:
+                self.cache.put(keys[lint['symbol']], memo[lint['symbol']])
+        analysis = []
+        for lint in lints:
+            report = { 'lint': lint }
+            for elemtype in ELEM_TYPES:
+                report[elemtype] = memo[lint['symbol']].get(
+                    elemtype, LintIndices())
+                if not None is self.profile:
+                    self.profile[lint['symbol']]['found'] += \
+                        len(report[elemtype])
+            analysis.append(report)
+        yield analysis
+
+    def has_lint(self, lints, backend='PYTHON'):
+        '''Whether any of `lints` finds anything, stopping at the first
+        offending element. The checks run cheapest first, each working out
+        only the shared tables it needs, so a mesh with a Tri never gets
+        its edges counted. Checks that do run to the end (all of them, on
+        a clean mesh) are memoized and cached as analyze() would. Nothing
+        is profiled.'''
+        memo = self.topology.memo
+        vectorized = 'NUMPY' == backend and has_numpy()
+        profile, self.profile = self.profile, None
+        try:
+            for lint in cheapest_first(lints):
+                sym = lint['symbol']
+                if not sym in memo:
+                    key = results = None
+                    if not None is self.cache:
+                        key = self.topology.result_key(lint)
+                        results = self.cache.get(key)
+                    if None is results:
+                        results = self.first_problem(lint, vectorized)
+                        if None is results:
+                            return True
+                        if not None is key:
+                            self.cache.put(key, results)
+                    memo[sym] = results
+                if any(len(indices) for indices in memo[sym].values()):
+                    return True
+            return False
+        finally:
+            self.profile = profile
+
+    def first_problem(self, lint, vectorized):
+        '''Runs `lint` until it finds something, in which case None comes
+        back, and otherwise its (empty) results. A check with an
+        array_check runs whole when `vectorized`, and keeps what it finds.'''
+        vectorized = vectorized and not None is lint['array_check']
+        self.prepare([lint], vectorized)
+        if vectorized:
+            return self.run_array_checks([lint])[lint['symbol']]
+        for elemtype in lint['elemtypes']:
+            is_bad = self.predicate(lint, elemtype)
+            if any(map(is_bad, range(self.topology.count(elemtype)))):
+                return None
+        return { elemtype: LintIndices() for elemtype in lint['elemtypes'] }
+
+    def profiled(self, lint, visited):
+        '''Bookkeeping for self.profile: counts `visited` elements against
+        `lint` and returns a stop() that adds the time since this call.'''
+        if None is self.profile:
+            return lambda: None
+        stats = self.profile[lint['symbol']]
+        stats['visited'] += visited
+        started = PROFILE_CLOCK()
+        def stop():
+            stats['seconds'] += PROFILE_CLOCK() - started
+        return stop
+
+    def timed(self, lint, is_bad):
+        'Wraps a predicate so its calls are timed for self.profile.'
+        if None is self.profile:
+            return is_bad
+        stats = self.profile[lint['symbol']]
+        clock = PROFILE_CLOCK
+        def timed_is_bad(i):
+            started = clock()
+            found = is_bad(i)
+            stats['seconds'] += clock() - started
+            return found
+        return timed_is_bad
+
+    @classmethod
+    def none_analysis(cls):
+        analysis = []
+        for lint in cls.CHECKS:
+            row = { elemtype: LintIndices() for elemtype in ELEM_TYPES }
+            row['lint'] = lint
+            analysis.append(row)
+        return analysis
+
+    @classmethod
+    def diff_analyses(cls, before, after):
+        '''What to announce about going from `before` to `after`: the
+        problems that are new, and the ones that went away, per check and
+        element type. None if nothing changed. Reports are matched up by
+        their lint's label; a check that is missing from `after` was
+        switched off, so it has nothing to say.'''
+        if None is before:
+            before = cls.none_analysis()
+        reports_before = { report['lint']['label']: report
+                           for report in before }
+        reports_now = { report['lint']['label']: report for report in after }
+        found_strings = []
+        fixed_strings = []
+        for check in cls.CHECKS:
+            check_name = check['label']
+            if not check_name in reports_now:
+                continue
+            report = reports_now[check_name]
+            report_before = reports_before.get(check_name, {})
+            added_strings = []
+            removed_strings = []
+            for elemtype in ELEM_TYPES:
+                added, removed = count_changes(
+                    report_before.get(elemtype, []), report[elemtype])
+                for count_diff, strings in (added, added_strings), \
+                                           (removed, removed_strings):
+                    if count_diff:
+                        strings.append(str(count_diff) + ' ' + depluralize(
+                            count=count_diff, string=elemtype))
+            if len(added_strings):
+                found_strings.append(
+                    check_name + ': ' + ', '.join(added_strings))
+            if len(removed_strings):
+                fixed_strings.append(
+                    check_name + ': ' + ', '.join(removed_strings))
+        messages = []
+        if len(found_strings):
+            messages.append('Found ' + ', '.join(found_strings))
+        if len(fixed_strings):
+            messages.append('Fixed ' + ', '.join(fixed_strings))
+        if len(messages):
+            return '. '.join(messages)
+        return None
+
+    @classmethod
+    def make_labels_dict(cls, analysis):
+        if None is analysis:
+            return {}
+        labels_dict = {}
+        for check in analysis:
+            label = check['lint']['label']
+            new_val = check.copy()
+            del new_val['lint']
+            labels_dict[label] = new_val
+        return labels_dict
+
+    def predicate(self, lint, elemtype):
+        return functools.partial(lint['check'][elemtype], self)
+
+    def prepare(self, lints, vectorized):
+        '''Works out the SHARED tables `lints` use, for the NumPy backend if
+        `vectorized`, each just once. Its time goes to the first lint to
+        list it, in self.profile.'''
+        arrays = self.topology.arrays() if vectorized else None
+        owner = self.topology if None is arrays else arrays
+        for lint in lints:
+            for name in lint['shares']:
+                if name in owner.shared \
+                        or None is self.SHARED[name][int(vectorized)]:
+                    continue
+                stop = self.profiled(lint, 0)
+                self.shared(name, arrays)
+                stop()
+
+    def shared(self, name, arrays=None):
+        '''The SHARED table `name` of this topology, or with `arrays` (its
+        MeshLintArrays), the NumPy one. It is worked out the first time it
+        is asked for, and kept along with the topology until the verts
+        move. This is what checks registered from elsewhere read
+        adjacency through.'''
+        owner = self.topology if None is arrays else arrays
+        if not name in owner.shared:
+            compute = self.SHARED[name][0 if None is arrays else 1]
+            owner.shared[name] = compute(owner)
+        return owner.shared[name]
+
+    def iter_fused_checks(self, lints):
+        # One walk per element type, no matter how many checks want to
+        # look at it. Yields None every PASS_CHUNK_SIZE elements, then the
+        # results.
+        bad = { lint['symbol']: {} for lint in lints }
+        for elemtype in ELEM_TYPES:
+            visitors = []
+            for lint in lints:
+                if not elemtype in lint['elemtypes']:
+                    continue
+                indices = array('I')
+                bad[lint['symbol']][elemtype] = LintIndices(indices)
+                self.profiled(lint, self.topology.count(elemtype))
+                visitors.append(
+                    (self.timed(lint, self.predicate(lint, elemtype)),
+                     indices.append))
+            if not len(visitors):
+                continue
+            for i in range(self.topology.count(elemtype)):
+                for is_bad, complain in visitors:
+                    if is_bad(i):
+                        complain(i)
+                if 0 == (i + 1) % PASS_CHUNK_SIZE:
+                    yield None
+        yield bad
+
+    def run_dirty_checks(self, lints, dirty, previous):
+        bad = {}
+        for lint in lints:
+            sym = lint['symbol']
+            bad[sym] = {}
+            for elemtype in lint['elemtypes']:
+                is_bad = self.predicate(lint, elemtype)
+                recheck = dirty[elemtype]
+                stop = self.profiled(lint, len(recheck))
+                kept = index_array(previous[sym][elemtype])
+                kept = kept[kept < self.topology.count(elemtype)]
+                kept = kept[~numpy.isin(kept, recheck)]
+                found = [ i for i in recheck.tolist() if is_bad(i) ]
+                bad[sym][elemtype] = LintIndices(
+                    numpy.union1d(kept, found))
+                stop()
+        return bad
+
+    def run_array_checks(self, lints):
+        '''Lints with no array_check of their own fall back to a Python pass
+        over the elements.'''
+        arrays = self.topology.arrays()
+        bad = {}
+        plain = [ lint for lint in lints if None is lint['array_check'] ]
+        if len(plain):
+            self.prepare(plain, False)
+            for bad in self.iter_fused_checks(plain):
+                pass
+        for lint in lints:
+            if None is lint['array_check']:
+                continue
+            stop = self.profiled(lint, sum(
+                self.topology.count(elemtype)
+                for elemtype in lint['elemtypes']))
+            masks = lint['array_check'](self, arrays)
+            bad[lint['symbol']] = {
+                elemtype: LintIndices.from_mask(mask)
+                for elemtype, mask in masks.items() }
+            stop()
+        return bad
+
+    CHECKS.append({
+        'symbol': 'tris',
+        'label': 'Tris',
+        'definition': 'A face with 3 edges. Often bad for modeling because it stops edge loops and does not deform well around bent areas. A mesh might look good until you animate, so beware!',
+        'default': True,
+        'elemtypes': [ 'faces' ],
+        'cost': 'cheap'
+    })
+    def check_tris(self, f):
+        return 3 == self.topology.face_size(f)
+
+    def array_check_tris(self, arrays):
+        return { 'faces': 3 == arrays.loop_totals }
+
+    CHECKS.append({
+        'symbol': 'ngons',
+        'label': 'Ngons',
+        'definition': 'A face with >4 edges. Is generally bad in exactly the same ways as Tris',
+        'default': True,
+        'elemtypes': [ 'faces' ],
+        'cost': 'cheap'
+    })
+    def check_ngons(self, f):
+        return 4 < self.topology.face_size(f)
+
+    def array_check_ngons(self, arrays):
+        return { 'faces': 4 < arrays.loop_totals }
+
+    CHECKS.append({
+        'symbol': 'nonmanifold',
+        'label': 'Nonmanifold Elements',
+        'definition': 'Simply, shapes that won\'t hold water. More precisely, nonmanifold edges are those that do not have exactly 2 faces attached to them (either more or less). Nonmanifold verts are more complicated -- you can see their definition in BM_vert_is_manifold() in bmesh_queries.c',
+        'default': True,
+        'elemtypes': [ 'verts', 'edges' ],
+        'shares': [ 'edge_face_counts', 'valences', 'vert_edges', 'fans' ]
+    })
+    # On a Mirror modifier's plane, the open edges are where the mirrored
+    # half gets joined on, and fans that meet there are joined up by the
+    # other half's, so neither counts against the mesh.
+    def check_nonmanifold_verts(self, v):
+        if not self.topology.valences()[v]:
+            return True
+        edges = self.topology.vert_edges()[v]
+        counts = self.topology.edge_face_counts()
+        # Loose edges and edges with 3+ faces spoil both their verts.
+        if any(not 0 < counts[e] < 3 for e in edges):
+            return True
+        on_plane = self.topology.on_mirror_plane
+        if not None is on_plane and on_plane[v]:
+            return False
+        return 1 != self.topology.fans_at(v)
+
+    def check_nonmanifold_edges(self, e):
+        count = self.topology.edge_face_counts()[e]
+        on_plane = self.topology.on_mirror_plane
+        if 1 == count and not None is on_plane:
+            edges = self.topology.edges
+            return not (on_plane[edges[2 * e]] and on_plane[edges[2 * e + 1]])
+        return 2 != count
+
+    def array_check_nonmanifold(self, arrays):
+        counts = arrays.edge_face_counts()
+        bad_edges = 2 != counts
+        bad_verts = 0 == arrays.valences()
+        rough = (0 == counts) | (2 < counts)
+        bad_verts[arrays.edge_verts[rough].ravel()] = True
+        fanned = 1 != self.shared('fans', arrays)
+        on_plane = self.topology.on_mirror_plane
+        if not None is on_plane:
+            fanned &= ~on_plane
+            bad_edges &= ~((1 == counts)
+                           & on_plane[arrays.edge_verts].all(1))
+        bad_verts |= fanned
+        return { 'verts': bad_verts, 'edges': bad_edges }
+
+    CHECKS.append({
+        'symbol': 'interior_faces',
+        'label': 'Interior Faces',
+        'definition': 'This confuses people. It is very specific: A face whose edges ALL have >2 faces attached. The simplest way to see this is to Ctrl+r a Default Cube and hit \'f\'',
+        'default': True,
+        'elemtypes': [ 'faces' ],
+        'shares': [ 'edge_face_counts' ]
+    })
+    def check_interior_faces(self, f): # translated from editmesh_select.c
+        counts = self.topology.edge_face_counts()
+        face_edges = self.topology.face_edges
+        return not any(
+            3 > counts[face_edges[i]] for i in self.topology.face_loops(f))
+
+    def array_check_interior_faces(self, arrays):
+        if not len(arrays.loop_totals):
+            return { 'faces': arrays.loop_totals.astype(bool) }
+        counts = arrays.edge_face_counts()[arrays.loop_edges]
+        fewest = numpy.minimum.reduceat(counts, arrays.loop_starts)
+        return { 'faces': 2 < fewest }
+
+    CHECKS.append({
+        'symbol': 'sixplus_poles',
+        'label': '6+-edge Poles',
+        'definition': 'A vertex with 6 or more edges connected to it. Generally this is not something you want, but since some kinds of extrusions will legitimately cause such a pole (imagine extruding each face of a Cube outward, the inner corners are rightful 6+-poles). Still, if you don\'t know for sure that you want them, it is good to enable this',
+        'default': False,
+        'elemtypes': [ 'verts' ],
+        'shares': [ 'valences' ]
+    })
+    def check_sixplus_poles(self, v):
+        return 5 < self.topology.valences()[v]
+
+    def array_check_sixplus_poles(self, arrays):
+        return { 'verts': 5 < arrays.valences() }
+
+    CHECKS.append({
+        'symbol': 'noncoplanar',
+        'label': 'Noncoplanar Faces',
+        'definition': 'A face whose verts do not all lie in one plane: some corner sticks out of the best-fit plane by more than the Coplanar Tolerance, as a fraction of the face\'s size. Warped Quads and especially Ngons shade unpredictably, since how Blender splits them into triangles decides which way they bend',
+        'default': False,
+        'elemtypes': [ 'faces' ],
+        'inputs': [ 'topology', 'coords' ],
+        'shares': [ 'flatness' ],
+        'options': [ 'coplanar_tolerance' ]
+    })
+    def check_noncoplanar(self, f):
+        coords = self.topology.coords
+        corners = [ coords[3 * v:3 * v + 3] for v in
+                    self.topology.face_verts[self.topology.face_offsets[f]:
+                                             self.topology.face_offsets[f + 1]] ]
+        if 4 > len(corners):
+            return False
+        center = [ sum(axis) / len(corners) for axis in zip(*corners) ]
+        offsets = [ [ co[i] - center[i] for i in range(3) ] for co in corners ]
+        # Newell's method: the normal of the best-fit plane, for any polygon.
+        normal = [0.0, 0.0, 0.0]
+        for a, b in zip(offsets, offsets[1:] + offsets[:1]):
+            normal[0] += a[1] * b[2] - a[2] * b[1]
+            normal[1] += a[2] * b[0] - a[0] * b[2]
+            normal[2] += a[0] * b[1] - a[1] * b[0]
+        length = sum(n * n for n in normal) ** 0.5
+        if 0 == length:
+            return False
+        height = max(abs(sum(o * n for o, n in zip(offset, normal)))
+                     for offset in offsets) / length
+        radius = max(sum(o * o for o in offset) for offset in offsets) ** 0.5
+        return self.coplanar_tolerance() * radius < height
+
+    def array_check_noncoplanar(self, arrays):
+        return { 'faces': self.coplanar_tolerance()
+                          < self.shared('flatness', arrays) }
+
+    def coplanar_tolerance(self):
+        return self.topology.options.get(
+            'coplanar_tolerance', COPLANAR_TOLERANCE)
+
+    CHECKS.append({
+        'symbol': 'intersecting_faces',
+        'label': 'Intersecting Faces',
+        'definition': 'A face that passes through another face of the same mesh, one it shares no verts with. The mesh is checked the way its modifiers leave it (posed by an Armature, say), as long as they keep its topology',
+        'default': False,
+        'elemtypes': [ 'faces' ],
+        'inputs': [ 'topology', 'evaluated' ],
+        'cost': 'heavy',
+        'shares': [ 'triangles' ],
+        'options': [ 'evaluated_coords' ]
+    })
+    def check_intersecting_faces(self, f):
+        topology = self.topology
+        bvh = topology.triangle_bvh(self.evaluated_coords())
+        tris, tri_faces = topology.triangles()
+        for t in range(topology.face_offsets[f] - 2 * f,
+                       topology.face_offsets[f + 1] - 2 * f - 2):
+            mine = tris[3 * t:3 * t + 3]
+            corners = bvh.corners(t)
+            for u in bvh.query(bvh.boxes[t]):
+                if f == tri_faces[u] \
+                        or any(v in mine for v in tris[3 * u:3 * u + 3]):
+                    continue
+                if triangles_intersect(corners, bvh.corners(u)):
+                    return True
+        return False
+
+    def array_check_intersecting_faces(self, arrays):
+        return { 'faces': arrays.intersecting_faces(
+            self.evaluated_coords(),
+            self.topology.options.get('refit_bvh', True)) }
+
+    def evaluated_coords(self):
+        coords = self.topology.options.get('evaluated_coords')
+        return self.topology.coords if None is coords else coords
+
+    CHECKS.append({
+        'symbol': 'inconsistent_normals',
+        'label': 'Inconsistent Normals',
+        'definition': 'A face wound the other way from most of the faces it is connected to through edges with exactly 2 faces, so its normal points the wrong way (Ctrl+n would flip it). Pieces that cannot be made consistent at all, like a Moebius strip, are left alone',
+        'default': False,
+        'elemtypes': [ 'faces' ],
+        'cost': 'heavy',
+        'shares': [ 'face_links' ],
+        'local': False
+    })
+    def check_inconsistent_normals(self, f):
+        return self.topology.flipped_faces(
+            self.topology.options.get('workers', 1))[f]
+
+    def array_check_inconsistent_normals(self, arrays):
+        return { 'faces': arrays.flipped_faces() }
+
+    # [Your great new idea here] -> Tell me about it: rking@panoptic.com
+
+    # ...plus the 'Default Name' check.
+
+
+# Called with every lint register_check() adds after MeshLint is loaded
+# (the addon makes its Scene setting this way).
+CHECK_HOOKS = []
+
+
+def complete_check(lint, check=None, array_check=None):
+    '''Fills in what `lint` leaves out: it reads just the topology, costs a
+    pass over the mesh, shares no tables, has no options and is local
+    (its verdict on an element only hangs on the elements around it).
+    Its check and array_check default to MeshLintEngine's methods named
+    after it. Raises ValueError on anything MeshLint would not know what
+    to do with. Returns `lint`.'''
+    lint.setdefault('inputs', [ 'topology' ])
+    lint.setdefault('cost', 'linear')
+    lint.setdefault('shares', [])
+    lint.setdefault('options', [])
+    lint.setdefault('local', True)
+    for key, known in ('elemtypes', ELEM_TYPES), ('inputs', CHECK_INPUTS), \
+            ('shares', MeshLintEngine.SHARED):
+        unknown = [ name for name in lint[key] if not name in known ]
+        if len(unknown):
+            raise ValueError('%s: unknown %s %s' % (
+                lint['symbol'], key, ', '.join(unknown)))
+    if not lint['cost'] in COST_CLASSES:
+        raise ValueError('%s: unknown cost %s' % (
+            lint['symbol'], lint['cost']))
+    sym = lint['symbol']
+    if None is check:
+        if 1 == len(lint['elemtypes']):
+            names = { lint['elemtypes'][0]: 'check_' + sym }
+        else:
+            names = { elemtype: 'check_%s_%s' % (sym, elemtype)
+                      for elemtype in lint['elemtypes'] }
+        check = { elemtype: getattr(MeshLintEngine, name, None)
+                  for elemtype, name in names.items() }
+    elif not isinstance(check, dict):
+        check = { elemtype: check for elemtype in lint['elemtypes'] }
+    if any(None is check.get(elemtype) for elemtype in lint['elemtypes']):
+        raise ValueError('%s: no check for every element type' % sym)
+    if None is array_check:
+        array_check = getattr(MeshLintEngine, 'array_check_' + sym, None)
+    lint['check'] = check
+    lint['array_check'] = array_check
+    return lint
+
+
+for lint in MeshLintEngine.CHECKS:
+    complete_check(lint)
+del lint
+
+
+def register_check(lint, check, array_check=None):
+    '''Adds a check from outside this file to MeshLintEngine.CHECKS.
+
+    `lint` is a dict like the ones there: 'symbol', 'label', 'definition',
+    'default' and 'elemtypes', plus whichever of 'inputs', 'cost',
+    'shares', 'options' and 'local' it needs (see complete_check()).
+    `check(engine, i)` says whether element i is bad, or is a dict of such
+    predicates by element type if it visits several. `array_check(engine,
+    arrays)`, if given, returns a boolean mask per element type for the
+    NumPy backend, which otherwise runs `check` over every element. Both
+    read what they share through engine.shared(). Returns `lint`.'''
+    if any(lint['symbol'] == other['symbol']
+           for other in MeshLintEngine.CHECKS):
+        raise ValueError('%s is already a check' % lint['symbol'])
+    MeshLintEngine.CHECKS.append(complete_check(lint, check, array_check))
+    for hook in CHECK_HOOKS:
+        hook(lint)
+    return lint
+
+
+def unregister_check(symbol):
+    MeshLintEngine.CHECKS[:] = [ lint for lint in MeshLintEngine.CHECKS
+                                 if symbol != lint['symbol'] ]
+
+
+def register_shared(name, compute, array_compute=None):
+    '''Adds a table checks can list under 'shares': `compute(topology)`
+    works it out from a MeshTopology, and `array_compute(arrays)` from its
+    MeshLintArrays, for the NumPy backend. It is kept until the verts
+    move, so it may read them.'''
+    if name in MeshLintEngine.SHARED:
+        raise ValueError('%s is already shared' % name)
+    MeshLintEngine.SHARED[name] = (compute, array_compute)
+
+
+def cheapest_first(lints):
+    'The same `lints`, in the order of their cost classes.'
+    return sorted(lints, key=lambda lint: COST_CLASSES.index(lint['cost']))
+
+
+def reads_coords(lint):
+    'Whether where the verts are can change what `lint` finds.'
+    return any(source in lint['inputs'] for source in ('coords', 'evaluated'))
+
+
+class MeshLintStream:
+    '''Lints a mesh a chunk of faces at a time, keeping only a few bytes per
+    vert and edge in between, for meshes too big to hold as a BMesh (or
+    even a MeshTopology). Needs NumPy.
+
+    `source` is where the mesh comes from (see MeshArraySource,
+    PlyFaceSource and ObjFaceSource), with:
+     - coords(): every vert's x, y, z, flat, as float32
+     - face_chunks(size): (sizes, loop_verts) of up to `size` faces at a
+       time, in order, read afresh on every call
+     - edge_keys(): its own edges (see edge_keys()) in its own order, or
+       None if it has none; the edges are then numbered sorted by verts
+
+    Tris, Ngons and Noncoplanar Faces only look at a face itself, so they
+    run on every chunk, as a MeshTopology of its own. Nonmanifold
+    Elements, Interior Faces and 6+-edge Poles come from what is kept
+    from one chunk to the next:
+     - keys: every edge, sorted (8 bytes an edge)
+     - counts: every edge's faces, counted up to 3 (1 byte)
+     - parent: a union-find forest over both ends of every edge, whose
+       sets are the fans of faces BM_vert_is_manifold() walks (8 bytes)
+    Checks that need the whole mesh at once (Inconsistent Normals,
+    Intersecting Faces) are left out and listed in self.skipped, and open
+    edges on a Mirror modifier's plane are not exempted.'''
+
+    FACE_CHECKS = [ 'tris', 'ngons', 'noncoplanar' ]
+    EDGE_CHECKS = [ 'nonmanifold', 'interior_faces', 'sixplus_poles' ]
+
+    def __init__(self, source, options=None, chunk_faces=STREAM_CHUNK_FACES):
+        self.source = source
+        self.options = {} if None is options else options
+        self.chunk_faces = chunk_faces
+        self.skipped = []
+        self.peak_bytes = None
+
+    def analyze(self, lints):
+        '''A report per lint, like MeshLintEngine.analyze(), the skipped
+        ones empty. Afterwards self.peak_bytes is the most memory the pass
+        had allocated at any one time, as tracemalloc saw it (so it stays
+        None without tracemalloc, or if something else is tracing).'''
+        try:
+            import tracemalloc
+        except ImportError:
+            tracemalloc = None
+        tracing = None is tracemalloc or tracemalloc.is_tracing()
+        if not tracing:
+            tracemalloc.start()
+        try:
+            bad = self.run(lints)
+        finally:
+            if not tracing:
+                self.peak_bytes = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+        analysis = []
+        for lint in lints:
+            report = { 'lint': lint }
+            for elemtype in ELEM_TYPES:
+                report[elemtype] = bad.get(lint['symbol'], {}).get(
+                    elemtype, LintIndices())
+            analysis.append(report)
+        return analysis
+
+    def stats(self):
+        'What a report on a streamed mesh says about how it was checked.'
+        return {
+            'streamed': True,
+            'peak_bytes': self.peak_bytes,
+            'skipped': [ lint['symbol'] for lint in self.skipped ] }
+
+    def chunks(self):
+        return self.source.face_chunks(self.chunk_faces)
+
+    @classmethod
+    def chunk_loops(cls, sizes):
+        'Where each face of a chunk starts, and every loop\'s next loop.'
+        starts = numpy.cumsum(sizes) - sizes
+        following = numpy.arange(1, int(sizes.sum()) + 1)
+        following[starts + sizes - 1] = starts
+        return starts, following
+
+    def chunk_topology(self, coords, sizes, loop_verts):
+        offsets = numpy.zeros(len(sizes) + 1, numpy.intc)
+        offsets[1:] = numpy.cumsum(sizes)
+        nothing = numpy.zeros(0, numpy.intc)
+        chunk = MeshTopology(
+            coords, offsets, numpy.ascontiguousarray(loop_verts, numpy.intc),
+            nothing, nothing)
+        chunk.options = self.options
+        return chunk
+
+    @classmethod
+    def tally(cls, values):
+        '''The distinct values, sorted, and how often each comes up (what
+        numpy.unique() gives, by sorting, which is faster on these).'''
+        values = numpy.sort(values)
+        if not len(values):
+            return values, numpy.zeros(0, numpy.int64)
+        firsts = numpy.flatnonzero(numpy.concatenate((
+            [ True ], values[1:] != values[:-1])))
+        return values[firsts], numpy.diff(numpy.append(firsts, len(values)))
+
+    def blocks(self, length):
+        'Slices covering range(length), a few chunks\' worth of loops each.'
+        step = 4 * self.chunk_faces
+        for start in range(0, length, step):
+            yield slice(start, min(length, start + step))
+
+    def run(self, lints):
+        symbols = [ lint['symbol'] for lint in lints ]
+        self.skipped = [ lint for lint in lints if not lint['symbol']
+                         in self.FACE_CHECKS + self.EDGE_CHECKS ]
+        face_lints = [ lint for lint in lints
+                       if lint['symbol'] in self.FACE_CHECKS ]
+        coords = self.source.coords()
+        num_verts = len(coords) // 3
+        found = { lint['symbol']: [] for lint in face_lints }
+        keys = self.source.edge_keys()
+        # Each chunk's edge keys wait in `fresh` until there are about as
+        # many as gathered so far, and are then merged in all at once, so
+        # every key gets sorted a few times over rather than once a chunk.
+        gathered = numpy.zeros(0, numpy.uint64)
+        fresh = []
+        waiting = 0
+        base = 0
+        if len(face_lints) or None is keys:
+            for sizes, loop_verts in self.chunks():
+                if len(face_lints):
+                    chunk = self.chunk_topology(coords, sizes, loop_verts)
+                    for symbol, results in MeshLintEngine(chunk) \
+                            .run_array_checks(face_lints).items():
+                        found[symbol].append(
+                            results['faces'].view().astype(numpy.int64)
+                            + base)
+                if None is keys:
+                    starts, following = self.chunk_loops(sizes)
+                    fresh.append(self.tally(edge_keys(
+                        loop_verts, loop_verts[following]))[0])
+                    waiting += len(fresh[-1])
+                    if len(gathered) <= waiting:
+                        gathered = self.tally(
+                            numpy.concatenate([ gathered ] + fresh))[0]
+                        fresh = []
+                        waiting = 0
+                base += len(sizes)
+        if len(fresh):
+            gathered = self.tally(numpy.concatenate([ gathered ] + fresh))[0]
+        del fresh
+        bad = { symbol: { 'faces': LintIndices(numpy.concatenate(
+                    [ numpy.zeros(0, numpy.int64) ] + found[symbol])) }
+                for symbol in found }
+        if not any(symbol in self.EDGE_CHECKS for symbol in symbols):
+            return bad
+
+        order = None
+        if None is keys:
+            keys = gathered
+        else:
+            order = numpy.argsort(keys, kind='mergesort')
+            keys = keys[order]
+        del gathered
+        low = numpy.uint64(0xffffffff)
+        num_edges = len(keys)
+        counts = numpy.zeros(num_edges, numpy.uint8)
+        fans = 'nonmanifold' in symbols
+        index = numpy.int32 if 2 * num_edges < 2 ** 31 else numpy.int64
+        if fans:
+            parent = numpy.arange(2 * num_edges, dtype=index)
+        for sizes, loop_verts in self.chunks():
+            starts, following = self.chunk_loops(sizes)
+            loop_edges = numpy.searchsorted(
+                keys, edge_keys(loop_verts, loop_verts[following]))
+            edges, hits = self.tally(loop_edges)
+            counts[edges] = numpy.minimum(counts[edges] + hits, 3)
+            if fans:
+                # A corner sits between the edge into its vert and the edge
+                # out of it; each edge end is a slot, 2 * edge + (is it
+                # the edge's higher vert).
+                verts = loop_verts.astype(numpy.uint64)
+                previous = numpy.empty_like(following)
+                previous[following] = numpy.arange(len(following))
+                into = loop_edges[previous]
+                outs = 2 * loop_edges + ((keys[loop_edges] & low) == verts)
+                ins = 2 * into + ((keys[into] & low) == verts)
+                union_pairs(parent, ins.astype(index), outs.astype(index))
+
+        if 'interior_faces' in symbols:
+            interior = []
+            base = 0
+            for sizes, loop_verts in self.chunks():
+                starts, following = self.chunk_loops(sizes)
+                loop_edges = numpy.searchsorted(
+                    keys, edge_keys(loop_verts, loop_verts[following]))
+                fewest = numpy.minimum.reduceat(counts[loop_edges], starts)
+                interior.append(numpy.flatnonzero(2 < fewest) + base)
+                base += len(sizes)
+            bad['interior_faces'] = { 'faces': LintIndices(numpy.concatenate(
+                [ numpy.zeros(0, numpy.int64) ] + interior)) }
+
+        valences = numpy.zeros(num_verts, numpy.int64)
+        rough_verts = numpy.zeros(num_verts, bool)
+        fan_counts = numpy.zeros(num_verts, numpy.int64)
+        for block in self.blocks(num_edges):
+            ends = numpy.column_stack((keys[block] >> numpy.uint64(32),
+                                       keys[block] & low)).astype(numpy.int64)
+            # The keys are sorted, so the lower verts come in order.
+            lows = ends[:, 0]
+            if len(lows):
+                valences[lows[0]:lows[-1] + 1] += \
+                    numpy.bincount(lows - lows[0])
+            highs, hits = self.tally(ends[:, 1])
+            valences[highs] += hits
+            rough = (0 == counts[block]) | (2 < counts[block])
+            rough_verts[ends[rough].ravel()] = True
+            if fans:
+                slots = numpy.arange(2 * block.start, 2 * block.stop)
+                roots = slots[parent[2 * block.start:2 * block.stop] == slots]
+                verts, hits = self.tally(
+                    ends.ravel()[roots - 2 * block.start])
+                fan_counts[verts] += hits
+        if 'sixplus_poles' in symbols:
+            bad['sixplus_poles'] = {
+                'verts': LintIndices.from_mask(5 < valences) }
+        if fans:
+            bad_verts = (0 == valences) | rough_verts | (1 != fan_counts)
+            bad_edges = numpy.flatnonzero(2 != counts)
+            if not None is order:
+                bad_edges = numpy.sort(order[bad_edges])
+            bad['nonmanifold'] = {
+                'verts': LintIndices.from_mask(bad_verts),
+                'edges': LintIndices(bad_edges) }
+        return bad
+
+
+class MeshArraySource:
+    '''A mesh already in memory, for MeshLintStream: flat coords, every
+    face's size, and its verts (all NumPy arrays), dealt out in chunks.'''
+
+    def __init__(self, coords, sizes, loop_verts, keys=None):
+        self.flat_coords = coords
+        self.sizes = sizes
+        self.loop_verts = loop_verts
+        self.keys = keys
+
+    @classmethod
+    def from_mesh(cls, mesh):
+        '''From a bpy Mesh. Blender hands out an attribute of every element
+        at once or not at all, so this holds 4 bytes a loop and 4 a face
+        (next to the 100 and more a loop costs in a BMesh).'''
+        def pull(collection, attr, width):
+            return MeshLintArrays.view(
+                pull_attribute(collection, attr, 'i', width), numpy.intc)
+        ends = pull(mesh.edges, 'vertices', 2)
+        return cls(
+            MeshLintArrays.view(pull_attribute(mesh.vertices, 'co', 'f', 3),
+                                numpy.float32),
+            pull(mesh.polygons, 'loop_total', 1),
+            pull(mesh.loops, 'vertex_index', 1),
+            edge_keys(ends[0::2], ends[1::2]))
+
+    def coords(self):
+        return self.flat_coords
+
+    def edge_keys(self):
+        return self.keys
+
+    def face_chunks(self, size):
+        start = 0
+        for f in range(0, len(self.sizes), size):
+            sizes = self.sizes[f:f + size]
+            stop = start + int(sizes.sum())
+            yield sizes, self.loop_verts[start:stop]
+            start = stop
+
+
+class PlyFaceSource:
+    '''A .ply file, ascii or binary, for MeshLintStream: the x, y and z of
+    its vertex element and the vertex_indices (or vertex_index) list of its
+    face element. Nothing else in it is looked at.'''
+
+    TYPES = {
+        'char': 'i1', 'int8': 'i1', 'uchar': 'u1', 'uint8': 'u1',
+        'short': 'i2', 'int16': 'i2', 'ushort': 'u2', 'uint16': 'u2',
+        'int': 'i4', 'int32': 'i4', 'uint': 'u4', 'uint32': 'u4',
+        'float': 'f4', 'float32': 'f4', 'double': 'f8', 'float64': 'f8' }
+
+    # How much of a binary file's faces is read in at a time.
+    READ_BYTES = 1 << 22
+
+    def __init__(self, path):
+        self.path = path
+        self.format = None
+        # (name, count, [ (property, type, or (count type, item type)) ])
+        self.elements = []
+        with open(path, 'rb') as source:
+            if b'ply' != source.readline().strip():
+                raise ValueError('%s is not a PLY file' % path)
+            while True:
+                line = source.readline()
+                if not line:
+                    raise ValueError('%s has no end_header' % path)
+                words = line.decode('ascii', 'replace').split()
+                if not words:
+                    continue
+                if 'format' == words[0]:
+                    self.format = words[1]
+                elif 'element' == words[0]:
+                    self.elements.append((words[1], int(words[2]), []))
+                elif 'property' == words[0] and 'list' == words[1]:
+                    self.elements[-1][2].append(
+                        (words[4], (words[2], words[3])))
+                elif 'property' == words[0]:
+                    self.elements[-1][2].append((words[2], words[1]))
+                elif 'end_header' == words[0]:
+                    break
+            self.header_bytes = source.tell()
+        self.binary = 'ascii' != self.format
+        self.order = '>' if 'binary_big_endian' == self.format else '<'
+
+    def dtype(self, kind):
+        return numpy.dtype(self.order + self.TYPES[kind])
+
+    def locate(self, name):
+        '''The element called `name`, and where it starts: a byte offset
+        into a binary file, a line count past the header of an ascii one.'''
+        skip = 0
+        for element in self.elements:
+            if name == element[0]:
+                return element, skip
+            if not self.binary:
+                skip += element[1]
+            elif any(isinstance(kind, tuple) for prop, kind in element[2]):
+                raise ValueError('%s: cannot skip its %s element'
+                                 % (self.path, element[0]))
+            else:
+                skip += element[1] * sum(
+                    self.dtype(kind).itemsize for prop, kind in element[2])
+        raise ValueError('%s has no %s element' % (self.path, name))
+
+    def open_at(self, name):
+        element, skip = self.locate(name)
+        source = open(self.path, 'rb')
+        source.seek(self.header_bytes + (skip if self.binary else 0))
+        if not self.binary:
+            for i in range(skip):
+                source.readline()
+        return element, source
+
+    def coords(self):
+        (name, count, props), source = self.open_at('vertex')
+        names = [ prop for prop, kind in props ]
+        columns = [ names.index(axis) for axis in ('x', 'y', 'z') ]
+        coords = numpy.empty((count, 3), numpy.float32)
+        with source:
+            step = 4 * STREAM_CHUNK_FACES
+            for start in range(0, count, step):
+                stop = min(count, start + step)
+                if self.binary:
+                    rows = numpy.fromfile(source, numpy.dtype([
+                        (prop, self.dtype(kind)) for prop, kind in props ]),
+                        stop - start)
+                    if len(rows) < stop - start:
+                        raise ValueError('%s ends too soon' % self.path)
+                    for axis in range(3):
+                        coords[start:stop, axis] = rows[names[columns[axis]]]
+                else:
+                    for v in range(start, stop):
+                        words = source.readline().split()
+                        coords[v] = [ float(words[c]) for c in columns ]
+        return coords.ravel()
+
+    def edge_keys(self):
+        return None
+
+    def face_chunks(self, size):
+        (name, count, props), source = self.open_at('face')
+        lists = [ i for i, (prop, kind) in enumerate(props)
+                  if prop in ('vertex_indices', 'vertex_index') ]
+        if not lists or (self.binary and 1 < len(props)) or lists[0]:
+            raise ValueError('%s: faces need vertex_indices, and only that'
+                             % self.path)
+        with source:
+            if self.binary:
+                counted, item = [ self.dtype(kind) for kind in props[0][1] ]
+                for chunk in self.binary_faces(source, count, counted, item,
+                                               size):
+                    yield chunk
+                return
+            sizes = array('i')
+            loop_verts = array('i')
+            for f in range(count):
+                words = source.readline().split()
+                total = int(words[0])
+                sizes.append(total)
+                loop_verts.extend(map(int, words[1:1 + total]))
+                if size == len(sizes) or count == f + 1:
+                    yield (MeshLintArrays.view(sizes, numpy.intc),
+                           MeshLintArrays.view(loop_verts, numpy.intc))
+                    sizes = array('i')
+                    loop_verts = array('i')
+
+    def binary_faces(self, source, count, counted, item, size):
+        '''Reads binary faces in runs of faces with the same number of
+        verts, each of which is one strided NumPy view of what was read.'''
+        sizes, loop_verts = [], []
+        chunked = 0
+        pending = b''
+        left = count
+        while left:
+            data = pending + source.read(self.READ_BYTES)
+            if len(data) == len(pending):
+                raise ValueError('%s ends too soon' % self.path)
+            at = 0
+            while left and at + counted.itemsize <= len(data):
+                total = int(numpy.frombuffer(data, counted, 1, at)[0])
+                row = counted.itemsize + total * item.itemsize
+                fit = min(left, size - chunked, (len(data) - at) // row)
+                if not fit:
+                    break
+                totals = numpy.ndarray((fit,), counted, data, at, (row,))
+                run = totals == total
+                if not run.all():
+                    fit = int(numpy.argmin(run))
+                sizes.append(numpy.full(fit, total, numpy.intc))
+                loop_verts.append(numpy.ndarray(
+                    (fit, total), item, data, at + counted.itemsize,
+                    (row, item.itemsize)).astype(numpy.intc).ravel())
+                at += fit * row
+                left -= fit
+                chunked += fit
+                if size == chunked or not left:
+                    yield (numpy.concatenate(sizes),
+                           numpy.concatenate(loop_verts))
+                    sizes, loop_verts = [], []
+                    chunked = 0
+            pending = data[at:]
+
+
+class ObjFaceSource:
+    '''A Wavefront .obj file, for MeshLintStream: its v and f lines, with
+    all of its objects and groups taken as one mesh. A face's vert indices
+    count from 1, or, when negative, back from the latest v line.'''
+
+    def __init__(self, path):
+        self.path = path
+
+    def coords(self):
+        coords = array('f')
+        with open(self.path, 'rb') as source:
+            for line in source:
+                words = line.split()
+                if words and b'v' == words[0]:
+                    coords.extend(map(float, words[1:4]))
+        return MeshLintArrays.view(coords, numpy.float32)
+
+    def edge_keys(self):
+        return None
+
+    def face_chunks(self, size):
+        sizes = array('i')
+        loop_verts = array('i')
+        seen = 0
+        with open(self.path, 'rb') as source:
+            for line in source:
+                words = line.split()
+                if not words:
+                    continue
+                if b'v' == words[0]:
+                    seen += 1
+                elif b'f' == words[0]:
+                    corners = [ int(word.split(b'/')[0])
+                                for word in words[1:] ]
+                    sizes.append(len(corners))
+                    loop_verts.extend(
+                        v - 1 if 0 < v else seen + v for v in corners)
+                    if size == len(sizes):
+                        yield (MeshLintArrays.view(sizes, numpy.intc),
+                               MeshLintArrays.view(loop_verts, numpy.intc))
+                        sizes = array('i')
+                        loop_verts = array('i')
+        if len(sizes):
+            yield (MeshLintArrays.view(sizes, numpy.intc),
+                   MeshLintArrays.view(loop_verts, numpy.intc))
+
+
+def open_face_source(path):
+    'A MeshLintStream source for a .ply or .obj file.'
+    kind = os.path.splitext(path)[1].lower()
+    if '.ply' == kind:
+        return PlyFaceSource(path)
+    if '.obj' == kind:
+        return ObjFaceSource(path)
+    raise ValueError('%s: only .ply and .obj files can be streamed' % path)
+
+
+def element_positions(topology, elemtype, indices, matrix=None):
+    '''Where the elements `indices` of `elemtype` are, as [x, y, z] lists:
+    a vert's coords, the middle of an edge, or the average of a face's
+    corners, taken through `matrix` (4 rows, like an object's
+    matrix_world) if there is one.'''
+    if has_numpy():
+        arrays = topology.arrays()
+        indices = index_array(indices)
+        if 'verts' == elemtype:
+            points = arrays.coords[indices].astype(numpy.float64)
+        elif 'edges' == elemtype:
+            points = arrays.coords[arrays.edge_verts[indices]].mean(1)
+        elif not len(indices):
+            points = numpy.zeros((0, 3))
+        else:
+            totals = arrays.loop_totals[indices]
+            corners = arrays.coords[arrays.loop_verts[
+                arrays.loops_of(indices)]].astype(numpy.float64)
+            points = numpy.add.reduceat(
+                corners, numpy.cumsum(totals) - totals) / totals[:, None]
+        if not None is matrix:
+            matrix = numpy.asarray(matrix, numpy.float64)
+            points = points.dot(matrix[:3, :3].T) + matrix[:3, 3]
+        return points.round(6).tolist()
+    coords = topology.coords
+    points = []
+    for i in indices:
+        if 'verts' == elemtype:
+            verts = [i]
+        elif 'edges' == elemtype:
+            verts = topology.edges[2 * i:2 * i + 2]
+        else:
+            verts = topology.face_verts[topology.face_offsets[i]:
+                                        topology.face_offsets[i + 1]]
+        point = [ sum(coords[3 * v + axis] for v in verts) / len(verts)
+                  for axis in range(3) ]
+        if not None is matrix:
+            point = [ sum(row[axis] * point[axis] for axis in range(3))
+                      + row[3] for row in matrix[:3] ]
+        points.append([ round(x, 6) for x in point ])
+    return points
+
+
+class MeshLintReportWriter:
+    '''Writes analyses to `out`, a text file, an object at a time, in one
+    of the REPORT_FORMATS: JSON Lines, a line per check of every object
+    with the indices of what it found, or JUnit XML, for CI servers, with a
+    test suite per object and a test case per check. Long lists of
+    elements are written out REPORT_CHUNK_SIZE at a time, so nothing the
+    size of the whole report is ever put together in memory. With
+    `positions`, every element listed also gets its world-space position
+    (see element_positions()).'''
+
+    EXTENSIONS = { 'JSONL': '.jsonl', 'JUNIT': '.xml' }
+
+    def __init__(self, out, format='JSONL', positions=False):
+        self.out = out
+        self.format = format
+        self.positions = positions
+        self.path = None
+        if 'JUNIT' == format:
+            out.write('<?xml version="1.0" encoding="utf-8"?>\n'
+                      '<testsuites name="MeshLint">\n')
+
+    def add(self, name, mesh_name, analysis, topology=None, matrix=None):
+        '''Writes out the analysis of object `name`. Positions come from
+        its `topology`, the MeshTopology it was checked on, and `matrix`,
+        its matrix_world; without a topology there are none.'''
+        if not self.positions:
+            topology = None
+        if 'JUNIT' == self.format:
+            self.add_suite(name, mesh_name, analysis, topology, matrix)
+            return
+        for report in analysis:
+            lint = report['lint']
+            head = json.dumps({
+                'object': name,
+                'mesh': mesh_name,
+                'check': lint['symbol'],
+                'label': lint['label'],
+                'count': sum(len(report[elemtype])
+                             for elemtype in ELEM_TYPES) })
+            self.out.write(head[:-1])
+            for elemtype in ELEM_TYPES:
+                self.out.write(', "%s": ' % elemtype)
+                self.write_list(report[elemtype])
+            if not None is topology:
+                self.out.write(', "positions": {')
+                for elemtype in ELEM_TYPES:
+                    self.out.write('%s"%s": ' % (
+                        ', ' if 'verts' != elemtype else '', elemtype))
+                    self.write_list(report[elemtype], functools.partial(
+                        element_positions, topology, elemtype,
+                        matrix=matrix))
+                self.out.write('}')
+            self.out.write('}\n')
+
+    def write_list(self, indices, encode=list):
+        'A JSON list of encode(chunk) for each chunk of `indices`.'
+        self.out.write('[')
+        for at in range(0, len(indices), REPORT_CHUNK_SIZE):
+            if at:
+                self.out.write(', ')
+            self.out.write(json.dumps(
+                encode(indices[at:at + REPORT_CHUNK_SIZE]))[1:-1])
+        self.out.write(']')
+
+    def add_suite(self, name, mesh_name, analysis, topology, matrix):
+        from xml.sax.saxutils import escape, quoteattr
+        counts = [ [ '%d %s' % (len(report[elemtype]), depluralize(
+                         count=len(report[elemtype]), string=elemtype))
+                     for elemtype in ELEM_TYPES if len(report[elemtype]) ]
+                   for report in analysis ]
+        self.out.write('  <testsuite name=%s tests="%d" failures="%d">\n' % (
+            quoteattr(name), len(analysis), sum(map(bool, counts))))
+        for report, found in zip(analysis, counts):
+            lint = report['lint']
+            self.out.write('    <testcase classname=%s name=%s' % (
+                quoteattr('%s.%s' % (name, mesh_name)),
+                quoteattr(lint['label'])))
+            if not len(found):
+                self.out.write('/>\n')
+                continue
+            self.out.write('>\n      <failure type=%s message=%s>' % (
+                quoteattr(lint['symbol']), quoteattr(', '.join(found))))
+            for elemtype in ELEM_TYPES:
+                indices = report[elemtype]
+                singular = depluralize(count=1, string=elemtype)
+                for at in range(0, len(indices), REPORT_CHUNK_SIZE):
+                    chunk = indices[at:at + REPORT_CHUNK_SIZE]
+                    if None is topology:
+                        lines = [ '%s %d' % (singular, i) for i in chunk ]
+                    else:
+                        lines = [ '%s %d at (%r, %r, %r)' % (
+                                      (singular, i) + tuple(point))
+                                  for i, point in zip(chunk,
+                                      element_positions(topology, elemtype,
+                                                        chunk, matrix)) ]
+                    self.out.write(escape('\n' + '\n'.join(lines)))
+            self.out.write('\n      </failure>\n    </testcase>\n')
+        self.out.write('  </testsuite>\n')
+
+    @classmethod
+    def create(cls, path, format='JSONL', positions=False):
+        '''A writer to a new file at `path`. The file only turns up there
+        once the writer is close()d, complete.'''
+        writer = cls(open(path + '.partial', 'w'), format, positions)
+        writer.path = path
+        return writer
+
+    def close(self):
+        '''Finishes the document off. `out` is left open, unless this
+        writer create()d it.'''
+        if 'JUNIT' == self.format:
+            self.out.write('</testsuites>\n')
+        if not None is self.path:
+            self.out.close()
+            os.rename(self.path + '.partial', self.path)
+
+
+class MeshLintScheduler:
+    '''Paces the live checker.
+
+    notice_change() is called whenever the mesh might have changed, and
+    tick() on every scene update. A lint pass starts only once the
+    changes have stopped for `debounce` seconds (trailing edge) and at
+    least `min_interval` seconds after the previous pass started. The
+    pass is a generator from start(); each tick runs it for no more
+    than `budget` seconds and picks it up again on the next tick. Its
+    last, non-None item goes to finish(). A change noticed mid-pass
+    throws the pass away, since its result would already be stale.
+
+    Everything is timed with `clock`, so tests can pass a fake one.'''
+
+    def __init__(self, start, finish, clock=time.time,
+                 min_interval=0.2, debounce=0.1, budget=0.02):
+        self.start = start
+        self.finish = finish
+        self.clock = clock
+        self.min_interval = min_interval
+        self.debounce = debounce
+        self.budget = budget
+        self.work = None
+        self.pending = False
+        self.changed_at = None
+        self.started_at = None
+
+    def notice_change(self):
+        self.pending = True
+        self.changed_at = self.clock()
+        self.work = None
+
+    def is_due(self, now):
+        if not self.pending:
+            return False
+        if self.debounce > now - self.changed_at:
+            return False
+        return None is self.started_at \
+            or self.min_interval <= now - self.started_at
+
+    def tick(self):
+        now = self.clock()
+        if None is self.work:
+            if not self.is_due(now):
+                return
+            self.pending = False
+            self.started_at = now
+            self.work = self.start()
+        for result in self.work:
+            if not None is result:
+                self.work = None
+                self.finish(result)
+                return
+            if self.budget <= self.clock() - now:
+                return
+        self.work = None
+
+
+class MeshLintWorker:
+    '''Runs jobs, one at a time, on a thread of its own, for the live
+    checker: submit() hands over a job (anything callable, which must not
+    touch Blender) along with a tag, and poll() hands back, in order, a
+    (tag, result, error) for each one that finished, error being the
+    traceback of whatever it raised, or None. A job counts as in_flight
+    until poll() has handed it back, so until then whatever it reads can
+    be left to it alone.'''
+
+    def __init__(self):
+        self.jobs = queue.Queue()
+        self.results = queue.Queue()
+        self.thread = None
+        self.in_flight = 0
+
+    def submit(self, job, tag=None):
+        if None is self.thread:
+            self.thread = threading.Thread(
+                target=self.run, name='MeshLintWorker')
+            self.thread.daemon = True
+            self.thread.start()
+        self.in_flight += 1
+        self.jobs.put((job, tag))
+
+    def run(self):
+        import traceback
+        while True:
+            job, tag = self.jobs.get()
+            try:
+                self.results.put((tag, job(), None))
+            except Exception:
+                self.results.put((tag, None, traceback.format_exc()))
+
+    def poll(self, timeout=None):
+        '''The next finished job, or None if there is none yet. With a
+        `timeout`, waits that many seconds for one.'''
+        try:
+            done = self.results.get(not None is timeout, timeout)
+        except queue.Empty:
+            return None
+        self.in_flight -= 1
+        return done
+
+
 # Look for the "seeing error text", below. Something is super-fishy, but this
 # is the workaround.
 try:
     import bpy
     import bmesh
-    import time
     import re
-    from mathutils import Vector
+    from mathutils import Matrix, Vector
 
     SUBPANEL_LABEL = 'MeshLint'
     COMPLAINT_TIMEOUT = 3 # seconds
-    ELEM_TYPES = [ 'verts', 'edges', 'faces' ]
+
+    # Below this many elements to select, setting them one by one in the edit
+    # BMesh beats the round trip out of Edit Mode that foreach_set needs.
+    BULK_SELECT_MIN = 10000
 
     N_A_STR = '(N/A - disabled)'
     TBD_STR = '...'
@@ -71,189 +3074,584 @@ try:
 
 
     class MeshLintAnalyzer:
-        CHECKS = []
+        'Feeds the MeshLintEngine from Blender, and takes care of the UI state.'
+        CHECKS = MeshLintEngine.CHECKS
 
-        def __init__(self):
-            self.obj = bpy.context.active_object
-            ensure_edit_mode()
-            self.b = bmesh.from_edit_mesh(self.obj.data)
+        # Object name -> the MeshTopology it had last time, along with all
+        # the adjacency and results derived from it so far.
+        topology_cache = collections.OrderedDict()
+        TOPOLOGY_CACHE_SIZE = 16
+
+        # See result_cache().
+        shared_results = MeshLintResultCache()
+
+        def __init__(self, obj=None):
+            '''Without `obj`, lints the active object in Edit Mode (entering
+            it if need be), reading it through BMesh. With one, reads obj.data
+            directly and leaves the mode alone, so nothing needs to be
+            active.'''
+            self.topology = None
+            if None is obj:
+                self.obj = bpy.context.active_object
+                ensure_edit_mode()
+                self.b = bmesh.from_edit_mesh(self.obj.data)
+            else:
+                self.obj = obj
+                self.b = None
             self.num_problems_found = None
+            self.profile = None
+
+        def find_problems(self, backend=None, dirty=None, previous=None):
+            '''Runs the checks enabled in the Scene. See
+            MeshLintEngine.analyze() for `dirty` and `previous`. With the
+            Scene's meshlint_profile on, self.profile is left holding what
+            each check cost (see MeshLintEngine.profile).'''
+            for analysis in self.iter_find_problems(backend, dirty, previous):
+                pass
+            return analysis
+
+        def iter_find_problems(self, backend=None, dirty=None, previous=None):
+            '''find_problems() in resumable steps: yields None every so often
+            while it works, and the analysis as its last item.'''
+            if None is backend:
+                backend = bpy.context.scene.meshlint_backend
+            engine = self.engine()
+            for analysis in engine.iter_analyze(
+                    MeshLintAnalyzer.enabled_checks(), backend, dirty,
+                    previous):
+                if None is analysis:
+                    yield None
+            self.tally(analysis, engine)
+            yield analysis
+
+        @classmethod
+        def find_problems_of(cls, objs, backend=None):
+            '''Lints several objects at once, reading each one's Mesh
+            directly, so none has to be active or in Edit Mode. The Meshes
+            are read here. On the NumPy backend, the checks then run on up to
+            meshlint_workers threads, since they do not touch Blender and
+            NumPy lets go of the GIL; the Python backend's checks hold it
+            throughout, so they run one Mesh after another. Objects sharing a
+            Mesh
+            (with the same settings) are checked once between them, and
+            through result_cache() not at all if it was done before.
+            Returns an (analyzer, analysis) per object.'''
+            from concurrent.futures import ThreadPoolExecutor
+            if None is backend:
+                backend = bpy.context.scene.meshlint_backend
+            enabled = cls.enabled_checks()
+            cache = cls.result_cache()
+            analyzers = [ cls(obj) for obj in objs ]
+            workers = 1
+            if 'NUMPY' == backend and has_numpy():
+                workers = max(1, bpy.context.scene.meshlint_workers)
+            keys = []
+            runs = collections.OrderedDict()
+            for analyzer in analyzers:
+                engine = analyzer.engine(cache)
+                if 1 < workers:
+                    # The objects are what gets shared out already.
+                    analyzer.topology.set_option('workers', 1)
+                key = tuple(analyzer.topology.result_key(lint)
+                            for lint in enabled)
+                runs.setdefault(key, engine)
+                keys.append(key)
+            def run(engine):
+                return engine, engine.analyze(enabled, backend)
+            if 1 < workers:
+                with ThreadPoolExecutor(workers) as pool:
+                    done = dict(zip(runs, pool.map(run, runs.values())))
+            else:
+                done = dict(zip(runs, map(run, runs.values())))
+            found = []
+            for analyzer, key in zip(analyzers, keys):
+                engine, analysis = done[key]
+                analyzer.tally(analysis, engine)
+                found.append((analyzer, analysis))
+            return found
+
+        def has_lint(self, backend=None):
+            '''Whether the Mesh fails any check enabled in the Scene,
+            stopping at the first problem (see MeshLintEngine.has_lint()).
+            Leaves the selection alone.'''
+            if None is backend:
+                backend = bpy.context.scene.meshlint_backend
+            engine = self.engine(MeshLintAnalyzer.result_cache())
+            return engine.has_lint(MeshLintAnalyzer.enabled_checks(), backend)
+
+        @classmethod
+        def result_cache(cls):
+            '''The MeshLintResultCache shared by every multi-object pass,
+            sized and placed as the Scene says.'''
+            scene = bpy.context.scene
+            cls.shared_results.max_bytes = \
+                int(scene.meshlint_cache_megabytes * 1024 * 1024)
+            cls.shared_results.directory = \
+                bpy.path.abspath(scene.meshlint_cache_dir) or None
+            return cls.shared_results
+
+        def engine(self, cache=None):
+            return MeshLintEngine(self.read_topology(),
+                                  bpy.context.scene.meshlint_profile, cache)
 
-        def find_problems(self):
-            analysis = []
+        def tally(self, analysis, engine):
+            '''Counts up what `engine` found into the CHECKS, for the UI.'''
             self.num_problems_found = 0
+            enabled = [ report['lint'] for report in analysis ]
             for lint in MeshLintAnalyzer.CHECKS:
-                sym = lint['symbol']
-                should_check = getattr(bpy.context.scene, lint['check_prop'])
-                if not should_check:
+                lint['profile'] = None
+                if not lint in enabled:
                     lint['count'] = N_A_STR
-                    continue
+            for report in analysis:
+                lint = report['lint']
                 lint['count'] = 0
-                check_method_name = 'check_' + sym
-                check_method = getattr(type(self), check_method_name)
-                bad = check_method(self)
-                report = { 'lint': lint }
                 for elemtype in ELEM_TYPES:
-                    indices = bad.get(elemtype, [])
-                    report[elemtype] = indices
-                    lint['count'] += len(indices)
-                    self.num_problems_found += len(indices)
-                analysis.append(report)
-            return analysis
-
-        def found_zero_problems(self):
-            return 0 == self.num_problems_found
+                    lint['count'] += len(report[elemtype])
+                    self.num_problems_found += len(report[elemtype])
+            self.profile = engine.profile
+            if not None is self.profile:
+                for lint in enabled:
+                    lint['profile'] = self.profile[lint['symbol']]
+                self.log_profile()
 
         @classmethod
-        def none_analysis(cls):
-            analysis = []
-            for lint in cls.CHECKS:
-                row = { elemtype: [] for elemtype in ELEM_TYPES }
-                row['lint'] = lint
-                analysis.append(row)
-            return analysis
+        def enabled_checks(cls):
+            return [ lint for lint in cls.CHECKS
+                     if getattr(bpy.context.scene, lint['check_prop']) ]
 
-        CHECKS.append({
-            'symbol': 'tris',
-            'label': 'Tris',
-            'definition': 'A face with 3 edges. Often bad for modeling because it stops edge loops and does not deform well around bent areas. A mesh might look good until you animate, so beware!',
-            'default': True
-        })
-        def check_tris(self):
-            bad = { 'faces': [] }
-            for f in self.b.faces:
-                if 3 == len(f.verts):
-                    bad['faces'].append(f.index)
-            return bad
+        def log_profile(self):
+            print('MeshLint profile of %s:' % self.obj.name)
+            for line in format_profile(self.profile):
+                print('  ' + line)
 
-        CHECKS.append({
-            'symbol': 'ngons',
-            'label': 'Ngons',
-            'definition': 'A face with >4 edges. Is generally bad in exactly the same ways as Tris',
-            'default': True
-        })
-        def check_ngons(self):
-            bad = { 'faces': [] }
-            for f in self.b.faces:
-                if 4 < len(f.verts):
-                    bad['faces'].append(f.index)
-            return bad
+        def read_topology(self):
+            if None is self.topology:
+                self.snapshot()
+            return self.topology
 
-        CHECKS.append({
-            'symbol': 'nonmanifold',
-            'label': 'Nonmanifold Elements',
-            'definition': 'Simply, shapes that won\'t hold water. More precisely, nonmanifold edges are those that do not have exactly 2 faces attached to them (either more or less). Nonmanifold verts are more complicated -- you can see their definition in BM_vert_is_manifold() in bmesh_queries.c',
-            'default': True
-        })
-        def check_nonmanifold(self):
-            bad = {}
-            for elemtype in 'verts', 'edges':
-                bad[elemtype] = []
-                for elem in getattr(self.b, elemtype):
-                    if not elem.is_manifold:
-                        bad[elemtype].append(elem.index)
-            # TODO: Exempt mirror-plane verts.
-            # Plus: ...anybody wanna tackle Mirrors with an Object Offset?
-            return bad
+        def snapshot(self):
+            '''Re-reads the topology from the Mesh, in bulk. If it has the
+            same fingerprint as last time, the cached MeshTopology comes back
+            instead, with everything it already knows.'''
+            if 'EDIT' == self.obj.mode:
+                self.obj.update_from_editmode()
+            fresh = MeshTopology.from_mesh(self.obj.data)
+            cache = MeshLintAnalyzer.topology_cache
+            cached = cache.pop(self.obj.name, None)
+            if not None is cached \
+                    and cached.name == fresh.name \
+                    and cached.fingerprint() == fresh.fingerprint():
+                cached.adopt_coords(fresh)
+                fresh = cached
+            cache[self.obj.name] = fresh
+            while MeshLintAnalyzer.TOPOLOGY_CACHE_SIZE < len(cache):
+                cache.popitem(last=False)
+            fresh.set_mirror_planes(self.mirror_planes())
+            fresh.set_option('coplanar_tolerance',
+                             bpy.context.scene.meshlint_coplanar_tolerance)
+            fresh.set_option('refit_bvh', bpy.context.scene.meshlint_refit_bvh)
+            fresh.set_option('workers', bpy.context.scene.meshlint_workers)
+            if any('evaluated' in lint['inputs']
+                   for lint in MeshLintAnalyzer.enabled_checks()):
+                fresh.set_option('evaluated_coords', self.evaluated_coords())
+            self.topology = fresh
+            return self.topology
 
-        CHECKS.append({
-            'symbol': 'interior_faces',
-            'label': 'Interior Faces',
-            'definition': 'This confuses people. It is very specific: A face whose edges ALL have >2 faces attached. The simplest way to see this is to Ctrl+r a Default Cube and hit \'f\'',
-            'default': True
-        })
-        def check_interior_faces(self): # translated from editmesh_select.c
-            bad = { 'faces': [] }
-            for f in self.b.faces:
-                if not any(3 > len(e.link_faces) for e in f.edges):
-                    bad['faces'].append(f.index)
-            return bad
+        def evaluated_coords(self):
+            '''Vert coords after the modifiers (an Armature deforming it, and
+            the like), or None when there are no modifiers, or when they
+            change the topology and so no longer line up with the Mesh.'''
+            if not len(self.obj.modifiers):
+                return None
+            mesh = self.obj.to_mesh(bpy.context.scene, True, 'PREVIEW')
+            try:
+                if len(mesh.vertices) != len(self.obj.data.vertices) \
+                        or len(mesh.polygons) != len(self.obj.data.polygons):
+                    return None
+                coords = array('f', bytes(12 * len(mesh.vertices)))
+                mesh.vertices.foreach_get('co', coords)
+                return coords
+            finally:
+                bpy.data.meshes.remove(mesh)
 
-        CHECKS.append({
-            'symbol': 'sixplus_poles',
-            'label': '6+-edge Poles',
-            'definition': 'A vertex with 6 or more edges connected to it. Generally this is not something you want, but since some kinds of extrusions will legitimately cause such a pole (imagine extruding each face of a Cube outward, the inner corners are rightful 6+-poles). Still, if you don\'t know for sure that you want them, it is good to enable this',
-            'default': False
-        })
-        def check_sixplus_poles(self):
-            bad = { 'verts': [] }
-            for v in self.b.verts:
-                if 5 < len(v.link_edges):
-                    bad['verts'].append(v.index)
-            return bad
+        def mirror_planes(self):
+            '''The planes the object's Mirror modifiers reflect it across and
+            merge it at, in its own space (see MeshTopology.mirror_planes),
+            unless the Scene says not to exempt them.'''
+            planes = []
+            if not bpy.context.scene.meshlint_exempt_mirror:
+                return planes
+            for mod in self.obj.modifiers:
+                # Without merging, the halves do not close up at the seam.
+                if 'MIRROR' != mod.type or not mod.show_viewport \
+                        or not mod.use_mirror_merge:
+                    continue
+                space = Matrix.Identity(4)
+                if not None is mod.mirror_object:
+                    space = self.obj.matrix_world.inverted() \
+                        * mod.mirror_object.matrix_world
+                origin = tuple(space.translation)
+                for axis, use in enumerate((mod.use_x, mod.use_y, mod.use_z)):
+                    if not use:
+                        continue
+                    # Square to the other two axes, which is not always
+                    # along this one (under shear or non-uniform scale).
+                    normal = Vector(space.col[(axis + 1) % 3][:3]).cross(
+                        Vector(space.col[(axis + 2) % 3][:3])).normalized()
+                    planes.append(
+                        (origin, tuple(normal), mod.merge_threshold))
+            return planes
 
-        # [Your great new idea here] -> Tell me about it: rking@panoptic.com
+        def found_zero_problems(self):
+            return 0 == self.num_problems_found
 
-        # ...plus the 'Default Name' check.
+        @classmethod
+        def none_analysis(cls):
+            return MeshLintEngine.none_analysis()
 
         def enable_anything_select_mode(self):
-            self.b.select_mode = {'VERT', 'EDGE', 'FACE'}
-
-        def select_indices(self, elemtype, indices):
-            for i in indices:
-                if 'verts' == elemtype:
-                    self.select_vert(i)
-                elif 'edges' == elemtype:
-                    self.select_edge(i)
-                elif 'faces' == elemtype:
-                    self.select_face(i)
-                else:
-                    print("MeshLint says: Huh?? → elemtype of %s." % elemtype)
-        
-        def select_vert(self, index):
-            self.b.verts[index].select = True
+            if not None is self.b:
+                self.b.select_mode = {'VERT', 'EDGE', 'FACE'}
+            bpy.context.tool_settings.mesh_select_mode = (True, True, True)
 
-        def select_edge(self, index):
-            edge = self.b.edges[index]
-            edge.select = True
-            for each in edge.verts:
-                self.select_vert(each.index)
+        def select_analysis(self, analysis):
+            '''Selects exactly what `analysis` found, and deselects the rest.
 
-        def select_face(self, index):
-            face = self.b.faces[index]
-            face.select = True
-            for each in face.edges:
-                self.select_edge(each.index)
+            A small selection is written element by element into the edit
+            BMesh. A big one is written with foreach_set onto the Mesh,
+            which means leaving Edit Mode for it and coming back.'''
+            masks = self.read_topology().selection_masks(analysis)
+            picked = { elemtype: mask_indices(masks[elemtype])
+                       for elemtype in ELEM_TYPES }
+            if not None is self.b \
+                    and BULK_SELECT_MIN > sum(map(len, picked.values())):
+                bpy.ops.mesh.select_all(action='DESELECT')
+                for elemtype in ELEM_TYPES:
+                    elems = getattr(self.b, elemtype)
+                    for i in picked[elemtype]:
+                        elems[i].select = True
+                return
+            was_editing = 'EDIT' == self.obj.mode
+            if was_editing:
+                ensure_not_edit_mode()
+                self.b = None
+            mesh = self.obj.data
+            mesh.vertices.foreach_set('select', masks['verts'])
+            mesh.edges.foreach_set('select', masks['edges'])
+            mesh.polygons.foreach_set('select', masks['faces'])
+            if was_editing:
+                ensure_edit_mode()
+                self.b = bmesh.from_edit_mesh(mesh)
 
         def topology_counts(self):
-            data = self.obj.data
+            '''How many of each element the Mesh has, from read_topology(),
+            so it works without a BMesh, and a pass right after reuses the
+            read.'''
+            topology = self.read_topology()
             return {
                 'data': self.obj.data,
-                'faces': len(self.b.faces),
-                'edges': len(self.b.edges),
-                'verts': len(self.b.verts) }
+                'faces': topology.num_faces,
+                'edges': topology.num_edges,
+                'verts': topology.num_verts,
+                'mirror_planes': self.mirror_planes() }
 
-        for lint in CHECKS:
-            sym = lint['symbol']
-            lint['count'] = TBD_STR
-            prop = 'meshlint_check_' + sym
-            lint['check_prop'] = prop
-            'meshlint_check_' + sym
-            setattr(
-                bpy.types.Scene,
-                prop,
-                bpy.props.BoolProperty(
-                    default=lint['default'],
-                    description=lint['definition']))
+    def add_check_property(lint):
+        'The Scene\'s meshlint_check_<symbol> switch for `lint`.'
+        lint['count'] = TBD_STR
+        lint['profile'] = None
+        lint['check_prop'] = 'meshlint_check_' + lint['symbol']
+        setattr(
+            bpy.types.Scene,
+            lint['check_prop'],
+            bpy.props.BoolProperty(
+                default=lint['default'],
+                description=lint['definition']))
+
+
+    def register_properties():
+        '''The Scene's MeshLint settings, a meshlint_check_<symbol> per lint
+        among them (and for every lint registered later on). Made by
+        register(), not on import, so that loading the addon (on every
+        Blender start) costs as little as it can.'''
+        for lint in MeshLintEngine.CHECKS:
+            add_check_property(lint)
+        if not add_check_property in CHECK_HOOKS:
+            CHECK_HOOKS.append(add_check_property)
+
+        bpy.types.Scene.meshlint_backend = bpy.props.EnumProperty(
+            items=BACKENDS,
+            name='Backend',
+            description='How MeshLint checks the mesh. Falls back to Python '
+                        'when NumPy is not available',
+            default='PYTHON')
+
+        bpy.types.Scene.meshlint_incremental = bpy.props.BoolProperty(
+            name='Incremental',
+            description='During Continuous Check, only re-check the '
+                        'elements around what changed since the last check '
+                        '(needs NumPy)',
+            default=True)
+
+        bpy.types.Scene.meshlint_coplanar_tolerance = bpy.props.FloatProperty(
+            name='Coplanar Tolerance',
+            description='How far a corner may stick out of its face\'s plane, '
+                        'as a fraction of the face\'s size, before the face '
+                        'counts as Noncoplanar',
+            default=COPLANAR_TOLERANCE, min=0.0, soft_max=0.2, precision=3)
+
+        bpy.types.Scene.meshlint_refit_bvh = bpy.props.BoolProperty(
+            name='Reuse Intersection Tree',
+            description='When only verts moved, refit the bounding boxes '
+                        'the Intersecting Faces check searches instead of '
+                        'building them again',
+            default=True)
+
+        bpy.types.Scene.meshlint_workers = bpy.props.IntProperty(
+            name='Workers',
+            description='How many objects Select Lint checks at once from '
+                        'Object Mode on the NumPy backend, and how many '
+                        'processes the Python backend\'s Inconsistent '
+                        'Normals check shares the islands of a big mesh out '
+                        'between (not on Windows)',
+            default=1, min=1, soft_max=16)
+
+        bpy.types.Scene.meshlint_cache_megabytes = bpy.props.FloatProperty(
+            name='Result Cache (MB)',
+            description='How much memory to keep check results of meshes in, '
+                        'so that objects sharing a mesh, or meshes that have '
+                        'not changed, are not checked again',
+            default=RESULT_CACHE_BYTES / (1024.0 * 1024.0), min=0.0,
+            soft_max=1024.0)
+
+        bpy.types.Scene.meshlint_cache_dir = bpy.props.StringProperty(
+            name='Result Cache Directory',
+            description='Also keep the check results in files here, so they '
+                        'last from one session (or batch run) to the next. '
+                        'Leave empty to keep them in memory only',
+            default='', subtype='DIR_PATH')
+
+        bpy.types.Scene.meshlint_exempt_mirror = bpy.props.BoolProperty(
+            name='Exempt Mirror Planes',
+            description='Do not count the open edges (and their verts) that '
+                        'lie on the plane of a Mirror modifier as Nonmanifold',
+            default=True)
+
+        bpy.types.Scene.meshlint_profile = bpy.props.BoolProperty(
+            name='Profile',
+            description='Time every check, show the times next to its count '
+                        'and print them to the console',
+            default=False)
+
+        bpy.types.Scene.meshlint_min_interval = bpy.props.FloatProperty(
+            name='Min Interval',
+            description='Continuous Check: seconds between the starts of two '
+                        'lint passes',
+            default=0.2, min=0.0, soft_max=5.0)
+
+        bpy.types.Scene.meshlint_debounce = bpy.props.FloatProperty(
+            name='Debounce',
+            description='Continuous Check: wait until the mesh has been left '
+                        'alone for this many seconds before checking it',
+            default=0.1, min=0.0, soft_max=5.0)
+
+        bpy.types.Scene.meshlint_budget = bpy.props.FloatProperty(
+            name='Budget (ms)',
+            description='Continuous Check: longest a lint pass may hold up '
+                        'the interface per update. Longer passes are spread '
+                        'over several updates',
+            default=20.0, min=1.0, soft_max=200.0)
+
+        bpy.types.Scene.meshlint_background = bpy.props.BoolProperty(
+            name='Check in Background',
+            description='Continuous Check: run the checks on a thread of '
+                        'their own, so the interface never waits on them. '
+                        'Results the mesh has changed since are dropped',
+            default=True)
+
+
+    def unregister_properties():
+        if add_check_property in CHECK_HOOKS:
+            CHECK_HOOKS.remove(add_check_property)
+        for name in dir(bpy.types.Scene):
+            if name.startswith('meshlint_'):
+                delattr(bpy.types.Scene, name)
 
 
     @bpy.app.handlers.persistent
     def global_repeated_check(dummy):
-        MeshLintContinuousChecker.check()
+        MeshLintContinuousChecker.tick()
 
 
     class MeshLintContinuousChecker():
         current_message = ''
         time_complained = 0
         previous_topology_counts = None
+        previous_snapshot = None
+        previous_mirror = ((), None)
         previous_analysis = None
+        previous_key = None
+        scheduler = None
+        worker = None
 
         @classmethod
         def check(cls):
+            'Lints right away, bypassing the scheduler.'
+            if not is_edit_mode():
+                return
+            analysis = None
+            for analysis in cls.iter_check():
+                pass
+            if not None is analysis:
+                cls.publish(analysis)
+            cls.expire_complaint()
+
+        @classmethod
+        def tick(cls):
             if not is_edit_mode():
                 return
+            scene = bpy.context.scene
+            if None is cls.scheduler:
+                cls.scheduler = MeshLintScheduler(cls.start_pass, cls.publish)
+            cls.scheduler.min_interval = scene.meshlint_min_interval
+            cls.scheduler.debounce = scene.meshlint_debounce
+            cls.scheduler.budget = scene.meshlint_budget / 1000.0
+            active = bpy.context.active_object
+            if None is cls.previous_analysis or active.is_updated_data:
+                cls.scheduler.notice_change()
+            if not None is cls.worker:
+                done = cls.worker.poll()
+                if not None is done:
+                    cls.finish_background(*done)
+                if cls.worker.in_flight:
+                    cls.expire_complaint()
+                    return
+            try:
+                cls.scheduler.tick()
+            except ReferenceError:
+                # The BMesh went away under a split-up pass. Start over.
+                cls.scheduler.notice_change()
+            cls.expire_complaint()
+
+        @classmethod
+        def start_pass(cls):
+            '''What the scheduler runs: the pass itself, in steps, or with
+            meshlint_background on, nothing here (see submit()).'''
+            if not bpy.context.scene.meshlint_background:
+                return cls.iter_check()
+            if None is cls.worker:
+                cls.worker = MeshLintWorker()
+            cls.submit()
+            return iter(())
+
+        @classmethod
+        def submit(cls):
+            '''Snapshots the active mesh, here on the main thread, along with
+            everything else the checks need from Blender, and leaves the
+            checks to cls.worker. Its MeshTopology is taken out of
+            MeshLintAnalyzer.topology_cache until the result is back, so
+            nothing else changes it meanwhile.'''
+            scene = bpy.context.scene
+            analyzer = MeshLintAnalyzer()
+            snapshot = analyzer.snapshot()
+            key = cls.snapshot_key(snapshot)
+            if scene.meshlint_incremental and has_numpy():
+                plan = cls.plan_changes(snapshot)
+            elif key != cls.previous_key:
+                plan = {}
+            else:
+                plan = None
+            if None is plan:
+                return
+            engine = analyzer.engine()
+            # Forking worker processes from a thread of Blender's is not
+            # safe; the thread is the one extra worker.
+            snapshot.set_option('workers', 1)
+            job = functools.partial(
+                engine.analyze, MeshLintAnalyzer.enabled_checks(),
+                scene.meshlint_backend, **plan)
+            MeshLintAnalyzer.topology_cache.pop(analyzer.obj.name, None)
+            cls.worker.submit(
+                job, (analyzer, analyzer.obj.name, engine, snapshot, key))
+
+        @classmethod
+        def finish_background(cls, tag, analysis, error):
+            '''Takes a pass back from cls.worker. If the mesh has been
+            changed since it was snapshotted, the result is thrown away
+            (the scheduler has the change noticed, so another pass comes);
+            otherwise it is published as a pass on the main thread would
+            be.'''
+            analyzer, name, engine, snapshot, key = tag
+            MeshLintAnalyzer.topology_cache.setdefault(name, snapshot)
+            if not None is error:
+                print('MeshLint Oops: ', error)
+                return
+            if cls.scheduler.pending and not cls.is_current(key):
+                return
+            analyzer.tally(analysis, engine)
+            cls.previous_snapshot = snapshot
+            cls.previous_mirror = (
+                snapshot.mirror_planes, snapshot.on_mirror_plane)
+            cls.previous_key = key
+            cls.publish(analysis)
+
+        @classmethod
+        def snapshot_key(cls, topology):
+            'What a result from linting `topology` is good for.'
+            return (topology.name, topology.fingerprint(),
+                    zlib.crc32(topology.coords))
+
+        @classmethod
+        def is_current(cls, key):
+            '''Whether the active mesh still has the snapshot_key() `key`. It
+            is read again to find out, in bulk, which costs far less than a
+            pass.'''
+            obj = bpy.context.active_object
+            if not has_active_mesh(bpy.context):
+                return False
+            obj.update_from_editmode()
+            return key == cls.snapshot_key(MeshTopology.from_mesh(obj.data))
+
+        @classmethod
+        def iter_check(cls):
             analyzer = MeshLintAnalyzer()
-            now_counts = analyzer.topology_counts()
+            if bpy.context.scene.meshlint_incremental and has_numpy():
+                snapshot = analyzer.snapshot()
+                work = cls.relint_changes(analyzer, snapshot)
+            else:
+                counts = analyzer.topology_counts()
+                work = cls.relint_on_new_counts(analyzer, counts)
+            if None is work:
+                return
+            for analysis in work:
+                if None is analysis:
+                    yield None
+            # Only a finished pass gets to move the baseline forward.
+            if bpy.context.scene.meshlint_incremental and has_numpy():
+                cls.previous_snapshot = snapshot
+                cls.previous_mirror = (
+                    snapshot.mirror_planes, snapshot.on_mirror_plane)
+            else:
+                cls.previous_topology_counts = counts
+            yield analysis
+
+        @classmethod
+        def publish(cls, analysis):
+            diff_msg = cls.diff_analyses(
+                cls.previous_analysis, analysis)
+            if not None is diff_msg:
+                cls.announce(diff_msg)
+                cls.time_complained = time.time()
+            cls.previous_analysis = analysis
+
+        @classmethod
+        def expire_complaint(cls):
+            if not None is cls.time_complained \
+                    and COMPLAINT_TIMEOUT < time.time() - cls.time_complained:
+                cls.announce(None)
+                cls.time_complained = None
+
+        @classmethod
+        def relint_on_new_counts(cls, analyzer, now_counts):
             previous_topology_counts = \
                 cls.previous_topology_counts
             if not None is previous_topology_counts:
@@ -265,59 +3663,51 @@ try:
                     or now_counts != previous_topology_counts:
                 if not previous_data_name == now_name:
                     before = MeshLintAnalyzer.none_analysis()
-                analysis = analyzer.find_problems()
-                diff_msg = cls.diff_analyses(
-                    cls.previous_analysis, analysis)
-                if not None is diff_msg:
-                    cls.announce(diff_msg)
-                    cls.time_complained = time.time()
-                cls.previous_topology_counts = now_counts
-                cls.previous_analysis = analysis
-            if not None is cls.time_complained \
-                    and COMPLAINT_TIMEOUT < time.time() - cls.time_complained:
-                cls.announce(None)
-                cls.time_complained = None
+                return analyzer.iter_find_problems()
+            return None
+
+        @classmethod
+        def relint_changes(cls, analyzer, snapshot):
+            plan = cls.plan_changes(snapshot)
+            if None is plan:
+                return None
+            return analyzer.iter_find_problems(**plan)
+
+        @classmethod
+        def plan_changes(cls, snapshot):
+            '''What there is to check again since the last pass, as keyword
+            arguments for find_problems(), or None for nothing at all.'''
+            # Catches count-preserving edits, too, and only pays Python
+            # time for the elements near the edit.
+            before = cls.previous_snapshot
+            was_planes, was_on_plane = cls.previous_mirror
+            if None is before or before.name != snapshot.name \
+                    or was_planes != snapshot.mirror_planes:
+                return {}
+            # Verts moved onto or off a mirror plane lint differently, too.
+            flipped = ()
+            if not None is was_on_plane:
+                shared = min(len(was_on_plane), snapshot.num_verts)
+                flipped = numpy.flatnonzero(
+                    was_on_plane[:shared]
+                    != snapshot.on_mirror_plane[:shared])
+            dirty = snapshot.arrays().dirty_since(before.arrays(), flipped)
+            # Checks that care where the verts are lose their memo when
+            # they move, without anything coming up dirty.
+            if not any(len(indices) for indices in dirty.values()) \
+                    and all(lint['symbol'] in snapshot.memo
+                            for lint in MeshLintAnalyzer.enabled_checks()
+                            if reads_coords(lint)):
+                return None
+            return { 'dirty': dirty, 'previous': cls.previous_analysis }
 
         @classmethod
         def diff_analyses(cls, before, after):
-            if None is before:
-                before = MeshLintAnalyzer.none_analysis()
-            report_strings = []
-            dict_before = cls.make_labels_dict(before)
-            dict_now = cls.make_labels_dict(after)
-            for check in MeshLintAnalyzer.CHECKS:
-                check_name = check['label']
-                if not check_name in dict_now.keys():
-                    continue
-                report = dict_now[check_name]
-                report_before = dict_before.get(check_name, {})
-                check_elem_strings = []
-                for elemtype, elem_list in report.items():
-                    elem_list_before = report_before.get(elemtype, [])
-                    if len(elem_list) > len(elem_list_before):
-                        count_diff = len(elem_list) - len(elem_list_before)
-                        elem_string = depluralize(
-                            count=count_diff, string=elemtype)
-                        check_elem_strings.append(
-                            str(count_diff) + ' ' + elem_string)
-                if len(check_elem_strings):
-                    report_strings.append(
-                        check_name + ': ' + ', '.join(check_elem_strings))
-            if len(report_strings):
-                return 'Found ' + ', '.join(report_strings)
-            return None
+            return MeshLintEngine.diff_analyses(before, after)
 
         @classmethod
         def make_labels_dict(cls, analysis):
-            if None is analysis:
-                return {}
-            labels_dict = {}
-            for check in analysis:
-                label = check['lint']['label']
-                new_val = check.copy()
-                del new_val['lint']
-                labels_dict[label] = new_val
-            return labels_dict
+            return MeshLintEngine.make_labels_dict(analysis)
 
         @classmethod
         def announce(cls, message):
@@ -355,31 +3745,43 @@ try:
         bpy.context.scene.objects.active = obj
 
 
+    def has_lint(obj, backend=None):
+        '''Whether obj's Mesh has any of the lint the Scene's checks look
+        for, found out as quickly as can be, for whatever only needs a yes
+        or no. Reads the Mesh directly, so obj need not be active or in
+        Edit Mode.'''
+        return MeshLintAnalyzer(obj).has_lint(backend)
+
+
     class MeshLintObjectLooper:
         def examine_active_object(self):
             analyzer = MeshLintAnalyzer()
             analyzer.enable_anything_select_mode()
-            self.select_none()
             analysis = analyzer.find_problems()
-            for lint in analysis:
-                for elemtype in ELEM_TYPES:
-                    indices = lint[elemtype]
-                    analyzer.select_indices(elemtype, indices)
+            analyzer.select_analysis(analysis)
             return analyzer.found_zero_problems()
 
         def examine_all_selected_meshes(self):
+            '''Lints the active object and the selected meshes from Object
+            Mode, all in one go (see MeshLintAnalyzer.find_problems_of()),
+            and writes what each one has wrong into its Mesh's selection.
+            Afterwards the first troubled one (the active object if it is)
+            is made active, but Edit Mode is left to the caller.'''
             self.original_active = bpy.context.active_object
             self.troubled_meshes = []
-            examinees = [self.original_active] + bpy.context.selected_objects
-            for obj in examinees:
-                if 'MESH' != obj.type:
-                    continue
-                activate(obj)
-                good = self.examine_active_object()
-                ensure_not_edit_mode()
-                if not good:
-                    self.troubled_meshes.append(obj)
-            priorities = [self.original_active] + self.troubled_meshes
+            examinees = []
+            for obj in [self.original_active] + bpy.context.selected_objects:
+                if 'MESH' == obj.type and not obj in examinees:
+                    examinees.append(obj)
+            for analyzer, analysis in \
+                    MeshLintAnalyzer.find_problems_of(examinees):
+                analyzer.enable_anything_select_mode()
+                analyzer.select_analysis(analysis)
+                if not analyzer.found_zero_problems():
+                    self.troubled_meshes.append(analyzer.obj)
+            priorities = [ obj for obj in [self.original_active]
+                           if obj in self.troubled_meshes ] \
+                + self.troubled_meshes + [self.original_active]
             for obj in priorities:
                 if obj.select:
                     activate(obj)
@@ -415,7 +3817,7 @@ try:
         def handle_troubled_meshes(self):
             pass
 
-    class MeshLintObjectDeselector(MeshLintObjectLooper, bpy.types.Operator):
+    class MeshLintObjectDeselector(bpy.types.Operator):
         'Uncheck boxes below to prevent those checks from running (Object Mode only)'
         bl_idname = 'meshlint.objects_deselect'
         bl_label = 'MeshLint Objects Deselect'
@@ -428,13 +3830,55 @@ try:
             return 1 < len(selected_meshses) and not is_edit_mode()
 
         def execute(self, context):
-            self.examine_all_selected_meshes()
-            return {'FINISHED'}
-
-        def handle_troubled_meshes(self):
             for obj in bpy.context.selected_objects:
-                if not obj in self.troubled_meshes:
+                if not ('MESH' == obj.type and has_lint(obj)):
                     obj.select = False
+            bpy.context.area.tag_redraw()
+            return {'FINISHED'}
+
+    class MeshLintExporter(bpy.types.Operator):
+        'Write what the enabled checks find in the selected objects to a file, for CI'
+        bl_idname = 'meshlint.export'
+        bl_label = 'Export MeshLint Report'
+
+        filepath = bpy.props.StringProperty(subtype='FILE_PATH')
+        format = bpy.props.EnumProperty(
+            items=REPORT_FORMATS, name='Format', default='JSONL')
+        positions = bpy.props.BoolProperty(
+            name='World Positions',
+            description='Give every element found its position in the '
+                        'scene as well',
+            default=False)
+
+        @classmethod
+        def poll(cls, context):
+            return has_active_mesh(context)
+
+        def invoke(self, context, event):
+            if not self.filepath:
+                self.filepath = (os.path.splitext(bpy.data.filepath)[0]
+                                 or 'untitled') + '.meshlint' \
+                    + MeshLintReportWriter.EXTENSIONS[self.format]
+            context.window_manager.fileselect_add(self)
+            return {'RUNNING_MODAL'}
+
+        def execute(self, context):
+            '''Lints the active object and the selected meshes like Select
+            Lint does from Object Mode, but leaves their selections alone.'''
+            examinees = []
+            for obj in [context.active_object] + context.selected_objects:
+                if 'MESH' == obj.type and not obj in examinees:
+                    examinees.append(obj)
+            path = bpy.path.abspath(self.filepath)
+            writer = MeshLintReportWriter.create(
+                path, self.format, self.positions)
+            for analyzer, analysis in \
+                    MeshLintAnalyzer.find_problems_of(examinees):
+                report_analysis(analyzer.obj, analysis, writer,
+                                analyzer.topology)
+            writer.close()
+            self.report({'INFO'}, 'MeshLint report written to %s' % path)
+            return {'FINISHED'}
 
     class MeshLintControl(bpy.types.Panel):
         bl_space_type = 'PROPERTIES'
@@ -472,6 +3916,8 @@ try:
                 'meshlint.objects_deselect',
                 text='Deselect all Lint-free Objects',
                 icon='UV_ISLANDSEL')
+            layout.split().operator(
+                'meshlint.export', text='Export Report...', icon='EXPORT')
 
         def add_criticism(self, layout, context):
             col = layout.column()
@@ -492,6 +3938,9 @@ try:
                     label = str(count) + 'x ' + lint['label']
                     label = depluralize(count=count, string=label)
                     reward = 'ERROR'
+                stats = lint['profile']
+                if not None is stats and not stats['cached']:
+                    label += ' (%.1f ms)' % (1000 * stats['seconds'])
                 col.row().label(text=label, icon=reward)
             name_crits = MeshLintControl.build_object_criticisms(
                             bpy.context.selected_objects, total_problems)
@@ -506,6 +3955,27 @@ try:
                 is_enabled = getattr(context.scene, prop_name)
                 label = 'Check ' + lint['label']
                 col.row().prop(context.scene, prop_name, text=label)
+                if is_enabled and 'coplanar_tolerance' in \
+                        lint.get('options', ()):
+                    col.row().prop(context.scene,
+                                   'meshlint_coplanar_tolerance')
+                if is_enabled and 'evaluated_coords' in \
+                        lint.get('options', ()):
+                    col.row().prop(context.scene, 'meshlint_refit_bvh')
+            col.row().prop(context.scene, 'meshlint_backend')
+            col.row().prop(context.scene, 'meshlint_workers')
+            col.row().prop(context.scene, 'meshlint_cache_megabytes')
+            col.row().prop(context.scene, 'meshlint_cache_dir')
+            col.row().prop(context.scene, 'meshlint_incremental')
+            col.row().prop(context.scene, 'meshlint_exempt_mirror')
+            col.row().prop(context.scene, 'meshlint_profile')
+            if MeshLintVitalizer.is_live:
+                row = col.row(align=True)
+                row.prop(context.scene, 'meshlint_min_interval')
+                row.prop(context.scene, 'meshlint_debounce')
+                if not context.scene.meshlint_background:
+                    row.prop(context.scene, 'meshlint_budget')
+                col.row().prop(context.scene, 'meshlint_background')
 
         @classmethod
         def build_object_criticisms(cls, objects, total_problems):
@@ -564,285 +4034,452 @@ try:
             return not None is re.match(pat, name)
 
 
-    def depluralize(**args):
-        if 1 == args['count']:
-            return args['string'].rstrip('s')
-        else:
-            return args['string']
+    def report_analysis(obj, analysis, export=None, topology=None):
+        '''A JSON-friendly summary of one object\'s analysis. With `export`,
+        a MeshLintReportWriter, the analysis is written there instead, and
+        the summary just counts it up.'''
+        if None is export:
+            return summarize_analysis(obj.name, obj.data.name, analysis)
+        export.add(obj.name, obj.data.name, analysis, topology,
+                   [ list(row) for row in obj.matrix_world ])
+        return summarize_analysis(obj.name, obj.data.name, analysis, False)
 
 
-    # Hrm. Why does it work for some Blender's but not others?
-    try:
-        import unittest
-        import warnings
-
-        class TestControl(unittest.TestCase):
-            def test_scale_application(self):
-                for bad in [ [0,0,0], [1,2,3], [1,1,1.1] ]:
-                    self.assertEqual(
-                        True, MeshLintControl.has_unapplied_scale(bad),
-                        "Unapplied scale: %s" % bad)
-                self.assertEqual(
-                    False, MeshLintControl.has_unapplied_scale([1,1,1]),
-                    "Applied scale (1,1,1)")
-
-            def test_bad_names(self):
-                for bad in [ 'Cube', 'Cube.001', 'Sphere.123' ]:
-                    self.assertEqual(
-                        True, MeshLintControl.is_bad_name(bad),
-                        "Bad name: %s" % bad)
-                for ok in [ 'Whatever', 'NumbersOkToo.001' ]:
-                    self.assertEqual(
-                        False, MeshLintControl.is_bad_name(ok),
-                        "OK name: %s" % ok)
-
-
-        class TestUtilities(unittest.TestCase):
-            def test_depluralize(self):
-                self.assertEqual(
-                    'foo',
-                    depluralize(count=1, string='foos'))
-                self.assertEqual(
-                    'foos',
-                    depluralize(count=2, string='foos'))
-
-
-        class TestAnalysis(unittest.TestCase):
-            def test_make_labels_dict(self):
-                self.assertEqual(
-                    {
-                        'Label One': {
-                            'edges': [1,2], 'verts': [], 'faces': [] },
-                        'Label Two': {
-                            'edges': [], 'verts': [5], 'faces': [3] }
-                    },
-                    MeshLintContinuousChecker.make_labels_dict(
-                        [
-                            { 'lint': { 'label': 'Label One' },
-                                'edges': [1,2], 'verts': [], 'faces': [] },
-                            { 'lint': { 'label': 'Label Two' },
-                                'edges': [], 'verts': [5], 'faces': [3] }
-                        ]),
-                    'Conversion of incoming analysis into label-keyed dict')
-                self.assertEqual(
-                    {},
-                    MeshLintContinuousChecker.make_labels_dict(None),
-                    'Handles "None" OK.')
-
-            def test_comparison(self):
-                self.assertEqual(
-                    None,
-                    MeshLintContinuousChecker.diff_analyses(
-                        MeshLintAnalyzer.none_analysis(),
-                        MeshLintAnalyzer.none_analysis()),
-                    'Two none_analysis()s')
-                self.assertEqual(
-                    'Found Tris: 4 verts',
-                    MeshLintContinuousChecker.diff_analyses(
-                        None,
-                        [
-                            {
-                                'lint': { 'label': 'Tris' },
-                                'verts': [1,2,3,4],
-                                'edges': [],
-                                'faces': [],
-                            },
-                        ]),
-                    'When there was no previous analysis')
-                self.assertEqual(
-                    'Found Tris: 2 edges, ' +\
-                        'Nonmanifold Elements: 4 verts, 1 face',
-                    MeshLintContinuousChecker.diff_analyses(
-                        [
-                            { 'lint': { 'label': 'Tris' },
-                              'verts': [], 'edges': [1,4], 'faces': [], },
-                            { 'lint': { 'label': 'CheckB' },
-                              'verts': [], 'edges': [2,3], 'faces': [], },
-                            { 'lint': { 'label': 'Nonmanifold Elements' },
-                              'verts': [], 'edges': [], 'faces': [2,3], },
-                        ],
-                        [
-                            { 'lint': { 'label': 'Tris' },
-                              'verts': [], 'edges': [1,4,5,6], 'faces': [], },
-                            { 'lint': { 'label': 'CheckB' },
-                              'verts': [], 'edges': [2,3], 'faces': [], },
-                            { 'lint': { 'label': 'Nonmanifold Elements' },
-                              'verts': [1,2,3,4], 'edges': [],
-                                'faces': [2,3,5], },
-                        ]),
-                    'Complex comparison of analyses')
-                self.assertEqual(
-                    'Found Tris: 1 vert, Ngons: 2 faces, ' +
-                      'Nonmanifold Elements: 2 edges',
-                    MeshLintContinuousChecker.diff_analyses(
-                        [
-                            { 'lint': { 'label': '6+-edge Poles' },
-                              'verts': [], 'edges': [2,3], 'faces': [], },
-                            { 'lint': { 'label': 'Nonmanifold Elements' },
-                              'verts': [], 'edges': [2,3], 'faces': [], },
-                        ],
-                        [
-                            { 'lint': { 'label': 'Tris' },
-                              'verts': [55], 'edges': [], 'faces': [], },
-                            { 'lint': { 'label': 'Ngons' },
-                              'verts': [], 'edges': [], 'faces': [5,6], },
-                            { 'lint': { 'label': 'Nonmanifold Elements' },
-                              'verts': [], 'edges': [2,3,4,5], 'faces': [], },
-                        ]),
-                    'User picked a different set of checks since last run.')
-
-
-        class MockBlenderObject:
-            def __init__(self, name, scale=Vector([1,1,1])):
-                self.name = name
-                self.scale = scale
-
-
-        class TestUI(unittest.TestCase):
-            def test_complaints(self):
-                f = MeshLintControl.build_object_criticisms
-                self.assertEqual([], f([], 0), 'Nothing selected')
-                self.assertEqual(
-                    [],
-                    f([MockBlenderObject('lsmft')], 0),
-                    'Ok name')
-                self.assertEqual(
-                    ['...but "Cube" is not a great name.'],
-                    f([MockBlenderObject('Cube')], 0),
-                    'Bad name, otherwise problem-free.')
-                self.assertEqual(
-                    [],
-                    f([MockBlenderObject('Hassenfrass')], 12),
-                    'Good name, but with problems.')
-                self.assertEqual(
-                    ['...and also "Cube" is not a great name.'],
-                    f([MockBlenderObject('Cube')], 23),
-                    'Bad name, and problems, too.')
-                self.assertEqual(
-                    [
-                        '...but "Sphere" is not a great name.',
-                        '...and also "Cube" is not a great name.'
-                    ],
-                    f([
-                        MockBlenderObject('Sphere'),
-                        MockBlenderObject('Cube') ], 0),
-                    'Two bad names.')
-
-                scaled = MockBlenderObject('Solartech', scale=Vector([.2,2,1]))
-                self.assertEqual(
-                    [ '...but "Solartech" has an unapplied scale.' ],
-                    f([scaled], 0),
-                    'Only problem is unapplied scale.'
-                )
-
-        class QuietOnSuccessTestResult(unittest.TextTestResult):
-            def startTest(self, test):
-                pass
+    def stream_object(obj, export=None):
+        '''Lints obj's Mesh with a MeshLintStream, for the enabled checks it
+        can run, and reports on it (with how much memory that took). There
+        are no positions to export, since nothing is kept of the mesh.'''
+        stream = MeshLintStream(MeshArraySource.from_mesh(obj.data), {
+            'coplanar_tolerance':
+                bpy.context.scene.meshlint_coplanar_tolerance })
+        analysis = stream.analyze(MeshLintAnalyzer.enabled_checks())
+        return dict(report_analysis(obj, analysis, export), **stream.stats())
 
-            def addSuccess(self, test):
-                pass
 
+    def lint_blend_data(backend=None, stream_above=None,
+                        topology_cache=None, gate=False, export=None):
+        '''Lints every mesh object of the loaded .blend without operators,
+        mode switches or changing the active object. Meshes with more than
+        `stream_above` faces are streamed (see MeshLintStream) instead.
+        What was read is filed in `topology_cache`, a
+        MeshLintTopologyCache, if there is one (and nothing was streamed,
+        since then not all of it was read). With `gate`, each object is
+        only checked up to its first problem (see summarize_gate()). With
+        `export`, a MeshLintReportWriter, what each object has wrong is
+        written there, and the report only counts it.'''
+        meshes = [ obj for obj in bpy.data.objects if 'MESH' == obj.type ]
+        streamed = [ obj for obj in meshes if has_numpy()
+                     and not None is stream_above
+                     and stream_above < len(obj.data.polygons) ]
+        unstreamed = [ obj for obj in meshes if not obj in streamed ]
+        if gate:
+            found = [ (analyzer, analyzer.has_lint(backend))
+                      for analyzer in map(MeshLintAnalyzer, unstreamed) ]
+            reports = { analyzer.obj.name: summarize_gate(
+                            analyzer.obj.name, analyzer.obj.data.name, linty)
+                        for analyzer, linty in found }
+        else:
+            found = MeshLintAnalyzer.find_problems_of(unstreamed, backend)
+            reports = { analyzer.obj.name: report_analysis(
+                            analyzer.obj, analysis, export, analyzer.topology)
+                        for analyzer, analysis in found }
+        for obj in streamed:
+            report = stream_object(obj, export)
+            if gate:
+                report = dict(report, **summarize_gate(
+                    obj.name, obj.data.name, 0 < report['problems']))
+                del report['checks']
+            reports[obj.name] = report
+        libraries = [ bpy.path.abspath(library.filepath)
+                      for library in bpy.data.libraries ]
+        if not None is topology_cache and not len(streamed) \
+                and all(map(os.path.exists, libraries)):
+            topology_cache.write(
+                bpy.data.filepath, libraries,
+                { 'checks': [ lint['symbol'] for lint
+                              in MeshLintAnalyzer.enabled_checks() ],
+                  'backend': backend or bpy.context.scene.meshlint_backend },
+                [ (analyzer.obj.name, analyzer.topology)
+                  for analyzer, analysis in found ])
+        objects = [ reports[obj.name] for obj in meshes ]
+        return {
+            'file': bpy.data.filepath,
+            'problems': sum(each['problems'] for each in objects),
+            'objects': objects,
+            'gate': gate }
 
-        class QuietTestRunner(unittest.TextTestRunner):
-            resultclass = QuietOnSuccessTestResult
-
-            # Ugh. I really shouldn't have to include this much code, but they
-            # left it so unrefactored I don't know what else to do. My other
-            # option is to override the stream and substitute out the success
-            # case, but that's a mess, too. - rking
-            def run(self, test):
-                "Run the given test case or test suite."
-                result = self._makeResult()
-                unittest.registerResult(result)
-                result.failfast = self.failfast
-                result.buffer = self.buffer
-                with warnings.catch_warnings():
-                    if self.warnings:
-                        # if self.warnings is set, use it to filter all the
-                        # warnings
-                        warnings.simplefilter(self.warnings)
-                        # if the filter is 'default' or 'always', special-case
-                        # the warnings from the deprecated unittest methods to
-                        # show them no more than once per module, because they
-                        # can be fairly noisy.  The -Wd and -Wa flags can be
-                        # used to bypass this only when self.warnings is None.
-                        if self.warnings in ['default', 'always']:
-                            warnings.filterwarnings('module',
-                                    category=DeprecationWarning,
-                                    message='Please use assert\w+ instead.')
-                    startTime = time.time()
-                    startTestRun = getattr(result, 'startTestRun', None)
-                    if startTestRun is not None:
-                        startTestRun()
-                    try:
-                        test(result)
-                    finally:
-                        stopTestRun = getattr(result, 'stopTestRun', None)
-                        if stopTestRun is not None:
-                            stopTestRun()
-                    stopTime = time.time()
-                timeTaken = stopTime - startTime
-                result.printErrors()
-                run = result.testsRun
-
-                expectedFails = unexpectedSuccesses = skipped = 0
-                try:
-                    results = map(len, (result.expectedFailures,
-                                        result.unexpectedSuccesses,
-                                        result.skipped))
-                except AttributeError:
-                    pass
-                else:
-                    expectedFails, unexpectedSuccesses, skipped = results
-
-                infos = []
-                if not result.wasSuccessful():
-                    self.stream.write("FAILED")
-                    failed, errored = len(result.failures), len(result.errors)
-                    if failed:
-                        infos.append("failures=%d" % failed)
-                    if errored:
-                        infos.append("errors=%d" % errored)
-                if skipped:
-                    infos.append("skipped=%d" % skipped)
-                if expectedFails:
-                    infos.append("expected failures=%d" % expectedFails)
-                if unexpectedSuccesses:
-                    infos.append(
-                        "unexpected successes=%d" % unexpectedSuccesses)
-                return result
-
-        if __name__ == '__main__':
-            unittest.main(
-                testRunner=QuietTestRunner,
-                argv=['dummy'],
-                exit=False,
-                verbosity=0)
-
-    except ImportError:
-        print(
-            "MeshLint complains over missing unittest module.", """
-            No harm, but it is odd. If you want to send a message to
-            rking@panoptic.com describing your system, he'd like to track down
-            this condition.""")
+
+    def batch_worker_main(args):
+        # Runs inside `blender --background x.blend --python meshlint.py`.
+        import argparse
+        parser = argparse.ArgumentParser(prog='meshlint.py (in Blender)')
+        parser.add_argument('--report', required=True)
+        parser.add_argument('--backend', choices=[b[0] for b in BACKENDS])
+        parser.add_argument('--cache-dir')
+        parser.add_argument('--stream-above', type=int)
+        parser.add_argument('--gate', action='store_true')
+        parser.add_argument('--export')
+        parser.add_argument('--export-format', default='JSONL',
+                            choices=[ f[0] for f in REPORT_FORMATS ])
+        parser.add_argument('--positions', action='store_true')
+        opts = parser.parse_args(args)
+        register_properties()
+        topology_cache = None
+        if opts.cache_dir:
+            bpy.context.scene.meshlint_cache_dir = opts.cache_dir
+            topology_cache = MeshLintTopologyCache(opts.cache_dir)
+        export = None
+        if opts.export:
+            export = MeshLintReportWriter.create(
+                opts.export, opts.export_format, opts.positions)
+        report = lint_blend_data(opts.backend, opts.stream_above,
+                                 topology_cache, opts.gate, export)
+        if not None is export:
+            export.close()
+        write_report(report, opts.report)
 
 
     def register():
+        register_properties()
         bpy.utils.register_module(__name__)
 
 
     def unregister():
         bpy.utils.unregister_module(__name__)
+        unregister_properties()
 
 
     if __name__ == '__main__':
-        register()
+        if len(script_args()):
+            batch_worker_main(script_args())
+        else:
+            register()
 
 except:
     # OK, I totally don't get why this is necessary. But otherwise I am not
     # seeing error text. Causes the extra indent over all above code. =(
-    import sys
     exc = sys.exc_info()
-    print("MeshLint Oops: ", exc[1], exc[2])
+    # ...but no bpy just means we are the batch driver, outside of Blender.
+    if not (issubclass(exc[0], ImportError)
+            and 'bpy' == getattr(exc[1], 'name', '')):
+        print("MeshLint Oops: ", exc[1], exc[2])
+
+
+# Batch mode: `python meshlint.py testblends/` lints every mesh object of
+# every .blend it finds, each file in its own background Blender, and writes
+# a <name>.meshlint.json report per file.
+
+def summarize_analysis(name, mesh_name, analysis, indices=True):
+    '''A JSON-friendly summary of one object\'s analysis; without
+    `indices`, it only counts what each check found.'''
+    checks = []
+    for report in analysis:
+        check = {
+            'symbol': report['lint']['symbol'],
+            'label': report['lint']['label'],
+            'count': 0 }
+        for elemtype in ELEM_TYPES:
+            if indices:
+                check[elemtype] = list(report[elemtype])
+            check['count'] += len(report[elemtype])
+        checks.append(check)
+    return {
+        'object': name,
+        'mesh': mesh_name,
+        'problems': sum(check['count'] for check in checks),
+        'checks': checks }
+
+
+def summarize_gate(name, mesh_name, found):
+    '''What a --gate report says about one object: only whether it has any
+    lint, since checking stopped at its first problem. That counts as one
+    problem.'''
+    return {
+        'object': name,
+        'mesh': mesh_name,
+        'problems': int(found),
+        'has_lint': found }
+
+
+def write_report(report, path):
+    partial = path + '.partial'
+    with open(partial, 'w') as out:
+        json.dump(report, out, indent=1)
+    os.rename(partial, path)
+
+
+def find_blend_files(paths):
+    'Yields (blend_path, report_name) for files and directories in paths.'
+    for path in paths:
+        if not os.path.isdir(path):
+            yield path, os.path.basename(path)
+            continue
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                if name.endswith('.blend'):
+                    blend = os.path.join(root, name)
+                    yield blend, os.path.relpath(blend, path)
+
+
+def export_path(report, opts):
+    'Where the --export file of `report` (a .meshlint.json) goes.'
+    return os.path.splitext(report)[0] \
+        + MeshLintReportWriter.EXTENSIONS[opts.export]
+
+
+def create_export(report, opts):
+    'A MeshLintReportWriter for what goes with `report`, if --export is on.'
+    if not opts.export:
+        return None
+    return MeshLintReportWriter.create(
+        export_path(report, opts), opts.export, opts.positions)
+
+
+def run_batch_worker(blend, report, opts):
+    import subprocess
+    if os.path.exists(report):
+        os.remove(report)
+    command = [
+        opts.blender, '--background', '--factory-startup', blend,
+        '--python', os.path.abspath(__file__),
+        '--', '--report', report ]
+    if opts.backend:
+        command += [ '--backend', opts.backend ]
+    if opts.cache_dir:
+        command += [ '--cache-dir', os.path.abspath(opts.cache_dir) ]
+    if not None is opts.stream_above:
+        command += [ '--stream-above', str(opts.stream_above) ]
+    if opts.gate:
+        command.append('--gate')
+    if opts.export:
+        command += [ '--export', export_path(report, opts),
+                     '--export-format', opts.export ]
+    if opts.positions:
+        command.append('--positions')
+    worker = subprocess.Popen(
+        command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    output = worker.communicate()[0]
+    if not os.path.exists(report):
+        return None, output.decode('utf-8', 'replace')
+    with open(report) as source:
+        return json.load(source), None
+
+
+def run_stream_worker(path, report, opts):
+    '''Streams a .ply or .obj file through the default checks, no Blender
+    needed, in a Python process of its own (see stream_file()). The peak
+    memory a stream reports is traced process-wide, so this way it counts
+    that stream alone, however many jobs are running at once.'''
+    import subprocess
+    if os.path.exists(report):
+        os.remove(report)
+    command = [ sys.executable, os.path.abspath(__file__),
+                '--stream-worker', path, '--report', report ]
+    if opts.gate:
+        command.append('--gate')
+    if opts.export:
+        command += [ '--export', opts.export ]
+    if opts.positions:
+        command.append('--positions')
+    worker = subprocess.Popen(
+        command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    output = worker.communicate()[0]
+    if not os.path.exists(report):
+        return None, output.decode('utf-8', 'replace')
+    with open(report) as source:
+        return json.load(source), None
+
+
+def stream_worker_main(argv):
+    # Runs as `python meshlint.py --stream-worker PATH`, for
+    # run_stream_worker().
+    import argparse
+    parser = argparse.ArgumentParser(prog='meshlint.py --stream-worker')
+    parser.add_argument('path')
+    parser.add_argument('--report', required=True)
+    parser.add_argument('--gate', action='store_true')
+    parser.add_argument('--export', choices=[ f[0] for f in REPORT_FORMATS ])
+    parser.add_argument('--positions', action='store_true')
+    opts = parser.parse_args(argv)
+    result, error = stream_file(opts.path, opts.report, opts)
+    if None is result:
+        print(error)
+        return 2
+    return 0
+
+
+def stream_file(path, report, opts):
+    '''Streams a .ply or .obj file through the default checks right here,
+    and writes its report as a Blender worker would.'''
+    import traceback
+    if not has_numpy():
+        return None, 'Streaming %s needs NumPy' % path
+    try:
+        stream = MeshLintStream(open_face_source(path))
+        analysis = stream.analyze(
+            [ lint for lint in MeshLintEngine.CHECKS if lint['default'] ])
+    except (IOError, OSError, ValueError, IndexError):
+        return None, traceback.format_exc()
+    name = os.path.basename(path)
+    export = create_export(report, opts)
+    summary = summarize_analysis(name, name, analysis, None is export)
+    if not None is export:
+        export.add(name, name, analysis)
+        export.close()
+    if opts.gate:
+        summary = summarize_gate(name, name, 0 < summary['problems'])
+    summary.update(stream.stats())
+    result = {
+        'file': path,
+        'problems': summary['problems'],
+        'objects': [ summary ],
+        'gate': opts.gate }
+    write_report(result, report)
+    return result, None
+
+
+def lint_topology_cache(blend, report, opts):
+    '''Lints `blend` from the MeshLintTopologyCache under opts.cache_dir,
+    with no Blender, as a Blender worker would have, and writes `report`'s
+    --export along the way. None if there is no current one for it, or if
+    the export is to have world positions, since the cache has no
+    object transforms.'''
+    if opts.positions:
+        return None
+    cached = MeshLintTopologyCache(opts.cache_dir).read(blend)
+    if None is cached:
+        return None
+    settings, objects = cached
+    enabled = [ lint for lint in MeshLintEngine.CHECKS
+                if lint['symbol'] in settings['checks'] ]
+    results = MeshLintResultCache(directory=opts.cache_dir)
+    summaries = []
+    backend = opts.backend or settings['backend']
+    export = create_export(report, opts)
+    for name, topology in objects:
+        engine = MeshLintEngine(topology, cache=results)
+        if opts.gate:
+            summaries.append(summarize_gate(
+                name, topology.name, engine.has_lint(enabled, backend)))
+            continue
+        analysis = engine.analyze(enabled, backend)
+        summaries.append(summarize_analysis(
+            name, topology.name, analysis, None is export))
+        if not None is export:
+            export.add(name, topology.name, analysis)
+    if not None is export:
+        export.close()
+    return {
+        'file': blend,
+        'problems': sum(each['problems'] for each in summaries),
+        'objects': summaries,
+        'gate': opts.gate,
+        'cached_topology': True }
+
+
+def run_batch_job(path, report, opts):
+    if os.path.splitext(path)[1].lower() in ('.ply', '.obj'):
+        return run_stream_worker(path, report, opts)
+    if opts.cache_dir:
+        result = lint_topology_cache(path, report, opts)
+        if not None is result:
+            write_report(result, report)
+            return result, None
+    return run_batch_worker(path, report, opts)
+
+
+def batch_main(argv):
+    import argparse
+    import multiprocessing
+    from concurrent.futures import ThreadPoolExecutor
+    parser = argparse.ArgumentParser(
+        prog='meshlint.py',
+        description='Lint every mesh object in .blend files, headless.')
+    parser.add_argument(
+        'paths', nargs='+', metavar='PATH',
+        help='.blend files, or directories to search for them. .ply and '
+             '.obj files are streamed (see --stream-above) without Blender')
+    parser.add_argument(
+        '--blender', default=os.environ.get('BLENDER', 'blender'),
+        help='Blender executable (default: $BLENDER or "blender")')
+    parser.add_argument(
+        '-j', '--jobs', type=int, default=multiprocessing.cpu_count(),
+        help='Blender processes to run at once (default: one per CPU)')
+    parser.add_argument(
+        '--report-dir',
+        help='Write the reports here instead of next to each .blend')
+    parser.add_argument(
+        '--backend', choices=[ backend[0] for backend in BACKENDS ],
+        help='Override the Backend setting saved in each file')
+    parser.add_argument(
+        '--cache-dir',
+        help='Keep check results, and the meshes read from each .blend, '
+             'here, so the next run skips every mesh that has not changed '
+             'and needs no Blender for a .blend that has not')
+    parser.add_argument(
+        '--stream-above', type=int, metavar='FACES',
+        help='Check meshes with more faces than this a chunk at a time, in '
+             'bounded memory, leaving out the checks that need the whole '
+             'mesh at once')
+    parser.add_argument(
+        '--gate', action='store_true',
+        help='Only find out which objects have any lint at all, stopping '
+             'at the first problem in each, cheapest checks first. Much '
+             'quicker on clean files; the reports say which objects have '
+             'lint, not what')
+    parser.add_argument(
+        '--export', choices=[ f[0] for f in REPORT_FORMATS ],
+        help='Also write what every check found, element by element, to a '
+             '<name>.meshlint.jsonl (JSONL) or .xml (JUNIT) file next to '
+             'each report, which then only counts it up')
+    parser.add_argument(
+        '--positions', action='store_true',
+        help='With --export, give every element\'s world-space position')
+    opts = parser.parse_args(argv)
+    if opts.gate and opts.export:
+        parser.error('--gate finds too little to --export')
+    if opts.positions and not opts.export:
+        parser.error('--positions needs --export')
+
+    jobs = []
+    for blend, name in find_blend_files(opts.paths):
+        report = os.path.splitext(name)[0] + '.meshlint.json'
+        if opts.report_dir:
+            report = os.path.join(opts.report_dir, report)
+            if not os.path.isdir(os.path.dirname(report)):
+                os.makedirs(os.path.dirname(report))
+        else:
+            report = os.path.join(os.path.dirname(blend), report)
+        jobs.append((blend, report))
+
+    # Each worker is a Blender process of its own; the threads only wait.
+    failed = troubled = 0
+    with ThreadPoolExecutor(max(1, opts.jobs)) as pool:
+        results = pool.map(
+            lambda job: run_batch_job(job[0], job[1], opts), jobs)
+        for (blend, report), (result, error) in zip(jobs, results):
+            if None is result:
+                failed += 1
+                print('%s: FAILED\n%s' % (blend, error))
+            elif result['problems'] and opts.gate:
+                troubled += 1
+                print('%s: lint in %d objects -> %s' % (
+                    blend, result['problems'], report))
+            elif result['problems']:
+                troubled += 1
+                print('%s: %d problems -> %s' % (
+                    blend, result['problems'], report))
+            else:
+                print('%s: OK' % blend)
+    if failed:
+        return 2
+    return 1 if troubled else 0
+
+
+if __name__ == '__main__' and not 'bpy' in sys.modules:
+    if sys.argv[1:2] == [ '--stream-worker' ]:
+        sys.exit(stream_worker_main(sys.argv[2:]))
+    sys.exit(batch_main(sys.argv[1:]))
 
 # vim:ts=4 sw=4 sts=4
@@ -0,0 +1,1347 @@
+# MeshLint's tests. Everything but the UI runs under plain Python:
+#
+#   python -m unittest test_meshlint
+#
+# and all of it inside Blender:
+#
+#   blender --background --factory-startup --python test_meshlint.py
+#
+# They live out here so that loading the addon does not define them.
+
+import io
+import os
+import sys
+import json
+import time
+import unittest
+import warnings
+from array import array
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import meshlint
+from meshlint import PASS_CHUNK_SIZE, LintIndices, \
+    MeshTopology, MeshLintEngine, MeshLintScheduler, MeshLintResultCache, \
+    MeshLintWorker, MeshLintTopologyCache, MeshLintStream, MeshArraySource, \
+    MeshLintReportWriter, open_face_source, count_changes, depluralize, \
+    flipped_in_islands, island_sizes, format_profile, has_numpy, \
+    mask_indices
+
+# MeshLintControl and the rest of the UI only exist inside Blender.
+needs_blender = unittest.skipIf(
+    not hasattr(meshlint, 'MeshLintControl'), 'needs Blender')
+# ...and the batch driver outside of it, starting Python processes.
+needs_python = unittest.skipIf(
+    hasattr(meshlint, 'MeshLintControl'), 'runs outside Blender')
+
+
+
+@needs_blender
+class TestControl(unittest.TestCase):
+    def test_scale_application(self):
+        for bad in [ [0,0,0], [1,2,3], [1,1,1.1] ]:
+            self.assertEqual(
+                True, meshlint.MeshLintControl.has_unapplied_scale(bad),
+                "Unapplied scale: %s" % bad)
+        self.assertEqual(
+            False, meshlint.MeshLintControl.has_unapplied_scale([1,1,1]),
+            "Applied scale (1,1,1)")
+
+    def test_bad_names(self):
+        for bad in [ 'Cube', 'Cube.001', 'Sphere.123' ]:
+            self.assertEqual(
+                True, meshlint.MeshLintControl.is_bad_name(bad),
+                "Bad name: %s" % bad)
+        for ok in [ 'Whatever', 'NumbersOkToo.001' ]:
+            self.assertEqual(
+                False, meshlint.MeshLintControl.is_bad_name(ok),
+                "OK name: %s" % ok)
+
+
+class TestUtilities(unittest.TestCase):
+    def test_depluralize(self):
+        self.assertEqual(
+            'foo',
+            depluralize(count=1, string='foos'))
+        self.assertEqual(
+            'foos',
+            depluralize(count=2, string='foos'))
+
+
+class TestAnalysis(unittest.TestCase):
+    def test_make_labels_dict(self):
+        self.assertEqual(
+            {
+                'Label One': {
+                    'edges': [1,2], 'verts': [], 'faces': [] },
+                'Label Two': {
+                    'edges': [], 'verts': [5], 'faces': [3] }
+            },
+            MeshLintEngine.make_labels_dict(
+                [
+                    { 'lint': { 'label': 'Label One' },
+                        'edges': [1,2], 'verts': [], 'faces': [] },
+                    { 'lint': { 'label': 'Label Two' },
+                        'edges': [], 'verts': [5], 'faces': [3] }
+                ]),
+            'Conversion of incoming analysis into label-keyed dict')
+        self.assertEqual(
+            {},
+            MeshLintEngine.make_labels_dict(None),
+            'Handles "None" OK.')
+
+    def test_comparison(self):
+        self.assertEqual(
+            None,
+            MeshLintEngine.diff_analyses(
+                MeshLintEngine.none_analysis(),
+                MeshLintEngine.none_analysis()),
+            'Two none_analysis()s')
+        self.assertEqual(
+            'Found Tris: 4 verts',
+            MeshLintEngine.diff_analyses(
+                None,
+                [
+                    {
+                        'lint': { 'label': 'Tris' },
+                        'verts': [1,2,3,4],
+                        'edges': [],
+                        'faces': [],
+                    },
+                ]),
+            'When there was no previous analysis')
+        self.assertEqual(
+            'Found Tris: 2 edges, ' +\
+                'Nonmanifold Elements: 4 verts, 1 face',
+            MeshLintEngine.diff_analyses(
+                [
+                    { 'lint': { 'label': 'Tris' },
+                      'verts': [], 'edges': [1,4], 'faces': [], },
+                    { 'lint': { 'label': 'CheckB' },
+                      'verts': [], 'edges': [2,3], 'faces': [], },
+                    { 'lint': { 'label': 'Nonmanifold Elements' },
+                      'verts': [], 'edges': [], 'faces': [2,3], },
+                ],
+                [
+                    { 'lint': { 'label': 'Tris' },
+                      'verts': [], 'edges': [1,4,5,6], 'faces': [], },
+                    { 'lint': { 'label': 'CheckB' },
+                      'verts': [], 'edges': [2,3], 'faces': [], },
+                    { 'lint': { 'label': 'Nonmanifold Elements' },
+                      'verts': [1,2,3,4], 'edges': [],
+                        'faces': [2,3,5], },
+                ]),
+            'Complex comparison of analyses')
+        self.assertEqual(
+            'Found Tris: 1 vert, Ngons: 2 faces, ' +
+              'Nonmanifold Elements: 2 edges',
+            MeshLintEngine.diff_analyses(
+                [
+                    { 'lint': { 'label': '6+-edge Poles' },
+                      'verts': [], 'edges': [2,3], 'faces': [], },
+                    { 'lint': { 'label': 'Nonmanifold Elements' },
+                      'verts': [], 'edges': [2,3], 'faces': [], },
+                ],
+                [
+                    { 'lint': { 'label': 'Tris' },
+                      'verts': [55], 'edges': [], 'faces': [], },
+                    { 'lint': { 'label': 'Ngons' },
+                      'verts': [], 'edges': [], 'faces': [5,6], },
+                    { 'lint': { 'label': 'Nonmanifold Elements' },
+                      'verts': [], 'edges': [2,3,4,5], 'faces': [], },
+                ]),
+            'User picked a different set of checks since last run.')
+        self.assertEqual(
+            'Found Tris: 1 face. Fixed Tris: 1 face, ' +
+              'Ngons: 2 faces',
+            MeshLintEngine.diff_analyses(
+                [
+                    { 'lint': { 'label': 'Tris' },
+                      'verts': [], 'edges': [], 'faces': [3], },
+                    { 'lint': { 'label': 'Ngons' },
+                      'verts': [], 'edges': [], 'faces': [1,2], },
+                ],
+                [
+                    { 'lint': { 'label': 'Tris' },
+                      'verts': [], 'edges': [], 'faces': [7], },
+                    { 'lint': { 'label': 'Ngons' },
+                      'verts': [], 'edges': [], 'faces': [], },
+                ]),
+            'Fixed one Tri while making another elsewhere')
+
+    def test_lint_indices(self):
+        indices = LintIndices([1, 4, 9])
+        self.assertEqual(3, len(indices))
+        self.assertEqual([1, 4, 9], list(indices))
+        self.assertEqual([1, 4, 9], indices)
+        self.assertNotEqual([1, 4], indices)
+        self.assertEqual(LintIndices([4, 9]), indices[1:])
+        self.assertTrue(4 in indices)
+        self.assertFalse(5 in indices)
+        self.assertEqual(
+            [1, 2, 4, 9], indices | LintIndices([2, 4]))
+        self.assertEqual([1, 9], indices - [2, 4])
+        self.assertEqual(
+            [0, 2], LintIndices.from_mask(bytearray([1, 0, 1])))
+        self.assertEqual(
+            4, LintIndices([3]).indices.itemsize,
+            'Packed 4 bytes apiece')
+
+    def test_count_changes(self):
+        self.assertEqual((0, 0), count_changes([], []))
+        self.assertEqual(
+            (2, 1), count_changes([1, 4, 9], [1, 5, 9, 12]))
+        self.assertEqual((0, 3), count_changes([0, 1, 2], []))
+        big = list(range(0, 3 * PASS_CHUNK_SIZE, 3))
+        self.assertEqual(
+            (1, 2),
+            count_changes(big, big[2:] + [3 * PASS_CHUNK_SIZE]),
+            'Long reports')
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestScheduler(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.started = 0
+        self.finished = []
+        self.scheduler = MeshLintScheduler(
+            self.start, self.finished.append, clock=self.clock,
+            min_interval=1.0, debounce=0.5, budget=0.1)
+
+    def start(self):
+        # A pass of 3 steps, each taking 0.06 "seconds".
+        self.started += 1
+        for step in range(3):
+            self.clock.now += 0.06
+            yield None
+        yield 'pass %d' % self.started
+
+    def test_debounce(self):
+        self.scheduler.tick()
+        self.assertEqual(0, self.started, 'Nothing changed yet')
+        self.scheduler.notice_change()
+        self.clock.now += 0.3
+        self.scheduler.notice_change()
+        self.clock.now += 0.3
+        self.scheduler.tick()
+        self.assertEqual(0, self.started, 'Still being edited')
+        self.clock.now += 0.3
+        self.scheduler.tick()
+        self.assertEqual(1, self.started, 'Quiet long enough')
+
+    def test_min_interval(self):
+        self.scheduler.debounce = 0
+        self.scheduler.notice_change()
+        for tick in range(3):
+            self.scheduler.tick()
+        self.assertEqual([ 'pass 1' ], self.finished)
+        self.scheduler.notice_change()
+        self.scheduler.tick()
+        self.assertEqual(1, self.started, 'Too soon after pass 1')
+        self.clock.now += 1.0
+        self.scheduler.tick()
+        self.assertEqual(2, self.started, 'Interval has passed')
+
+    def test_budget(self):
+        self.scheduler.debounce = 0
+        self.scheduler.notice_change()
+        self.scheduler.tick()
+        self.assertEqual([], self.finished, 'Ran out of budget')
+        self.scheduler.tick()
+        self.assertEqual([ 'pass 1' ], self.finished,
+                         'Resumed on the next tick')
+
+    def test_change_during_pass(self):
+        self.scheduler.debounce = 0
+        self.scheduler.min_interval = 0
+        self.scheduler.notice_change()
+        self.scheduler.tick()
+        self.scheduler.notice_change()
+        self.scheduler.tick()
+        self.scheduler.tick()
+        self.assertEqual([ 'pass 2' ], self.finished,
+                         'Stale pass 1 was dropped')
+
+
+class TestWorker(unittest.TestCase):
+    def test_jobs(self):
+        worker = MeshLintWorker()
+        self.assertEqual(None, worker.poll(), 'Nothing submitted yet')
+        worker.submit(lambda: 6 * 7, 'answer')
+        worker.submit(lambda: 1 / 0, 'oops')
+        self.assertEqual(2, worker.in_flight)
+        self.assertEqual(('answer', 42, None), worker.poll(5))
+        self.assertEqual(1, worker.in_flight)
+        tag, result, error = worker.poll(5)
+        self.assertEqual(('oops', None), (tag, result))
+        self.assertIn('ZeroDivisionError', error)
+        self.assertEqual(0, worker.in_flight)
+        self.assertEqual(None, worker.poll(0.01), 'All handed back')
+
+
+class MockBlenderObject:
+    def __init__(self, name, scale=(1, 1, 1), data=None):
+        self.name = name
+        self.scale = scale
+        self.data = data
+        self.mode = 'OBJECT'
+        self.modifiers = []
+
+
+class MockCollection(list):
+    def __init__(self, items, attrs):
+        list.__init__(self, items)
+        self.attrs = attrs
+
+    def foreach_get(self, attr, flat):
+        for i, value in enumerate(self.attrs[attr]):
+            flat[i] = value
+
+
+class MockMesh:
+    'Lays a face list out in loops and edges the way a Mesh does.'
+    def __init__(self, num_verts, faces, name='MockMesh'):
+        self.name = name
+        self.library = None
+        edge_indices = {}
+        edges, loop_starts, loop_verts, loop_edges = [], [], [], []
+        for face in faces:
+            loop_starts.append(len(loop_verts))
+            for i, v in enumerate(face):
+                key = frozenset((v, face[(i + 1) % len(face)]))
+                if not key in edge_indices:
+                    edge_indices[key] = len(edges)
+                    edges.append(sorted(key))
+                loop_verts.append(v)
+                loop_edges.append(edge_indices[key])
+        self.vertices = MockCollection(
+            range(num_verts), { 'co': [0.0] * 3 * num_verts })
+        self.polygons = MockCollection(faces, {
+            'loop_start': loop_starts,
+            'loop_total': [ len(face) for face in faces ] })
+        self.edges = MockCollection(
+            edges, { 'vertices': sum(edges, []) })
+        self.loops = MockCollection(loop_verts, {
+            'vertex_index': loop_verts, 'edge_index': loop_edges })
+
+
+def mock_topology(num_verts, faces):
+    return MeshTopology.from_faces([ (0, 0, 0) ] * num_verts, faces)
+
+
+def mock_grid(size):
+    faces = []
+    for y in range(size):
+        for x in range(size):
+            corner = y * (size + 1) + x
+            faces.append((corner, corner + 1,
+                          corner + size + 2, corner + size + 1))
+    return (size + 1) ** 2, faces
+
+
+class TestEngine(unittest.TestCase):
+    def run_check(self, sym, num_verts, faces):
+        lints = [ lint for lint in MeshLintEngine.CHECKS
+                  if sym == lint['symbol'] ]
+        engine = MeshLintEngine(mock_topology(num_verts, faces))
+        report = engine.analyze(lints, 'PYTHON')[0]
+        if has_numpy():
+            engine = MeshLintEngine(mock_topology(num_verts, faces))
+            self.assertEqual(
+                report, engine.analyze(lints, 'NUMPY')[0],
+                'Both backends agree on %s' % sym)
+        return { elemtype: report[elemtype]
+                 for elemtype in lints[0]['elemtypes'] }
+
+    def test_face_sizes(self):
+        faces = [ (0,1,2), (0,2,3,4), (0,4,5,6,7) ]
+        self.assertEqual(
+            { 'faces': [0] }, self.run_check('tris', 8, faces))
+        self.assertEqual(
+            { 'faces': [2] }, self.run_check('ngons', 8, faces))
+
+    def test_nonmanifold(self):
+        self.assertEqual(
+            { 'verts': [], 'edges': [0, 3, 4, 5, 8, 9, 10, 11] },
+            self.run_check('nonmanifold', *mock_grid(2)),
+            'Open boundary: edges only, BM says the verts are fine')
+        bowtie = [ (0,1,2), (0,2,3), (0,3,1), (1,3,2),
+                   (0,4,5), (0,5,6), (0,6,4), (4,6,5) ]
+        self.assertEqual(
+            { 'verts': [0], 'edges': [] },
+            self.run_check('nonmanifold', 7, bowtie),
+            'Two tetrahedra sharing one vert')
+        self.assertEqual(
+            { 'verts': [4], 'edges': [] },
+            self.run_check('nonmanifold', 5, bowtie[:4]),
+            'A stray vert')
+
+    def test_interior_and_poles(self):
+        # A Ctrl+r'd Default Cube with the middle loop filled.
+        faces = [ (0,1,2,3), (8,11,10,9), (4,5,6,7) ]
+        for i in range(4):
+            j = (i + 1) % 4
+            faces += [ (i, j, j+4, i+4), (i+4, j+4, j+8, i+8) ]
+        self.assertEqual(
+            { 'faces': [2] },
+            self.run_check('interior_faces', 12, faces))
+        fan = [ (0, i, i % 7 + 1) for i in range(1, 8) ]
+        self.assertEqual(
+            { 'verts': [0] },
+            self.run_check('sixplus_poles', 8, fan))
+
+    def test_memo(self):
+        num_verts, faces = mock_grid(2)
+        topology = mock_topology(num_verts, faces)
+        tris = [ MeshLintEngine.CHECKS[0] ]
+        MeshLintEngine(topology).analyze(tris)
+        self.assertEqual([ 'tris' ], list(topology.memo))
+        moved = mock_topology(num_verts, faces)
+        self.assertEqual(
+            topology.fingerprint(), moved.fingerprint(),
+            'Coordinates are not part of the fingerprint')
+        topology.adopt_coords(moved)
+        self.assertEqual(
+            [ 'tris' ], list(topology.memo), 'Nothing moved')
+        moved.coords[0] = 1.0
+        topology.adopt_coords(moved)
+        self.assertEqual({}, topology.memo, 'A vert moved')
+        faces[0] = faces[0][:3]
+        self.assertNotEqual(
+            topology.fingerprint(),
+            mock_topology(num_verts, faces).fingerprint(),
+            'Topology changed')
+
+    def test_noncoplanar(self):
+        coords = [ (0, 0, 0), (1, 0, 0), (1, 1, 0), (0, 1, 0),
+                   (2, 0, 0), (2, 1, 0.2), (3, 0.5, 0),
+                   (100, 100, 100), (101, 100, 100),
+                   (101, 101, 100.001), (100, 101, 100) ]
+        faces = [ (0, 1, 2, 3), (1, 4, 5, 2), (4, 6, 5),
+                  (0, 1, 4, 6, 5, 2, 3), (7, 8, 9, 10) ]
+        lints = [ lint for lint in MeshLintEngine.CHECKS
+                  if 'noncoplanar' == lint['symbol'] ]
+        backends = [ 'PYTHON' ] + [ 'NUMPY' ] * has_numpy()
+        for backend in backends:
+            topology = MeshTopology.from_faces(coords, faces)
+            self.assertEqual(
+                [1, 3], MeshLintEngine(topology).analyze(
+                    lints, backend)[0]['faces'],
+                'The warped Quad and Ngon (%s)' % backend)
+            for tolerance, expected in (0.1, []), (0.0001, [1, 3, 4]):
+                topology.set_option('coplanar_tolerance', tolerance)
+                self.assertFalse('noncoplanar' in topology.memo)
+                self.assertEqual(
+                    expected, MeshLintEngine(topology).analyze(
+                        lints, backend)[0]['faces'],
+                    'Tolerance %g (%s)' % (tolerance, backend))
+
+    def test_mirror_planes(self):
+        num_verts, faces = mock_grid(2)
+        coords = [ (x, y, 0) for y in range(3) for x in range(3) ]
+        bowtie = [ (0, 0, 0), (1, 1, 0), (1, -1, 0),
+                   (-1, 1, 0), (-1, -1, 0) ]
+        lints = [ lint for lint in MeshLintEngine.CHECKS
+                  if 'nonmanifold' == lint['symbol'] ]
+        backends = [ 'PYTHON' ] + [ 'NUMPY' ] * has_numpy()
+        for backend in backends:
+            grid = MeshTopology.from_faces(coords, faces)
+            grid.set_mirror_planes([ ((0, 0, 0), (1, 0, 0), 0.01) ])
+            report = MeshLintEngine(grid).analyze(lints, backend)[0]
+            seam = [ e for e in range(grid.num_edges)
+                     if 0 == coords[grid.edges[2 * e]][0]
+                        == coords[grid.edges[2 * e + 1]][0] ]
+            self.assertEqual(2, len(seam))
+            self.assertEqual(6, len(report['edges']),
+                             'Open edges off the plane (%s)' % backend)
+            self.assertFalse(any(e in report['edges'] for e in seam),
+                             'Seam edges exempt (%s)' % backend)
+            grid.set_mirror_planes([])
+            self.assertEqual({}, grid.memo, 'Planes changed')
+            self.assertEqual(8, len(MeshLintEngine(grid).analyze(
+                lints, backend)[0]['edges']))
+
+            for x, expected in (0, []), (5, [0]):
+                tips = MeshTopology.from_faces(
+                    bowtie, [ (0, 1, 2), (0, 3, 4) ])
+                tips.set_mirror_planes(
+                    [ ((x, 0, 0), (1, 0, 0), 0.01) ])
+                self.assertEqual(
+                    expected, MeshLintEngine(tips).analyze(
+                        lints, backend)[0]['verts'],
+                    'Bowtie with a plane at x=%d (%s)' % (x, backend))
+
+    def test_intersecting_faces(self):
+        coords = [ (0, 0, 0), (2, 0, 0), (2, 2, 0), (0, 2, 0),
+                   (0.5, 1, -1), (1.5, 1, -1), (1.5, 1, 1),
+                   (0.5, 1, 1),
+                   (0, 0, 5), (2, 0, 5), (2, 2, 5), (0, 2, 5) ]
+        faces = [ (0, 1, 2, 3), (4, 5, 6, 7), (8, 9, 10, 11) ]
+        cube = [ (x, y, z) for z in (0, 1) for y in (0, 1)
+                 for x in (0, 1) ]
+        cube_faces = [ (0, 2, 3, 1), (4, 5, 7, 6), (0, 1, 5, 4),
+                       (2, 6, 7, 3), (0, 4, 6, 2), (1, 3, 7, 5) ]
+        lints = [ lint for lint in MeshLintEngine.CHECKS
+                  if 'intersecting_faces' == lint['symbol'] ]
+        backends = [ 'PYTHON' ] + [ 'NUMPY' ] * has_numpy()
+        for backend in backends:
+            def check(topology):
+                return MeshLintEngine(topology).analyze(
+                    lints, backend)[0]['faces']
+            self.assertEqual(
+                [], check(MeshTopology.from_faces(cube, cube_faces)),
+                'Faces sharing edges and corners (%s)' % backend)
+            topology = MeshTopology.from_faces(coords, faces)
+            self.assertEqual([0, 1], check(topology),
+                             'Crossing Quads (%s)' % backend)
+            tree = topology.triangle_bvh(topology.coords) \
+                if 'PYTHON' == backend else topology.arrays()._bvh
+            moved = MeshTopology.from_faces(
+                [ (x, y, z + 3 * (4 <= v < 8))
+                  for v, (x, y, z) in enumerate(coords) ], faces)
+            topology.adopt_coords(moved)
+            self.assertEqual([], check(topology),
+                             'Pulled apart (%s)' % backend)
+            self.assertTrue(tree is (
+                topology.triangle_bvh(topology.coords)
+                if 'PYTHON' == backend else topology.arrays()._bvh),
+                'Same tree, refitted (%s)' % backend)
+            topology.set_option('evaluated_coords', array('f', [
+                c for xyz in coords for c in xyz ]))
+            self.assertEqual([0, 1], check(topology),
+                             'Deformed back together (%s)' % backend)
+
+    def test_inconsistent_normals(self):
+        num_verts, faces = mock_grid(2)
+        faces[3] = faces[3][::-1]
+        self.assertEqual(
+            { 'faces': [3] },
+            self.run_check('inconsistent_normals', num_verts, faces))
+        faces[0] = faces[0][::-1]
+        self.assertEqual(
+            { 'faces': [1, 2] },
+            self.run_check('inconsistent_normals', num_verts, faces),
+            'A tie: the ones against the first face')
+        island = [ tuple(v + num_verts for v in face)
+                   for face in mock_grid(2)[1] ]
+        island[1] = island[1][::-1]
+        self.assertEqual(
+            { 'faces': [1, 2, 5] },
+            self.run_check('inconsistent_normals', 2 * num_verts,
+                           faces + island),
+            'Islands are oriented each on their own')
+        moebius = [ (0, 1, 4, 3), (1, 2, 5, 4), (2, 3, 0, 5) ]
+        self.assertEqual(
+            { 'faces': [] },
+            self.run_check('inconsistent_normals', 6, moebius))
+        links = mock_topology(
+            2 * num_verts, faces + island).face_links()
+        self.assertEqual({ 0: 4, 4: 4 }, island_sizes(links))
+        self.assertEqual(
+            [1, 2, 5], sorted(flipped_in_islands(links, [0])
+                              + flipped_in_islands(links, [4])),
+            'Island by island, as workers do')
+
+    def test_result_cache(self):
+        import shutil
+        import tempfile
+        num_verts, faces = mock_grid(2)
+        faces[0] = faces[0][:3]
+        lints = [ lint for lint in MeshLintEngine.CHECKS
+                  if lint['symbol'] in ('tris', 'noncoplanar') ]
+        cache = MeshLintResultCache()
+        def run(topology, cache=cache):
+            engine = MeshLintEngine(topology, True, cache)
+            analysis = engine.analyze(lints)
+            return [ report['faces'] for report in analysis ], \
+                [ engine.profile[lint['symbol']]['cached']
+                  for lint in lints ]
+        self.assertEqual(
+            ([[0], []], [False, False]),
+            run(mock_topology(num_verts, faces)))
+        self.assertEqual(
+            ([[0], []], [True, True]),
+            run(mock_topology(num_verts, faces)),
+            'Another copy of the same mesh')
+        moved = mock_topology(num_verts, faces)
+        moved.coords[2] = 1.0
+        self.assertEqual([True, False], run(moved)[1],
+                         'Only Noncoplanar cares where verts are')
+        moved.set_option('coplanar_tolerance', 0.5)
+        self.assertEqual([True, False], run(moved)[1])
+        other = MeshTopology.from_mesh(
+            MockMesh(num_verts, faces, name='Other'))
+        self.assertEqual([False, False], run(other)[1],
+                         'Another mesh datablock')
+        cache.max_bytes = cache.size_of(cache.entries[
+            next(reversed(cache.entries))])
+        cache.put('latest', {})
+        self.assertEqual(['latest'], list(cache.entries),
+                         'Least recently used ones evicted')
+        directory = tempfile.mkdtemp()
+        try:
+            run(mock_topology(num_verts, faces),
+                MeshLintResultCache(directory=directory))
+            self.assertEqual(
+                ([[0], []], [True, True]),
+                run(mock_topology(num_verts, faces),
+                    MeshLintResultCache(directory=directory)),
+                'Read back from the directory')
+        finally:
+            shutil.rmtree(directory)
+
+    def test_topology_cache(self):
+        import shutil
+        import tempfile
+        num_verts, faces = mock_grid(3)
+        faces[0] = faces[0][:3]
+        directory = tempfile.mkdtemp()
+        try:
+            blend = os.path.join(directory, 'scene.blend')
+            with open(blend, 'wb') as out:
+                out.write(b'BLENDER')
+            topology = MeshTopology.from_mesh(
+                MockMesh(num_verts, faces))
+            topology.coords[3 * 5 + 2] = 0.5
+            topology.set_mirror_planes([ ((0, 0, 0), (1, 0, 0), 0.01) ])
+            topology.set_option('coplanar_tolerance', 0.1)
+            evaluated = array('f', topology.coords)
+            evaluated[2] = 1.0
+            topology.set_option('evaluated_coords', evaluated)
+            cache = MeshLintTopologyCache(directory)
+            settings = { 'checks': [ 'tris' ], 'backend': 'PYTHON' }
+            cache.write(blend, [], settings, [ ('Grid', topology),
+                                               ('Copy', topology) ])
+            found, objects = cache.read(blend)
+            self.assertEqual(settings, found)
+            self.assertEqual(['Grid', 'Copy'],
+                             [ name for name, read in objects ])
+            read = objects[0][1]
+            self.assertEqual(
+                (list(topology.coords),
+                 list(topology.edge_face_counts())),
+                (list(read.coords), list(read.edge_face_counts())))
+            for backend in [ 'PYTHON' ] + [ 'NUMPY' ] * has_numpy():
+                for lint in MeshLintEngine.CHECKS:
+                    self.assertEqual(
+                        topology.result_key(lint),
+                        read.result_key(lint),
+                        'Same %s results to look up' % lint['symbol'])
+                    self.assertEqual(
+                        MeshLintEngine(topology).analyze(
+                            [ lint ], backend),
+                        MeshLintEngine(read).analyze(
+                            [ lint ], backend),
+                        'Same %s found (%s)' % (
+                            lint['symbol'], backend))
+            del found, objects, read
+            os.utime(blend, (0, 0))
+            self.assertFalse(None is cache.read(blend),
+                             'Only the mtime moved')
+            with open(blend, 'ab') as out:
+                out.write(b'!')
+            self.assertEqual(None, cache.read(blend), 'Changed')
+            self.assertEqual(
+                None, cache.read(os.path.join(directory, 'other')))
+        finally:
+            shutil.rmtree(directory)
+
+    def test_profile(self):
+        num_verts, faces = mock_grid(2)
+        faces[0] = faces[0][:3]
+        backends = [ 'PYTHON' ] + [ 'NUMPY' ] * has_numpy()
+        for backend in backends:
+            engine = MeshLintEngine(
+                mock_topology(num_verts, faces), profile=True)
+            engine.analyze(MeshLintEngine.CHECKS, backend)
+            tris = engine.profile['tris']
+            self.assertEqual((4, 1, False), (
+                tris['visited'], tris['found'], tris['cached']),
+                'Tris looked at every face (%s)' % backend)
+            self.assertEqual(
+                9 + 12, engine.profile['nonmanifold']['visited'],
+                'Nonmanifold looked at verts and edges')
+            self.assertTrue(0 <= tris['seconds'])
+            engine.analyze(MeshLintEngine.CHECKS[:1], backend)
+            self.assertEqual(
+                [ 'tris' ], list(engine.profile),
+                'Only what was asked for')
+            self.assertTrue(engine.profile['tris']['cached'])
+            self.assertEqual(1, engine.profile['tris']['found'])
+        self.assertEqual(
+            'Tris: unchanged, not re-checked, 1 found',
+            format_profile(engine.profile)[0])
+        self.assertEqual(
+            None, MeshLintEngine(engine.topology).profile,
+            'Off unless asked for')
+
+    def test_register_check(self):
+        def check_boundary_faces(engine, f):
+            self.assertTrue('edge_face_counts' in engine.topology.shared,
+                            'Shared tables come first')
+            counts = engine.shared('edge_face_counts')
+            return any(1 == counts[engine.topology.face_edges[i]]
+                       for i in engine.topology.face_loops(f))
+        added = []
+        meshlint.CHECK_HOOKS.append(added.append)
+        try:
+            lint = meshlint.register_check({
+                'symbol': 'boundary_faces',
+                'label': 'Boundary Faces',
+                'definition': 'A face on the edge of a hole',
+                'default': False,
+                'elemtypes': [ 'faces' ],
+                'cost': 'cheap',
+                'shares': [ 'edge_face_counts' ]
+            }, check_boundary_faces)
+            self.assertEqual([ lint ], added)
+            self.assertEqual(([ 'topology' ], True),
+                             (lint['inputs'], lint['local']))
+            self.assertRaises(ValueError, meshlint.register_check,
+                              dict(lint), check_boundary_faces)
+            num_verts, faces = mock_grid(3)
+            lints = [ MeshLintEngine.CHECKS[0], lint ]
+            for backend in [ 'PYTHON' ] + [ 'NUMPY' ] * has_numpy():
+                analysis = MeshLintEngine(
+                    mock_topology(num_verts, faces)).analyze(lints, backend)
+                self.assertEqual(
+                    [ 'tris', 'boundary_faces' ],
+                    [ report['lint']['symbol'] for report in analysis ],
+                    'Reports come in the order asked for')
+                self.assertEqual(
+                    [0, 1, 2, 3, 5, 6, 7, 8], analysis[1]['faces'],
+                    'All but the middle face (%s)' % backend)
+        finally:
+            meshlint.CHECK_HOOKS.remove(added.append)
+            meshlint.unregister_check('boundary_faces')
+        self.assertRaises(ValueError, meshlint.register_check, {
+            'symbol': 'odd', 'label': 'Odd', 'definition': '',
+            'default': False, 'elemtypes': [ 'faces' ],
+            'shares': [ 'no_such_table' ] }, check_boundary_faces)
+        self.assertFalse(any('odd' == lint['symbol']
+                             for lint in MeshLintEngine.CHECKS))
+
+    def test_has_lint(self):
+        lints = dict((lint['symbol'], lint) for lint in MeshLintEngine.CHECKS)
+        cube = [ (0,1,2,3), (4,7,6,5), (0,4,5,1),
+                 (1,5,6,2), (2,6,7,3), (3,7,4,0) ]
+        for backend in [ 'PYTHON' ] + [ 'NUMPY' ] * has_numpy():
+            topology = mock_topology(8, cube)
+            cache = MeshLintResultCache()
+            engine = MeshLintEngine(topology, cache=cache)
+            self.assertFalse(engine.has_lint(MeshLintEngine.CHECKS, backend))
+            self.assertEqual(
+                len(MeshLintEngine.CHECKS), len(topology.memo),
+                'A clean mesh has all its checks run to the end')
+            self.assertEqual(
+                [], MeshLintEngine(mock_topology(8, cube))
+                    .analyze(MeshLintEngine.CHECKS, backend)[0]['faces'])
+            self.assertFalse(
+                MeshLintEngine(mock_topology(8, cube), cache=cache)
+                    .has_lint(MeshLintEngine.CHECKS, backend),
+                'Clean results are cached')
+
+            topology = mock_topology(9, cube[1:] + [ (0,1,8), (1,2,8),
+                                                     (2,3,8), (3,0,8) ])
+            engine = MeshLintEngine(topology)
+            self.assertTrue(engine.has_lint(
+                [ lints['interior_faces'], lints['tris'] ], backend))
+            self.assertFalse(
+                'interior_faces' in topology.memo
+                or len(topology.shared)
+                or has_numpy() and len(topology.arrays().shared),
+                'Tris go first, so no edges got counted (%s)' % backend)
+
+    def test_report_writer(self):
+        from xml.dom import minidom
+        coords = [ (0, 0, 0), (1, 0, 0), (1, 1, 0), (0, 1, 0), (-1, 0.5, 0) ]
+        topology = MeshTopology.from_faces(coords, [ (0,1,2), (0,2,3,4) ])
+        analysis = MeshLintEngine(topology).analyze(MeshLintEngine.CHECKS[:3])
+        moved = [ [2, 0, 0, 1], [0, 2, 0, 0], [0, 0, 2, 0], [0, 0, 0, 1] ]
+        chunk_size = meshlint.REPORT_CHUNK_SIZE
+        meshlint.REPORT_CHUNK_SIZE = 2
+        try:
+            out = io.StringIO()
+            writer = MeshLintReportWriter(out, 'JSONL', positions=True)
+            writer.add('Obj', 'Mesh', analysis, topology, moved)
+            writer.close()
+            lines = [ json.loads(line)
+                      for line in out.getvalue().splitlines() ]
+            self.assertEqual(
+                [ ('tris', 1), ('ngons', 0), ('nonmanifold', 5) ],
+                [ (line['check'], line['count']) for line in lines ])
+            self.assertEqual([0, 1, 3, 4, 5], lines[2]['edges'],
+                             'Written 2 at a time, read back whole')
+            self.assertEqual(
+                [ [2.0, 0.0, 0.0], [3.0, 1.0, 0.0] ],
+                lines[2]['positions']['edges'][:2],
+                'Edge middles, moved to where the object is')
+
+            out = io.StringIO()
+            writer = MeshLintReportWriter(out, 'JUNIT')
+            writer.add('Obj', 'Mesh', analysis, topology)
+            writer.close()
+            suite = minidom.parseString(out.getvalue()) \
+                .getElementsByTagName('testsuite')[0]
+            self.assertEqual(('3', '2'), (suite.getAttribute('tests'),
+                                          suite.getAttribute('failures')))
+            failure = suite.getElementsByTagName('failure')[1]
+            self.assertEqual('5 edges', failure.getAttribute('message'))
+            self.assertEqual(
+                [ 'edge %d' % e for e in (0, 1, 3, 4, 5) ],
+                failure.firstChild.data.split('\n')[1:-1],
+                'No positions unless asked for')
+        finally:
+            meshlint.REPORT_CHUNK_SIZE = chunk_size
+        if has_numpy():
+            positions = meshlint.element_positions(
+                topology, 'faces', [0, 1], moved)
+            numpy, meshlint.numpy = meshlint.numpy, None
+            meshlint.numpy_missing = True
+            try:
+                self.assertEqual(
+                    positions, meshlint.element_positions(
+                        topology, 'faces', [0, 1], moved),
+                    'Python and NumPy put faces in the same place')
+            finally:
+                meshlint.numpy, meshlint.numpy_missing = numpy, False
+
+    def test_selection_masks(self):
+        num_verts, faces = mock_grid(2)
+        topology = mock_topology(num_verts, faces)
+        masks = topology.selection_masks([
+            { 'verts': [8], 'edges': [], 'faces': [0] },
+            { 'verts': [], 'edges': [0], 'faces': [0] } ])
+        self.assertEqual(
+            { 'verts': [0, 1, 3, 4, 8],
+              'edges': [0, 1, 2, 3],
+              'faces': [0] },
+            { elemtype: mask_indices(mask)
+              for elemtype, mask in masks.items() })
+
+    def test_from_mesh(self):
+        num_verts, faces = mock_grid(2)
+        topology = MeshTopology.from_mesh(MockMesh(num_verts, faces))
+        expected = mock_topology(num_verts, faces)
+        for field in 'face_offsets', 'face_verts', 'face_edges', \
+                'edges':
+            self.assertEqual(
+                list(getattr(expected, field)),
+                list(getattr(topology, field)),
+                'Same %s as from_faces()' % field)
+
+    def test_from_loops(self):
+        num_verts, faces = mock_grid(3)
+        faces.append((0, 1, 5))
+        offsets = [0]
+        for face in faces:
+            offsets.append(offsets[-1] + len(face))
+        topology = MeshTopology.from_loops(
+            [0.0] * 3 * num_verts, offsets,
+            [ v for face in faces for v in face ])
+        expected = mock_topology(num_verts, faces)
+        self.assertEqual(
+            sorted(zip(expected.edges[::2], expected.edges[1::2])),
+            sorted(zip(topology.edges[::2], topology.edges[1::2])),
+            'Same edges as from_faces()')
+        def summary(topology):
+            return [ (report['verts'], report['faces'],
+                      len(report['edges'])) for report in
+                     MeshLintEngine(topology).analyze(
+                         MeshLintEngine.CHECKS) ]
+        self.assertEqual(summary(expected), summary(topology),
+                         'Same lint as from_faces()')
+
+
+@unittest.skipIf(not has_numpy(), 'NumPy backend unavailable')
+class TestArrays(unittest.TestCase):
+    def test_dirty_since(self):
+        num_verts, faces = mock_grid(3)
+        before = mock_topology(num_verts, faces).arrays()
+        self.assertEqual(
+            { 'verts': [], 'edges': [], 'faces': [] },
+            { elemtype: indices.tolist() for elemtype, indices
+              in mock_topology(num_verts, faces).arrays()
+                .dirty_since(before).items() },
+            'Nothing changed')
+        faces.pop()
+        dirty = mock_topology(num_verts, faces).arrays() \
+            .dirty_since(before)
+        self.assertEqual(
+            [10, 11, 14, 15], dirty['verts'].tolist(),
+            'Verts of the deleted face')
+        self.assertEqual(
+            [4, 5, 7], dirty['faces'].tolist(),
+            'Faces in the one-ring of those verts')
+
+    def test_incremental(self):
+        import numpy
+        # The x = 0 side is open, but on the plane of a Mirror modifier.
+        planes = [ ((0.0, 0.0, 0.0), (1.0, 0.0, 0.0), 0.001) ]
+        def topology():
+            fresh = MeshTopology.from_faces(coords, faces)
+            fresh.set_mirror_planes(planes)
+            return fresh
+        def summary(analysis):
+            return [ (report['lint']['symbol'], list(report['verts']),
+                      list(report['edges']), list(report['faces']))
+                     for report in analysis ]
+        def edits():
+            # Off the mirror plane, a vert's edges are open for real.
+            coords[4][0] = -0.5
+            yield 'Vert moved off the mirror plane'
+            coords[4][0] = 0.0
+            yield 'Vert moved back onto it'
+            faces[4] = faces[4][:3]
+            yield 'A Quad made a Tri'
+            del faces[-1]
+            yield 'A face deleted'
+        lints = MeshLintEngine.CHECKS
+        for backend in [ 'PYTHON', 'NUMPY' ]:
+            num_verts, faces = mock_grid(3)
+            coords = [ [ float(v % 4), float(v // 4), 0.0 ]
+                       for v in range(num_verts) ]
+            before = topology()
+            previous = MeshLintEngine(before).analyze(lints, backend)
+            for edit in edits():
+                after = topology()
+                flipped = numpy.flatnonzero(
+                    before.on_mirror_plane != after.on_mirror_plane)
+                dirty = after.arrays().dirty_since(before.arrays(), flipped)
+                found = MeshLintEngine(after).analyze(
+                    lints, backend, dirty, previous)
+                self.assertEqual(
+                    summary(MeshLintEngine(topology()).analyze(
+                        lints, backend)), summary(found),
+                    '%s, %s' % (edit, backend))
+                if 'Vert moved off the mirror plane' == edit:
+                    self.assertLess(len(previous[2]['edges']),
+                                    len(found[2]['edges']),
+                                    'Its open edges are no longer exempt')
+                before, previous = after, found
+
+    def test_stream(self):
+        import shutil
+        import tempfile
+        num_verts, faces = mock_grid(3)
+        faces[4] = faces[4][:3]
+        faces += [ (0, 1, 5, 4), (1, 2, 6, 5, 17), (17, 6, 18) ]
+        num_verts += 3
+        lints = [ lint for lint in MeshLintEngine.CHECKS
+                  if lint['symbol'] != 'intersecting_faces' ]
+        def summary(analysis):
+            return [ (report['lint']['symbol'], report['verts'],
+                      report['edges'], report['faces'])
+                     for report in analysis ]
+        mesh = MockMesh(num_verts, faces)
+        stream = MeshLintStream(MeshArraySource.from_mesh(mesh),
+                                chunk_faces=4)
+        found = summary(stream.analyze(lints))
+        expected = summary(MeshLintEngine(MeshTopology.from_mesh(
+            mesh)).analyze(lints, 'NUMPY'))
+        self.assertEqual(
+            ['inconsistent_normals'],
+            [ lint['symbol'] for lint in stream.skipped ])
+        self.assertEqual(
+            ('inconsistent_normals', [], [], []), found.pop())
+        expected.pop()
+        self.assertEqual(expected, found, 'Same as the Mesh checked '
+                         'whole, in the Mesh\'s edge order')
+        self.assertTrue(0 < stream.peak_bytes)
+        directory = tempfile.mkdtemp()
+        try:
+            ply = os.path.join(directory, 'mesh.ply')
+            with open(ply, 'w') as out:
+                out.write('ply\nformat ascii 1.0\n'
+                          'element vertex %d\n' % num_verts)
+                for axis in 'xyz':
+                    out.write('property float %s\n' % axis)
+                out.write('element face %d\n' % len(faces))
+                out.write('property list uchar int vertex_indices\n'
+                          'end_header\n')
+                out.write('0 0 0\n' * num_verts)
+                for face in faces:
+                    out.write('%d %s\n' % (
+                        len(face), ' '.join(map(str, face))))
+            obj = os.path.join(directory, 'mesh.obj')
+            with open(obj, 'w') as out:
+                out.write('v 0 0 0\n' * num_verts)
+                for face in faces:
+                    out.write('f %s\n' % ' '.join(
+                        '%d/%d' % (v + 1, v + 1) for v in face))
+            offsets = [0]
+            for face in faces:
+                offsets.append(offsets[-1] + len(face))
+            # Edges numbered in order of their verts, as there.
+            expected = summary(MeshLintEngine(MeshTopology.from_loops(
+                array('f', [0.0] * 3 * num_verts), offsets,
+                [ v for face in faces for v in face ])).analyze(
+                    lints[:-1], 'NUMPY'))
+            for path in ply, obj:
+                self.assertEqual(expected, summary(MeshLintStream(
+                    open_face_source(path), chunk_faces=3).analyze(
+                        lints[:-1])), path)
+        finally:
+            shutil.rmtree(directory)
+
+    def test_stream_small_chunks(self):
+        import numpy
+        import random
+        lints = [ lint for lint in MeshLintEngine.CHECKS
+                  if lint['symbol'] in MeshLintStream.FACE_CHECKS
+                  + MeshLintStream.EDGE_CHECKS ]
+        def summary(analysis):
+            return [ (report['lint']['symbol'], list(report['verts']),
+                      list(report['edges']), list(report['faces']))
+                     for report in analysis ]
+        rand = random.Random(0)
+        for mesh in range(15):
+            num_verts = rand.randint(5, 12)
+            faces = [ rand.sample(range(num_verts), rand.randint(3, 5))
+                      for face in range(rand.randint(1, 20)) ]
+            offsets = [0]
+            for face in faces:
+                offsets.append(offsets[-1] + len(face))
+            loops = [ v for face in faces for v in face ]
+            coords = array('f', [ rand.random()
+                                  for i in range(3 * num_verts) ])
+            expected = summary(MeshLintEngine(MeshTopology.from_loops(
+                coords, offsets, loops)).analyze(lints, 'NUMPY'))
+            source = MeshArraySource(
+                numpy.frombuffer(coords, numpy.float32),
+                numpy.array([ len(face) for face in faces ], numpy.intc),
+                numpy.array(loops, numpy.intc))
+            for chunk_faces in range(1, 8):
+                self.assertEqual(expected, summary(MeshLintStream(
+                    source, chunk_faces=chunk_faces).analyze(lints)),
+                    'mesh %d, %d faces a chunk' % (mesh, chunk_faces))
+
+
+@needs_blender
+class TestObjects(unittest.TestCase):
+    def test_find_problems_of(self):
+        meshlint.register_properties()
+        num_verts, faces = mock_grid(3)
+        faces[0] = faces[0][:3]
+        shared = MockMesh(num_verts, faces, name='Shared')
+        other = MockMesh(num_verts, faces[1:], name='Other')
+        objs = [ MockBlenderObject('A', data=shared),
+                 MockBlenderObject('B', data=other),
+                 MockBlenderObject('C', data=shared) ]
+        runs = []
+        analyze = MeshLintEngine.analyze
+        def counting(engine, *args, **kwargs):
+            runs.append(engine.topology.name)
+            return analyze(engine, *args, **kwargs)
+        MeshLintEngine.analyze = counting
+        try:
+            found = meshlint.MeshLintAnalyzer.find_problems_of(objs)
+        finally:
+            MeshLintEngine.analyze = analyze
+        self.assertEqual([ 'Other', 'Shared' ], sorted(runs),
+                         'Once per Mesh')
+        self.assertEqual(objs, [ analyzer.obj for analyzer, _ in found ],
+                         'An analyzer per object, in order')
+        self.assertIs(found[0][1], found[2][1], 'Shared analysis')
+        tris = [ report['faces'] for _, analysis in found
+                 for report in analysis
+                 if 'tris' == report['lint']['symbol'] ]
+        self.assertEqual([ [0], [], [0] ], tris)
+        self.assertTrue(all(0 < analyzer.num_problems_found
+                            for analyzer, _ in found))
+
+    def test_mirror_merge(self):
+        meshlint.register_properties()
+        class MockMirror:
+            type = 'MIRROR'
+            show_viewport = True
+            mirror_object = None
+            use_x, use_y, use_z = True, False, False
+            merge_threshold = 0.001
+            def __init__(self, use_mirror_merge):
+                self.use_mirror_merge = use_mirror_merge
+        num_verts, faces = mock_grid(2)
+        objs = []
+        for merge in True, False:
+            # MockMesh puts every vert at the origin, on the mirror plane.
+            obj = MockBlenderObject('Merge%s' % merge, data=MockMesh(
+                num_verts, faces, name='Merge%s' % merge))
+            obj.modifiers = [ MockMirror(merge) ]
+            objs.append(obj)
+        (merged, merged_analysis), (apart, apart_analysis) = \
+            meshlint.MeshLintAnalyzer.find_problems_of(objs)
+        self.assertEqual(
+            [ ((0.0, 0.0, 0.0), (1.0, 0.0, 0.0), 0.001) ],
+            merged.mirror_planes())
+        self.assertEqual([], apart.mirror_planes(),
+                         'Without merging, the seam stays open')
+        def open_edges(analysis):
+            return [ report['edges'] for report in analysis
+                     if 'nonmanifold' == report['lint']['symbol'] ][0]
+        self.assertEqual([], open_edges(merged_analysis))
+        self.assertEqual(8, len(open_edges(apart_analysis)))
+
+
+# A closed cube of quads, which passes every default check.
+CUBE_OBJ = '''v 0 0 0
+v 1 0 0
+v 1 1 0
+v 0 1 0
+v 0 0 1
+v 1 0 1
+v 1 1 1
+v 0 1 1
+f 1 4 3 2
+f 5 6 7 8
+f 1 2 6 5
+f 2 3 7 6
+f 3 4 8 7
+f 4 1 5 8
+'''
+
+
+class TestBatch(unittest.TestCase):
+    def setUp(self):
+        import shutil
+        import tempfile
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def write(self, name, text=''):
+        path = os.path.join(self.directory, name)
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        with open(path, 'w') as out:
+            out.write(text)
+        return path
+
+    def batch(self, *args):
+        from contextlib import redirect_stdout
+        with redirect_stdout(io.StringIO()):
+            return meshlint.batch_main(list(args))
+
+    def test_find_blend_files(self):
+        for name in 'b.blend', 'a.blend', 'sub/c.blend', 'notes.txt':
+            self.write(name)
+        single = self.write('other/d.blend')
+        self.assertEqual(
+            [ (os.path.join(self.directory, 'a.blend'), 'a.blend'),
+              (os.path.join(self.directory, 'b.blend'), 'b.blend'),
+              (os.path.join(self.directory, 'other', 'd.blend'),
+               os.path.join('other', 'd.blend')),
+              (os.path.join(self.directory, 'sub', 'c.blend'),
+               os.path.join('sub', 'c.blend')),
+              (single, 'd.blend') ],
+            list(meshlint.find_blend_files([ self.directory, single ])),
+            'Directories searched in order, files taken as they are')
+
+    def test_summaries(self):
+        tris, ngons = MeshLintEngine.CHECKS[:2]
+        analysis = [
+            { 'lint': tris, 'verts': [], 'edges': [], 'faces': [3, 5] },
+            { 'lint': ngons, 'verts': [], 'edges': [], 'faces': [] } ]
+        summary = meshlint.summarize_analysis('Obj', 'Mesh', analysis)
+        self.assertEqual(
+            { 'object': 'Obj', 'mesh': 'Mesh', 'problems': 2 },
+            { key: summary[key] for key in ('object', 'mesh', 'problems') })
+        self.assertEqual(
+            { 'symbol': tris['symbol'], 'label': tris['label'],
+              'count': 2, 'verts': [], 'edges': [], 'faces': [3, 5] },
+            summary['checks'][0])
+        self.assertEqual(
+            { 'symbol': tris['symbol'], 'label': tris['label'],
+              'count': 2 },
+            meshlint.summarize_analysis(
+                'Obj', 'Mesh', analysis, False)['checks'][0],
+            'Counts only')
+        self.assertEqual(
+            { 'object': 'Obj', 'mesh': 'Mesh', 'problems': 1,
+              'has_lint': True },
+            meshlint.summarize_gate('Obj', 'Mesh', True))
+        self.assertEqual(
+            0, meshlint.summarize_gate('Obj', 'Mesh', False)['problems'])
+
+    @needs_python
+    @unittest.skipIf(not has_numpy(), 'NumPy backend unavailable')
+    def test_stream_worker(self):
+        import argparse
+        path = self.write('tri.obj', 'v 0 0 0\nv 1 0 0\nv 0 1 0\nf 1 2 3\n')
+        report = os.path.join(self.directory, 'tri.meshlint.json')
+        opts = argparse.Namespace(gate=False, export='JSONL',
+                                  positions=False)
+        result, error = meshlint.run_stream_worker(path, report, opts)
+        self.assertEqual(None, error)
+        with open(report) as source:
+            self.assertEqual(result, json.load(source), 'Written out')
+        summary, = result['objects']
+        self.assertEqual('tri.obj', summary['object'])
+        self.assertTrue(summary['streamed'])
+        counts = { check['symbol']: check['count']
+                   for check in summary['checks'] }
+        self.assertEqual(1, counts['tris'])
+        self.assertEqual(3, counts['nonmanifold'], 'Its open edges')
+        self.assertEqual(sum(counts.values()), result['problems'])
+        with open(os.path.join(self.directory, 'tri.meshlint.jsonl')) \
+                as source:
+            lines = [ json.loads(line) for line in source ]
+        self.assertEqual(
+            [0], [ line for line in lines
+                   if 'tris' == line.get('check') ][0]['faces'],
+            'Exported element by element')
+        self.assertEqual(
+            (None, ), meshlint.run_stream_worker(
+                self.write('bad.obj', 'f 1 2 x\n'), report, opts)[:1],
+            'A broken file fails')
+
+    @needs_python
+    @unittest.skipIf(not has_numpy(), 'NumPy backend unavailable')
+    def test_gate_exit_codes(self):
+        clean = self.write('clean/cube.obj', CUBE_OBJ)
+        tri = self.write('tri.obj', 'v 0 0 0\nv 1 0 0\nv 0 1 0\nf 1 2 3\n')
+        bad = self.write('bad.obj', 'f 1 2 x\n')
+        self.assertEqual(0, self.batch('--gate', clean), 'Clean')
+        with open(os.path.join(self.directory, 'clean',
+                               'cube.meshlint.json')) as source:
+            report = json.load(source)
+        self.assertEqual((True, 0, False), (
+            report['gate'], report['problems'],
+            report['objects'][0]['has_lint']))
+        self.assertEqual(1, self.batch('--gate', clean, tri), 'Lint')
+        with open(os.path.join(self.directory,
+                               'tri.meshlint.json')) as source:
+            self.assertEqual(
+                [ { 'object': 'tri.obj', 'has_lint': True } ],
+                [ { key: summary[key] for key in ('object', 'has_lint') }
+                  for summary in json.load(source)['objects'] ])
+        self.assertEqual(2, self.batch('--gate', clean, tri, bad),
+                         'A file could not be checked')
+
+
+@needs_blender
+class TestUI(unittest.TestCase):
+    def test_complaints(self):
+        f = meshlint.MeshLintControl.build_object_criticisms
+        self.assertEqual([], f([], 0), 'Nothing selected')
+        self.assertEqual(
+            [],
+            f([MockBlenderObject('lsmft')], 0),
+            'Ok name')
+        self.assertEqual(
+            ['...but "Cube" is not a great name.'],
+            f([MockBlenderObject('Cube')], 0),
+            'Bad name, otherwise problem-free.')
+        self.assertEqual(
+            [],
+            f([MockBlenderObject('Hassenfrass')], 12),
+            'Good name, but with problems.')
+        self.assertEqual(
+            ['...and also "Cube" is not a great name.'],
+            f([MockBlenderObject('Cube')], 23),
+            'Bad name, and problems, too.')
+        self.assertEqual(
+            [
+                '...but "Sphere" is not a great name.',
+                '...and also "Cube" is not a great name.'
+            ],
+            f([
+                MockBlenderObject('Sphere'),
+                MockBlenderObject('Cube') ], 0),
+            'Two bad names.')
+
+        scaled = MockBlenderObject('Solartech', scale=(.2, 2, 1))
+        self.assertEqual(
+            [ '...but "Solartech" has an unapplied scale.' ],
+            f([scaled], 0),
+            'Only problem is unapplied scale.'
+        )
+
+class QuietOnSuccessTestResult(unittest.TextTestResult):
+    def startTest(self, test):
+        pass
+
+    def addSuccess(self, test):
+        pass
+
+
+class QuietTestRunner(unittest.TextTestRunner):
+    resultclass = QuietOnSuccessTestResult
+
+    # Ugh. I really shouldn't have to include this much code, but they
+    # left it so unrefactored I don't know what else to do. My other
+    # option is to override the stream and substitute out the success
+    # case, but that's a mess, too. - rking
+    def run(self, test):
+        "Run the given test case or test suite."
+        result = self._makeResult()
+        unittest.registerResult(result)
+        result.failfast = self.failfast
+        result.buffer = self.buffer
+        with warnings.catch_warnings():
+            if self.warnings:
+                # if self.warnings is set, use it to filter all the
+                # warnings
+                warnings.simplefilter(self.warnings)
+                # if the filter is 'default' or 'always', special-case
+                # the warnings from the deprecated unittest methods to
+                # show them no more than once per module, because they
+                # can be fairly noisy.  The -Wd and -Wa flags can be
+                # used to bypass this only when self.warnings is None.
+                if self.warnings in ['default', 'always']:
+                    warnings.filterwarnings('module',
+                            category=DeprecationWarning,
+                            message=r'Please use assert\w+ instead.')
+            startTime = time.time()
+            startTestRun = getattr(result, 'startTestRun', None)
+            if startTestRun is not None:
+                startTestRun()
+            try:
+                test(result)
+            finally:
+                stopTestRun = getattr(result, 'stopTestRun', None)
+                if stopTestRun is not None:
+                    stopTestRun()
+            stopTime = time.time()
+        timeTaken = stopTime - startTime
+        result.printErrors()
+        run = result.testsRun
+
+        expectedFails = unexpectedSuccesses = skipped = 0
+        try:
+            results = map(len, (result.expectedFailures,
+                                result.unexpectedSuccesses,
+                                result.skipped))
+        except AttributeError:
+            pass
+        else:
+            expectedFails, unexpectedSuccesses, skipped = results
+
+        infos = []
+        if not result.wasSuccessful():
+            self.stream.write("FAILED")
+            failed, errored = len(result.failures), len(result.errors)
+            if failed:
+                infos.append("failures=%d" % failed)
+            if errored:
+                infos.append("errors=%d" % errored)
+        if skipped:
+            infos.append("skipped=%d" % skipped)
+        if expectedFails:
+            infos.append("expected failures=%d" % expectedFails)
+        if unexpectedSuccesses:
+            infos.append(
+                "unexpected successes=%d" % unexpectedSuccesses)
+        return result
+
+if __name__ == '__main__':
+    unittest.main(
+        testRunner=QuietTestRunner,
+        argv=['dummy'],
+        exit=False,
+        verbosity=0)